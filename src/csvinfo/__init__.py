@@ -1,41 +1,195 @@
+import io
 import os
+import re
 import sys
+import mmap
 import textwrap
+import contextlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from ._chunks import split_csv_file
+from ._chunks import parse_byte_range
+from ._rowindex import build_row_index
+from ._compression import ThreadedReader
+from ._compression import open_decompressed
+from ._compression import detect_compression
+from ._stream import is_stream
+from ._stream import StreamReader
+from ._profile import ParserProfile
+from ._errors import ErrorLog
+from ._errors import CSVSyntaxError
+from ._rowindex import load_row_index
+from ._sketch import QuantileSketch
+from ._sketch import HyperLogLog
+from ._sketch import hash_content
+from ._sketch import HLL_MASK
+from ._sketch import HLL_QUOTED_MASK
+from ._sketch import HLL_ROW_MULTIPLIER
+
+
+
+# Returns the number of non-overlapping occurrences of sub in buf[begin:end],
+# without copying that part of buf (an mmap has no count method, so for an
+# mmap the occurrences are found one at a time).
+def _count_in_buffer(buf, sub, begin, end) -> int:
+    assert isinstance(sub, bytes), type(sub)
+    assert 0 < len(sub), sub
+    if not isinstance(buf, mmap.mmap):
+        return buf.count(sub, begin, end)
+    n = 0
+    i = buf.find(sub, begin, end)
+    while -1 != i:
+        n += 1
+        i = buf.find(sub, i + len(sub), end)
+    return n
+
+
+# The content counts of a cell are the numbers of quote characters, of line
+# feeds (that are not part of a cr lf) and of cr lfs in its content; they are
+# taken once per cell (when the cell is stored, or first tabulated), so that
+# the statistics only add them up. The content of an unquoted cell can hold
+# none of these (they would have ended it), so the fast parser sets its
+# counts without looking at it.
+NO_CONTENT_COUNTS = (0, 0, 0)
+
+def _count_content_in_buffer(buf, qb, begin, end) -> tuple:
+    if begin == end:
+        return NO_CONTENT_COUNTS
+    n_qcs   = _count_in_buffer(buf, qb, begin, end)
+    n_lfs   = _count_in_buffer(buf, b'\x0a', begin, end)
+    # (a cr lf holds a line feed, so there is none without one)
+    n_crlfs = 0 if 0 == n_lfs else \
+              _count_in_buffer(buf, b'\x0d\x0a', begin, end)
+    if 0 == n_qcs and 0 == n_lfs:
+        return NO_CONTENT_COUNTS
+    return (n_qcs, n_lfs - n_crlfs, n_crlfs)
 
 
 
 class CSVTree:
     class _CSVRow:
         class _CSVCell:
-            def __init__(self):
-                self._content = b''
+            __slots__ = (
+                '_content',
+                '_source',
+                '_begin',
+                '_end',
+                '_quoted',
+                '_subsequent_delimiter',
+                '_content_counts',
+            )
+
+            def __init__(self, source = None):
+                # The content is accumulated in a bytearray while the cell is
+                # being read, and frozen into bytes once the cell has ended
+                # (i.e., once its subsequent delimiter is set).
+                self._content = bytearray()
+                # When the csv file is memory-mapped (source), the content is
+                # instead kept as the span [begin, end) of the mapping, for
+                # as long as it is one; it is copied into the bytearray only
+                # if it stops being one (e.g., at a doubled quote character).
+                assert source is None or isinstance(source, mmap.mmap), \
+                    type(source)
+                self._source = source
+                self._begin = None
+                self._end = None
                 self._quoted = None
                 self._subsequent_delimiter = None
+                # (None until they are first asked for; see
+                # NO_CONTENT_COUNTS)
+                self._content_counts = None
+
+            # (a cell that is reused, rather than allocated, for the next
+            # cell; see _iter_byte_range_fast; its content is set by the
+            # parser once the cell has ended)
+            def reset(self, source = None) -> None:
+                self._content              = b''
+                self._source               = source
+                self._begin                = None
+                self._end                  = None
+                self._quoted               = None
+                self._subsequent_delimiter = None
+                self._content_counts       = None
+                return None
 
             def __len__(self) -> int:
-                return len(self._content)
+                if self._begin is None:
+                    return len(self._content)
+                assert 0 == len(self._content), len(self._content)
+                return self._end - self._begin
 
             def get_content(self) -> bytes:
                 assert isinstance(self._content, bytes), \
                     type(self._content)
-                return self._content
+                if self._source is None:
+                    return self._content
+                if self._begin is None:
+                    return memoryview(self._content)
+                return memoryview(self._source)[self._begin:self._end]
+
+            def get_span(self) -> tuple:
+                if self._begin is None:
+                    return None
+                return (self._begin, self._end)
+
+            def count_content(self, sub) -> int:
+                if self._begin is None:
+                    return self._content.count(sub)
+                return _count_in_buffer(
+                    self._source, sub, self._begin, self._end
+                )
 
-            def append_byte(self, byte) -> None:
+            # qb: quote [character as] bytes
+            def get_content_counts(self, qb) -> tuple:
+                if self._content_counts is None:
+                    if self._begin is None:
+                        self._content_counts = _count_content_in_buffer(
+                            self._content, qb, 0, len(self._content)
+                        )
+                    else:
+                        self._content_counts = _count_content_in_buffer(
+                            self._source, qb, self._begin, self._end
+                        )
+                return self._content_counts
+
+            def append_byte(self, byte, byteidx = None) -> None:
                 assert isinstance(byte, int), type(byte)
                 assert 0 <= byte and byte < 256
-                assert isinstance(self._content, bytes)
-                self._content += bytes([byte])
+                assert isinstance(self._content, bytearray), \
+                    type(self._content)
+                if self._source is not None:
+                    assert isinstance(byteidx, int), type(byteidx)
+                    assert byte == self._source[byteidx], (byte, byteidx)
+                    if self._begin is None and 0 == len(self._content):
+                        self._begin = byteidx
+                        self._end   = byteidx + 1
+                        return None
+                    if self._begin is not None and self._end == byteidx:
+                        self._end += 1
+                        return None
+                    if self._begin is not None:
+                        self._content.extend(
+                            self._source[self._begin:self._end]
+                        )
+                        self._begin = None
+                        self._end   = None
+                self._content.append(byte)
                 return None
 
             def content_is_only_spaces(self) -> bool:
-                assert isinstance(self._content, bytes), \
+                assert isinstance(self._content, (bytes, bytearray)), \
                     type(self._content)
-                if 0 == len(self._content):
+                if 0 == len(self):
                     return False
+                if self._begin is None:
+                    content = self._content
+                else:
+                    content = self._source[self._begin:self._end]
                 SP = ord(' ')
                 assert SP == 0x20
                 assert SP == b' '[0]
-                for b in self._content:
+                for b in content:
                     assert isinstance(b, int), type(b)
                     assert 0 <= b and b < 256, b
                     if SP != b:
@@ -44,7 +198,11 @@ class CSVTree:
 
             def delete_content(self) -> None:
                 assert self.content_is_only_spaces() is True
-                self._content = b''
+                assert isinstance(self._content, bytearray), \
+                    type(self._content)
+                self._content = bytearray()
+                self._begin = None
+                self._end = None
                 return None
 
             def quoted_attr_is_set(self) -> bool:
@@ -89,6 +247,9 @@ class CSVTree:
                 assert -1 <= delimiter and delimiter < 256, delimiter
                 self._subsequent_delimiter = delimiter
                 del delimiter
+                assert isinstance(self._content, bytearray), \
+                    type(self._content)
+                self._content = bytes(self._content)
                 return None
 
             def get_subsequent_delimiter(self) -> int:
@@ -96,21 +257,42 @@ class CSVTree:
                 return self._subsequent_delimiter
                  
 
+        __slots__ = (
+            '_cells',
+            '_newline_encoding',
+            '_leading_spaces_are_present',
+            '_trailing_spaces_are_present',
+            '_size',
+        )
+
         def __init__(self):
             self._cells                       = []
             self._newline_encoding            = None
             self._leading_spaces_are_present  = False
             self._trailing_spaces_are_present = False
+            # (the number of bytes of the csv file that the row spans,
+            # including its newline; set by the parser once the row ends)
+            self._size                        = None
+
+        # (a row that is reused, rather than allocated, for the next row;
+        # see _iter_byte_range_fast)
+        def reset(self) -> None:
+            self._cells.clear()
+            self._newline_encoding            = None
+            self._leading_spaces_are_present  = False
+            self._trailing_spaces_are_present = False
+            self._size                        = None
+            return None
 
 
         def __len__(self) -> int:
             return len(self._cells)
 
 
-        def append_cell(self) -> None:
+        def append_cell(self, source = None) -> None:
             assert hasattr(self, '_cells')
             assert isinstance(self._cells, list), type(self._cells)
-            self._cells.append(self._CSVCell())
+            self._cells.append(self._CSVCell(source))
             return None
 
 
@@ -123,6 +305,11 @@ class CSVTree:
             return self._cells.pop()
 
 
+        def get_size(self) -> int:
+            assert isinstance(self._size, int), type(self._size)
+            return self._size
+
+
         def newline_encoding_is_set(self) -> bool:
             if self._newline_encoding is None:
                 return False
@@ -162,31 +349,1109 @@ class CSVTree:
             assert self._leading_spaces_are_present in (True, False)
             return self._leading_spaces_are_present
 
-        
 
+
+    # The parsed rows are kept in columnar form: the contents of all cells
+    # are concatenated into one buffer, and the per-cell and per-row
+    # attributes are kept in flat arrays (or bitsets) indexed by the
+    # global cell index and the row index.
+    class _CSVStore:
+        class _CSVRowView:
+            class _CSVCellView:
+                __slots__ = (
+                    '_store',
+                    '_cellidx',
+                )
+
+                def __init__(self, store, cellidx):
+                    self._store   = store
+                    self._cellidx = cellidx
+
+                def __len__(self) -> int:
+                    return self._store._get_cell_end  (self._cellidx) - \
+                           self._store._get_cell_begin(self._cellidx)
+
+                def get_content(self) -> bytes:
+                    return self._store._get_cell_content(self._cellidx)
+
+                def count_content(self, sub) -> int:
+                    return self._store._count_in_cell_content(
+                        self._cellidx, sub
+                    )
+
+                def get_content_counts(self, qb) -> tuple:
+                    assert qb[0] == self._store._quote_character, qb
+                    return self._store._content_counts.get(
+                        self._cellidx, NO_CONTENT_COUNTS
+                    )
+
+                def quoted_attr_is_set(self) -> bool:
+                    return True
+
+                def isquoted(self) -> bool:
+                    return self._store._get_bit(
+                        self._store._quoted, self._cellidx
+                    )
+
+                def subsequent_delimiter_is_set(self) -> bool:
+                    return True
+
+                def get_subsequent_delimiter(self) -> int:
+                    return self._store._subsequent_delimiters[self._cellidx]
+
+
+            __slots__ = (
+                '_store',
+                '_rowidx',
+                '_cellidx_begin',
+                '_cellidx_end',
+            )
+
+            def __init__(self, store, rowidx):
+                self._store         = store
+                self._rowidx        = rowidx
+                self._cellidx_begin = store._get_row_begin(rowidx)
+                self._cellidx_end   = store._row_ends[rowidx]
+
+            def __len__(self) -> int:
+                return self._cellidx_end - self._cellidx_begin
+
+            def get_cell(self, colidx) -> _CSVCellView:
+                assert isinstance(colidx, int), type(colidx)
+                if colidx < 0:
+                    colidx += len(self)
+                if not (0 <= colidx and colidx < len(self)):
+                    raise IndexError(colidx)
+                return self._CSVCellView(
+                    self._store, self._cellidx_begin + colidx
+                )
+
+            def newline_encoding_is_set(self) -> bool:
+                return True
+
+            def get_newline_encoding(self) -> bytes:
+                return self._store._NEWLINE_ENCODINGS[
+                    self._store._newline_encodings[self._rowidx]
+                ]
+
+            def leading_spaces_are_present(self) -> bool:
+                return self._store._get_bit(
+                    self._store._leading_spaces, self._rowidx
+                )
+
+            def get_size(self) -> int:
+                return self._store._row_sizes[self._rowidx]
+
+
+        # ne: newline encoding [indexed by its code in _newline_encodings]
+        _NEWLINE_ENCODINGS = (b'', b'\x0a', b'\x0d\x0a')
+
+        def __init__(self, source = None, quote_character = 0x22):
+            # When the csv file is memory-mapped (source), the content of
+            # each cell that is a span of the mapping is not copied: its
+            # begin and end offsets in the mapping are kept instead, and the
+            # contents of the other cells are concatenated into _content.
+            assert source is None or isinstance(source, mmap.mmap), \
+                type(source)
+            self._source                = source
+            self._mapped                = source is not None
+            self._quote_character       = quote_character
+            if self._mapped is True:
+                # per cell: begin offset of the cell's content
+                self._cell_begins       = array('Q')
+                # per cell: content is in _content, one bit per cell
+                self._copied            = bytearray()
+            # cell contents, concatenated
+            self._content               = bytearray()
+            # per cell: end offset of the cell's content in _content
+            self._cell_ends             = array('Q')
+            # per cell: quoted attribute, one bit per cell
+            self._quoted                = bytearray()
+            # per cell: subsequent delimiter (-1 if none)
+            self._subsequent_delimiters = array('b')
+            # per cell whose content counts are not all 0: its content
+            # counts (see NO_CONTENT_COUNTS)
+            self._content_counts        = {}
+            # per row: end of the row's cells in the per-cell arrays
+            self._row_ends              = array('Q')
+            # per row: code of the row's newline encoding
+            self._newline_encodings     = array('b')
+            # per row: leading spaces are present, one bit per row
+            self._leading_spaces        = bytearray()
+            # per row: number of bytes of the csv file that the row spans
+            self._row_sizes             = array('Q')
+
+
+        def __len__(self) -> int:
+            return len(self._row_ends)
+
+
+        # The mapping cannot be pickled (e.g., when the store is returned
+        # by a worker process); the receiving process supplies its own.
+        def __getstate__(self) -> dict:
+            state = self.__dict__.copy()
+            state['_source'] = None
+            return state
+
+
+        @staticmethod
+        def _append_bit(bits, i, bit) -> None:
+            assert isinstance(bits, bytearray), type(bits)
+            assert i == 8 * len(bits) or i // 8 == len(bits) - 1, \
+                (i, len(bits))
+            if 0 == i % 8:
+                bits.append(0)
+            if bit is True:
+                bits[i // 8] |= 1 << (i % 8)
+            else:
+                assert bit is False, bit
+            return None
+
+        @staticmethod
+        def _get_bit(bits, i) -> bool:
+            return 0 != (bits[i // 8] >> (i % 8)) & 1
+
+
+        def _get_cell_begin(self, cellidx) -> int:
+            if self._mapped is True:
+                return self._cell_begins[cellidx]
+            if 0 == cellidx:
+                return 0
+            return self._cell_ends[cellidx - 1]
+
+        def _get_cell_end(self, cellidx) -> int:
+            return self._cell_ends[cellidx]
+
+        def _get_cell_buffer(self, cellidx):
+            if self._mapped is False:
+                return self._content
+            if self._get_bit(self._copied, cellidx):
+                return self._content
+            assert self._source is not None
+            return self._source
+
+        def _get_cell_content(self, cellidx) -> bytes:
+            content = memoryview(self._get_cell_buffer(cellidx))[
+                self._get_cell_begin(cellidx):self._get_cell_end(cellidx)
+            ]
+            if self._mapped is True:
+                return content
+            return bytes(content)
+
+        def _count_in_cell_content(self, cellidx, sub) -> int:
+            return _count_in_buffer(
+                self._get_cell_buffer(cellidx),
+                sub,
+                self._get_cell_begin(cellidx),
+                self._get_cell_end(cellidx),
+            )
+
+        def _get_row_begin(self, rowidx) -> int:
+            if 0 == rowidx:
+                return 0
+            return self._row_ends[rowidx - 1]
+
+
+        def append_row(self, row) -> None:
+            assert 0 < len(row), len(row)
+
+            # qb: quote [character as] bytes
+            qb = bytes([self._quote_character])
+
+            for j in range(len(row)):
+                cell = row.get_cell(j)
+
+                # ci: cell index
+                ci = len(self._cell_ends)
+
+                if self._mapped is True:
+                    # sp: span [of the cell's content in the mapping]
+                    sp = cell.get_span()
+                    self._append_bit(self._copied, ci, sp is None)
+                    if sp is None:
+                        # cb: content begin
+                        cb = len(self._content)
+                        self._content.extend(cell.get_content())
+                        sp = (cb, len(self._content))
+                        del cb
+                    self._cell_begins.append(sp[0])
+                    self._cell_ends  .append(sp[1])
+                    del sp
+                else:
+                    self._content.extend(cell.get_content())
+                    self._cell_ends.append(len(self._content))
+                self._append_bit(self._quoted, ci, cell.isquoted())
+                self._subsequent_delimiters.append(
+                    cell.get_subsequent_delimiter()
+                )
+                # ccs: content counts
+                ccs = cell.get_content_counts(qb)
+                if ccs is not NO_CONTENT_COUNTS:
+                    self._content_counts[ci] = ccs
+                del ci, cell, ccs
+
+            # ri: row index
+            ri = len(self._row_ends)
+
+            self._row_ends.append(len(self._cell_ends))
+            self._newline_encodings.append(
+                self._NEWLINE_ENCODINGS.index(row.get_newline_encoding())
+            )
+            self._append_bit(
+                self._leading_spaces, ri, row.leading_spaces_are_present()
+            )
+            self._row_sizes.append(row.get_size())
+            del ri
+
+            return None
+
+
+        # Loads the arrays of an empty store from their bytes (as the numpy
+        # engine builds them, in bulk; see _numpy_engine.get_columns), in the
+        # order of their attributes above: the content, the cell begins (or
+        # None, if the csv file is not mapped), the cell ends, the copied
+        # bits (or None), the quoted bits, the subsequent delimiters, the
+        # content counts, the row ends, the newline encodings, the leading
+        # spaces bits and the row sizes.
+        def load_columns(self, columns) -> None:
+
+            assert 0 == len(self) and 0 == len(self._cell_ends)
+            (content, cell_begins, cell_ends, copied, quoted,
+             subsequent_delimiters, content_counts, row_ends,
+             newline_encodings, leading_spaces, row_sizes) = columns
+            assert (cell_begins is None) == (self._mapped is False)
+            assert (copied      is None) == (self._mapped is False)
+
+            self._content.extend(content)
+            if self._mapped is True:
+                self._cell_begins.frombytes(cell_begins)
+                self._copied.extend(copied)
+            self._cell_ends.frombytes(cell_ends)
+            self._quoted.extend(quoted)
+            self._subsequent_delimiters.frombytes(subsequent_delimiters)
+            self._content_counts.update(content_counts)
+            self._row_ends.frombytes(row_ends)
+            self._newline_encodings.frombytes(newline_encodings)
+            self._leading_spaces.extend(leading_spaces)
+            self._row_sizes.frombytes(row_sizes)
+
+            assert len(self._cell_ends) == self._row_ends[-1], \
+                (len(self._cell_ends), self._row_ends[-1])
+            assert len(self._subsequent_delimiters) == len(self._cell_ends)
+            assert len(self._quoted) == -(-len(self._cell_ends) // 8)
+            assert len(self._row_sizes) == len(self._row_ends)
+
+            return None
+
+
+        @staticmethod
+        def _extend_bits(bits, n_bits, other_bits, n_other_bits) -> None:
+            assert len(bits)       == -(-n_bits       // 8), (len(bits), n_bits)
+            assert len(other_bits) == -(-n_other_bits // 8), \
+                (len(other_bits), n_other_bits)
+            # r: number of bits [already] used in the final byte of bits
+            r = n_bits % 8
+            if 0 == r:
+                bits.extend(other_bits)
+                return None
+            # ob: other bits, shifted to continue the final byte of bits
+            ob = (int.from_bytes(other_bits, 'little') << r) | bits.pop()
+            bits.extend(
+                ob.to_bytes(-(-(r + n_other_bits) // 8), 'little')
+            )
+            return None
+
+
+        # The rows of other are appended after the rows of self.
+        def extend(self, other) -> None:
+
+            assert isinstance(other, type(self)), type(other)
+
+            # co: content offset
+            # ci: cell index offset
+            co = len(self._content)
+            ci = len(self._cell_ends)
+            # ri: row index offset
+            ri = len(self._row_ends)
+
+            assert self._mapped == other._mapped, (self._mapped, other._mapped)
+            assert self._quote_character == other._quote_character, \
+                (self._quote_character, other._quote_character)
+
+            self._content.extend(other._content)
+            if self._mapped is True:
+                # (only the offsets of copied contents shift, and so only the
+                # set bits of the copied bits are visited)
+                self._cell_begins.extend(other._cell_begins)
+                self._cell_ends  .extend(other._cell_ends)
+                for b, byte in enumerate(other._copied if 0 < co else b''):
+                    while 0 != byte:
+                        # k: cell index [of the lowest set bit]
+                        k = ci + 8 * b + (byte & -byte).bit_length() - 1
+                        self._cell_begins[k] += co
+                        self._cell_ends  [k] += co
+                        byte &= byte - 1
+                self._extend_bits(
+                    self._copied, ci, other._copied, len(other._cell_ends)
+                )
+            else:
+                self._cell_ends.extend(e + co for e in other._cell_ends)
+            self._extend_bits(
+                self._quoted, ci, other._quoted, len(other._cell_ends)
+            )
+            self._subsequent_delimiters.extend(other._subsequent_delimiters)
+            for k, ccs in other._content_counts.items():
+                self._content_counts[ci + k] = ccs
+            self._row_ends.extend(e + ci for e in other._row_ends)
+            self._newline_encodings.extend(other._newline_encodings)
+            self._row_sizes.extend(other._row_sizes)
+            self._extend_bits(
+                self._leading_spaces, ri, other._leading_spaces,
+                len(other._row_ends)
+            )
+            del co, ci, ri
+
+            return None
+
+
+        def get_row(self, rowidx) -> _CSVRowView:
+            assert isinstance(rowidx, int), type(rowidx)
+            if rowidx < 0:
+                rowidx += len(self)
+            if not (0 <= rowidx and rowidx < len(self)):
+                raise IndexError(rowidx)
+            return self._CSVRowView(self, rowidx)
+
+
+        # The bulk accessors return the arrays of the store themselves (not
+        # copies, which must not be modified), for a consumer that walks all
+        # of the rows or cells (e.g., the tabulation of the statistics),
+        # rather than one view at a time. A bit array is read with _get_bit.
+
+        # (per row)
+        def get_row_ends(self) -> array:
+            return self._row_ends
+
+        def get_row_sizes(self) -> array:
+            return self._row_sizes
+
+        # (the codes index _NEWLINE_ENCODINGS)
+        def get_newline_encodings(self) -> array:
+            return self._newline_encodings
+
+        def get_leading_spaces(self) -> bytearray:
+            return self._leading_spaces
+
+        # (per cell; the begin of a cell's content is the end of the
+        # previous cell's, unless the csv file is mapped, and so the begins
+        # are None if it is not)
+        def get_cell_begins(self) -> array:
+            return self._cell_begins if self._mapped is True else None
+
+        def get_cell_ends(self) -> array:
+            return self._cell_ends
+
+        def get_quoted(self) -> bytearray:
+            return self._quoted
+
+        def get_subsequent_delimiters(self) -> array:
+            return self._subsequent_delimiters
+
+        def get_content_counts(self) -> dict:
+            return self._content_counts
+
+        # (the content of a cell is in get_content, unless the csv file is
+        # mapped and its copied bit is not set, in which case it is in
+        # get_source; the copied bits are None if the csv file is not mapped)
+        def get_content(self) -> bytearray:
+            return self._content
+
+        def get_copied(self) -> bytearray:
+            return self._copied if self._mapped is True else None
+
+        def get_source(self) -> mmap.mmap:
+            return self._source
+
+
+
+    # The rows are parsed into _CSVRow objects; the parser only ever works on
+    # the last one, and each row is handed to _commit_row as soon as the
+    # next row is begun (or the end of the file is reached).
     def _append_row(self) -> None:
-        assert hasattr(self, '_rows')
-        assert isinstance(self._rows, list), type(self._rows)
+        assert self._flush_rows() is None
+        assert 0 == len(self._rows), len(self._rows)
         self._rows.append(self._CSVRow())
         return None
 
     def _get_row(self, rowidx) -> _CSVRow:
         assert isinstance(rowidx, int), type(rowidx)
+        assert -1 == rowidx, rowidx
         return self._rows[rowidx]
 
     def _pop_row(self) -> _CSVRow:
         return self._rows.pop()
+
+    def _flush_rows(self) -> None:
+        assert isinstance(self._rows, list), type(self._rows)
+        assert len(self._rows) in (0, 1), len(self._rows)
+        if 1 == len(self._rows):
+            assert self._commit_row(self._rows.pop()) is None
+        return None
+
+    def _commit_row(self, row) -> None:
+        return self._store.append_row(row)
+
+    # (the rows of a store that was built in bulk; see _commit_indexed_rows)
+    def _commit_store(self, store) -> None:
+        return self._store.extend(store)
         
 
     def _parse_csv_file(self) -> None:
         
         assert hasattr(self, '_csv_file_path')
-        assert isinstance(self._csv_file_path, str), type(self._csv_file_path)
-        assert 0 < len(self._csv_file_path)
-        assert os.path.isfile(self._csv_file_path), self._csv_file_path
-        assert 0 < os.path.getsize(self._csv_file_path), self._csv_file_path
+        if self._stream is None:
+            assert isinstance(self._csv_file_path, str), \
+                type(self._csv_file_path)
+            assert 0 < len(self._csv_file_path)
+            assert os.path.isfile(self._csv_file_path), self._csv_file_path
+            assert 0 < os.path.getsize(self._csv_file_path), \
+                self._csv_file_path
+
+        # bb: byte range begin
+        # be: byte range end
+        bb, be = self._get_byte_range()
+
+        # (the csv file is opened here, rather than by the parser, so that it
+        # is closed however the parse ends, e.g., on a csv syntax error: the
+        # reader thread of a compressed csv file would otherwise be left
+        # blocked on its full queue, holding it open)
+        if self._mapping is None: csv_file = self._open_csv_file(bb)
+        else                    : csv_file = None
+        with self._closing(csv_file):
+            if   'python' == self._engine:
+                assert self._parse_byte_range(bb, be, csv_file) is None
+            elif 'numpy'  == self._engine:
+                assert self._parse_byte_range_with_numpy(
+                    bb, be, csv_file
+                ) is None
+            else:
+                raise ValueError(f'unknown engine: {self._engine}')
+        del bb, be, csv_file
+
+        # (a byte range that is only part of a file may hold no rows, e.g.,
+        # when all it holds is an empty final row, which is discarded; and in
+        # lenient mode, every row may have been discarded)
+        if self._byte_range is None and self._errors is None:
+            assert 0 < len(self), len(self)
+
+        return None
+
+
+    # The numpy engine finds the row and cell boundaries of each block of
+    # the byte range in bulk (see _numpy_engine.py), and builds the columns
+    # of the store from them in bulk, without a row or cell object; the
+    # (rare) rows that it marks irregular are parsed by the scalar parser
+    # instead.
+    def _parse_byte_range_with_numpy(self, bb, be, csv_file = None) -> None:
+
+        from . import _numpy_engine
+
+        qc = self._quote_character
+        dc = self._delimiter_character
+        assert qc in (0x22, 0x27), qc
+        assert dc in (0x2c, 0x09), dc
+
+        bs = self._block_size
+        assert isinstance(bs, int), type(bs)
+        assert 0 < bs, bs
+
+        # sr: source [i.e., the mapping of the csv file, if it is mapped]
+        sr = self._mapping
+        if sr is None:
+            if csv_file is None:
+                csv_file = self._open_csv_file(bb)
+        else:
+            assert isinstance(sr, mmap.mmap), type(sr)
+            assert csv_file is None
+
+        # bo : byte offset [in the csv file of the next block to read]
+        # co : carry offset [in the csv file of the first byte of cps]
+        # cps: carry pieces [i.e., the bytes of the row begun but not
+        #      completed in the previous blocks]
+        # cp : carry parity [i.e., the quote parity at the end of cps]
+        # (a row that spans many blocks is carried as pieces, and only
+        # scanned for its end, until a block completes it; see
+        # _numpy_engine.scan_parity; joining and indexing the carry with
+        # each block would take time quadratic in the size of the row)
+        bo  = bb
+        co  = bb
+        cps = []
+        cp  = 0
+        while True:
+            if be is None:
+                # (a compressed csv file is read until its end)
+                bl = csv_file.read(bs)
+                bo += len(bl)
+                if 0 == len(bl):
+                    be = bo
+            else:
+                n = min(bs, be - bo)
+                if sr is None:
+                    bl = csv_file.read(n)
+                else:
+                    bl = sr[bo:bo + n]
+                assert len(bl) == n, (len(bl), n)
+                bo += n
+                del n
+
+            # fb: [this is the] final block
+            fb = bo == be
+            if fb is False and 0 < len(cps):
+                # hr: [block] holds [the] row end
+                hr, cp = _numpy_engine.scan_parity(bl, qc, cp)
+                if hr is False:
+                    cps.append(bl)
+                    continue
+                del hr
+            cps.append(bl)
+            blk = b''.join(cps)
+            del bl
+
+            cut, index = _numpy_engine.index_rows(blk, qc, dc, fb)
+            if 0 < cut:
+                assert self._commit_indexed_rows(blk, co, cut, index) is None
+            del index
+
+            cps = [blk[cut:]] if cut < len(blk) else []
+            cp  = 0
+            if 0 < len(cps):
+                _, cp = _numpy_engine.scan_parity(cps[0], qc, 0)
+            co += cut
+            del blk, cut
+
+            if fb is True:
+                break
+            del fb
+
+        if csv_file is not None:
+            csv_file.close()
+        del csv_file
+
+        assert 0 == len(cps), len(cps)
+        assert bo == be, (bo, be)
+        assert co == be, (co, be)
+        del cps, cp, bo, co, sr
+
+        return None
+
+
+    # The runs of regular rows of an indexed block are committed in bulk, as
+    # stores built from the columns that the numpy engine finds (see
+    # _numpy_engine.get_columns), and the runs of irregular rows are parsed
+    # by the scalar parser, in the order of the rows.
+    def _commit_indexed_rows(self, blk, co, cut, index) -> None:
+
+        from . import _numpy_engine
+
+        sr = self._mapping
+
+        # rbs: row begins
+        # res: row ends
+        # irs: irregular rows
+        rbs, res, irs, _ = index
+
+        # k: row index [in the block]
+        k = 0
+        while k < len(rbs):
+
+            # kk: [the end of the] run [of rows that are all irregular, or
+            #     all regular]
+            kk = k
+            while kk < len(rbs) and (kk in irs) == (k in irs):
+                kk += 1
+
+            if k in irs:
+                re = int(res[kk - 1])
+                if re < cut:
+                    re += 1
+                # (the rows are read from the block, rather than from the
+                # csv file, which may be compressed, and so not seekable)
+                rb = int(rbs[k])
+                assert self._parse_byte_range(
+                    co + rb,
+                    co + re,
+                    None if sr is not None else io.BytesIO(blk[rb:re]),
+                ) is None
+                del rb, re
+            else:
+                store = self._CSVStore(
+                    source          = sr,
+                    quote_character = self._quote_character,
+                )
+                assert store.load_columns(
+                    _numpy_engine.get_columns(
+                        co, cut, index, k, kk,
+                        self._delimiter_character, sr is not None,
+                    )
+                ) is None
+                assert self._commit_store(store) is None
+                del store
+
+            k = kk
+            del kk
+
+        return None
+
+
+    # The byte range is read from the csv file, unless csv_file is given, in
+    # which case it is read from it (from its current position).
+    def _parse_byte_range(self, bb, be, csv_file = None) -> None:
+        assert self._paranoid in (True, False), self._paranoid
+        if self._paranoid is True:
+            return self._parse_byte_range_paranoid(bb, be, csv_file)
+        return self._parse_byte_range_fast(bb, be, csv_file)
+
+
+    def _parse_byte_range_fast(self, bb, be, csv_file = None) -> None:
+        commit_row = self._commit_row
+        for row in self._iter_byte_range_fast(bb, be, csv_file):
+            commit_row(row)
+        return None
+
+
+    # The fast parser implements the same grammar as the paranoid parser
+    # below, but with integer states, with the cell and row attributes set
+    # directly, and with the runs of bytes that do not change the state
+    # (the bytes of an unquoted or a quoted cell) found with a regex search
+    # or a find rather than walked one by one. The paranoid parser is kept as
+    # the checked reference that the fast parser is validated against.
+    #
+    # The fast parser is a generator, which yields each row as soon as it has
+    # been completed (see also iter_rows). If recycle is set, the row that
+    # it yields (and its cells) are reset and reused for the next row, rather
+    # than allocated, and so a row is valid only until the next one is.
+    def _iter_byte_range_fast(self, bb, be, csv_file = None, recycle = False):
+
+        assert isinstance(bb, int), type(bb)
+        # (the end is None if the csv file is compressed, in which case its
+        # decompressed size is known only once it has been read)
+        assert be is None or isinstance(be, int), type(be)
+        assert be is None or (0 <= bb and bb < be), (bb, be)
+
+        qc = self._quote_character
+        dc = self._delimiter_character
+        assert qc in (0x22, 0x27), qc
+        assert dc in (0x2c, 0x09), dc
+        SP = 0x20
+        LF = 0x0a
+        CR = 0x0d
+
+        bs = self._block_size
+        assert isinstance(bs, int), type(bs)
+        assert 0 < bs, bs
+
+        # qb : quote [character as] bytes
+        # sbp: special byte pattern [i.e., the bytes that end an unquoted
+        #      cell's run of content bytes]
+        qb  = bytes([qc])
+        sbp = re.compile(
+            b'[' + b''.join(re.escape(bytes([c])) for c in (qc, dc, LF, CR)) + b']'
+        )
+
+        STATE_BEGIN_ROW_READ                          = 0
+        STATE_BEGIN_CELL_READ                         = 1
+        STATE_END_READ_CR_LF                          = 2
+        STATE_CONTINUE_UNQUOTED_CELL_READ             = 3
+        STATE_CONTINUE_QUOTED_CELL_READ               = 4
+        STATE_CONTINUE_QUOTED_CELL_READ_CHAR_AFTER_QC = 5
+        STATE_CONTINUE_BURN_SPACES                    = 6
+        STATE_RESYNC                                  = 7
+
+        # (the names of the states, as reported by the paranoid parser)
+        STATE_NAMES = (
+            'state_begin_row_read',
+            'state_begin_cell_read',
+            'state_end_read_cr_lf',
+            'state_continue_unquoted_cell_read',
+            'state_continue_quoted_cell_read',
+            'state_continue_quoted_cell_read_char_after_qc',
+            'state_continue_burn_spaces',
+            'state_resync',
+        )
+
+        # sr: source [i.e., the mapping of the csv file, if it is mapped]
+        sr = self._mapping
+
+        CSVRow  = self._CSVRow
+        CSVCell = self._CSVRow._CSVCell
+
+        # (a recycled cell is the one at its column index in rcs, as each
+        # new cell is appended to the one row)
+        assert recycle in (True, False), recycle
+        if recycle is False:
+            new_row  = CSVRow
+            new_cell = CSVCell
+        else:
+            # rr : recycled row
+            # rcs: recycled cells
+            rr  = CSVRow()
+            rcs = []
+            def new_row() -> CSVRow:
+                rr.reset()
+                return rr
+            def new_cell(source) -> CSVCell:
+                j = len(rr._cells)
+                if j == len(rcs):
+                    rcs.append(CSVCell(source))
+                else:
+                    rcs[j].reset(source)
+                return rcs[j]
+
+        # pp    : parser profile [if the parse is profiled; see _profile.py]
+        # errors: error log [if the parse is lenient; see _errors.py]
+        pp     = self._profile
+        errors = self._errors
+
+        # bl : block [of bytes]
+        # off: offset [in the csv file of bl[0]]
+        # i  : [block-local] index [of the next byte to consume]
+        # n  : [block-local index of the] end [of bl]
+        # bo : byte offset [in the csv file of the next block to read]
+        if sr is None:
+            if csv_file is None:
+                csv_file = self._open_csv_file(bb)
+            bl  = b''
+            off = bb
+            i   = 0
+            n   = 0
+            bo  = bb
+        else:
+            # (the mapping is walked in place, as a single block)
+            assert isinstance(sr, mmap.mmap), type(sr)
+            assert csv_file is None
+            bl  = sr
+            off = 0
+            i   = bb
+            n   = be
+            bo  = be
+
+        # cps: content pieces [of the current cell; slices of the blocks,
+        #      or, if the csv file is mapped, (begin, end) offsets in it]
+        # rbo: row begin offset [in the csv file, of the current row]
+        state = STATE_BEGIN_ROW_READ
+        row   = None
+        cell  = None
+        cps   = []
+        rbo   = bb
+
+        # ps: previous state [i.e., the state at the begin of the last pass]
+        # pi: previous index [i.e., the index at the begin of the last pass]
+        ps = state
+        pi = i
+
+        while True:
+
+            # (a pass is counted only if it consumed bytes or changed the
+            # state; a block refill does neither, and so is not a pass,
+            # and the counts do not depend on the block size)
+            if pp is not None and (i != pi or ps != state):
+                pp.count_pass(STATE_NAMES[ps], STATE_NAMES[state], i - pi)
+                ps = state
+                pi = i
+
+            if i == n:
+                if be is None or bo < be:
+                    bl  = csv_file.read(bs if be is None else min(bs, be - bo))
+                    off = bo
+                    i   = 0
+                    pi  = 0
+                    n   = len(bl)
+                    bo += n
+                    if 0 == n:
+                        # (the end of a compressed csv file)
+                        assert be is None, (bo, be)
+                        be = bo
+                        break
+                    continue
+                break
+
+            # (a csv syntax error, in lenient mode, is recorded, and the
+            # parse resynchronizes at the next line feed; see _errors.py)
+            try:
+
+                if STATE_CONTINUE_UNQUOTED_CELL_READ == state:
+
+                    m = sbp.search(bl, i, n)
+                    j = n if m is None else m.start()
+                    if i < j:
+                        cps.append(bl[i:j] if sr is None else (i, j))
+                    i = j
+                    if j == n:
+                        continue
+                    b = bl[j]
+
+                    if qc == b:
+                        # (only spaces may precede a quoted first cell)
+                        if 1 != len(row._cells):
+                            raise CSVSyntaxError(
+                                f'byteidx={off + i}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+                            )
+                        if sr is None: cc = b''.join(cps)
+                        else         : cc = b''.join(sr[x:y] for x, y in cps)
+                        if len(cc) != cc.count(b' '):
+                            raise CSVSyntaxError(
+                                f'byteidx={off + i}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+                            )
+                        del cc
+                        cps = []
+                        cell._quoted = True
+                        cell._content_counts = None
+                        row._leading_spaces_are_present = True
+                        i += 1
+                        state = STATE_CONTINUE_QUOTED_CELL_READ
+                        continue
+
+                    if   dc == b: sd = dc; ne = None       ; state = STATE_BEGIN_CELL_READ
+                    elif LF == b: sd = -1; ne = b'\x0a'    ; state = STATE_BEGIN_ROW_READ
+                    else        : sd = -1; ne = b'\x0d\x0a'; state = STATE_END_READ_CR_LF
+                    i += 1
+
+                elif STATE_CONTINUE_QUOTED_CELL_READ == state:
+
+                    j = bl.find(qb, i, n)
+                    if -1 == j:
+                        if i < n:
+                            cps.append(bl[i:n] if sr is None else (i, n))
+                        i = n
+                        continue
+                    if i < j:
+                        cps.append(bl[i:j] if sr is None else (i, j))
+                    i = j + 1
+                    state = STATE_CONTINUE_QUOTED_CELL_READ_CHAR_AFTER_QC
+                    continue
+
+                elif state in (STATE_BEGIN_ROW_READ, STATE_BEGIN_CELL_READ):
+
+                    if STATE_BEGIN_ROW_READ == state:
+                        row = new_row()
+                        rbo = off + i
+                    cell = new_cell(sr)
+                    row._cells.append(cell)
+                    b = bl[i]
+
+                    if   qc == b:
+                        cell._quoted = True
+                        i += 1
+                        state = STATE_CONTINUE_QUOTED_CELL_READ
+                        continue
+
+                    cell._quoted = False
+                    cell._content_counts = NO_CONTENT_COUNTS
+                    if   dc == b: sd = dc; ne = None       ; state = STATE_BEGIN_CELL_READ
+                    elif LF == b: sd = -1; ne = b'\x0a'    ; state = STATE_BEGIN_ROW_READ
+                    elif CR == b: sd = -1; ne = b'\x0d\x0a'; state = STATE_END_READ_CR_LF
+                    else:
+                        # (the byte is consumed by the unquoted cell's run)
+                        state = STATE_CONTINUE_UNQUOTED_CELL_READ
+                        continue
+                    i += 1
+
+                elif STATE_CONTINUE_QUOTED_CELL_READ_CHAR_AFTER_QC == state:
+
+                    b = bl[i]
+
+                    if qc == b:
+                        # (a doubled quote character is one quote character of
+                        # content)
+                        cps.append(bl[i:i + 1] if sr is None else (i, i + 1))
+                        i += 1
+                        state = STATE_CONTINUE_QUOTED_CELL_READ
+                        continue
+
+                    if   dc == b: sd = dc; ne = None       ; state = STATE_BEGIN_CELL_READ
+                    elif SP == b: sd = SP; ne = None       ; state = STATE_CONTINUE_BURN_SPACES
+                    elif LF == b: sd = -1; ne = b'\x0a'    ; state = STATE_BEGIN_ROW_READ
+                    elif CR == b: sd = -1; ne = b'\x0d\x0a'; state = STATE_END_READ_CR_LF
+                    else        : raise CSVSyntaxError(
+                        f'csv syntax error: byteidx={off + i}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+                    )
+                    i += 1
+
+                elif STATE_CONTINUE_BURN_SPACES == state:
+
+                    b = bl[i]
+
+                    if   qc == b:
+                        cell = new_cell(sr)
+                        cell._quoted = True
+                        row._cells.append(cell)
+                        i += 1
+                        state = STATE_CONTINUE_QUOTED_CELL_READ
+                    elif SP == b:
+                        i += 1
+                    elif LF == b:
+                        row._newline_encoding = b'\x0a'
+                        row._size = off + i + 1 - rbo
+                        yield row
+                        row = None
+                        i += 1
+                        state = STATE_BEGIN_ROW_READ
+                    elif CR == b:
+                        row._newline_encoding = b'\x0d\x0a'
+                        i += 1
+                        state = STATE_END_READ_CR_LF
+                    else: raise CSVSyntaxError(
+                        f'csv syntax error: byteidx={off + i}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+                    )
+                    continue
+
+                elif STATE_END_READ_CR_LF == state:
+
+                    b = bl[i]
+
+                    if LF != b:
+                        raise CSVSyntaxError(
+                            f'byteidx={off + i}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+                        )
+                    assert b'\x0d\x0a' == row._newline_encoding
+                    row._size = off + i + 1 - rbo
+                    yield row
+                    row = None
+                    i += 1
+                    state = STATE_BEGIN_ROW_READ
+                    continue
+
+                elif STATE_RESYNC == state:
+
+                    # (the rest of the row in which an error occurred is
+                    # skipped, up to the next line feed)
+                    j = bl.find(b'\x0a', i, n)
+                    if -1 == j:
+                        i = n
+                        continue
+                    i = j + 1
+                    assert errors.skip(off + i - rbo) is None
+                    state = STATE_BEGIN_ROW_READ
+                    continue
+
+                else:
+                    raise RuntimeError(
+                        f'unexpected state: byteidx={off + i}, state={state}'
+                    )
+
+                # The current cell has ended (and with it, if ne is set, the
+                # current row): its content pieces are joined and frozen.
+                if sr is None:
+                    cell._content = b''.join(cps)
+                elif 1 == len(cps):
+                    cell._content = b''
+                    cell._begin, cell._end = cps[0]
+                else:
+                    cell._content = b''.join(sr[x:y] for x, y in cps)
+                cell._subsequent_delimiter = sd
+                cps = []
+                if ne is not None:
+                    row._newline_encoding = ne
+                    if LF == ne[-1]:
+                        # (a row ended by a CR LF is committed at the LF)
+                        if 1 == len(ne):
+                            row._size = off + i - rbo
+                            yield row
+                            row = None
+                del sd, ne
+
+            except CSVSyntaxError:
+                if errors is None:
+                    raise
+                assert errors.add(
+                    off + i, len(self), STATE_NAMES[state], bl[i],
+                ) is None
+                row   = None
+                cell  = None
+                cps   = []
+                i    += 1
+                state = STATE_RESYNC
+
+        # bi: byte index [in the csv file, of the end of the file]
+        bi = off + i
+        assert bi == be, (bi, be)
+        b = -1
+
+        # The end of the file ends the current cell and row, as a newline
+        # would; except that a final row that holds only an empty cell is
+        # discarded.
+        if   state in (STATE_CONTINUE_QUOTED_CELL_READ,
+                       STATE_END_READ_CR_LF) and errors is not None:
+            assert errors.add(bi, len(self), STATE_NAMES[state], b) is None
+            assert errors.skip(bi - rbo) is None
+            row = None
+        elif STATE_CONTINUE_QUOTED_CELL_READ == state:
+            raise CSVSyntaxError(
+                f'csv syntax error: byteidx={bi}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+            )
+        elif STATE_END_READ_CR_LF == state:
+            raise CSVSyntaxError(
+                f'byteidx={bi}, state={STATE_NAMES[state]}, byte=0x{b:2x}'
+            )
+        elif STATE_BEGIN_ROW_READ == state:
+            row = None
+        elif STATE_RESYNC == state:
+            assert errors.skip(bi - rbo) is None
+            row = None
+        elif STATE_CONTINUE_BURN_SPACES == state:
+            pass
+        else:
+            if STATE_BEGIN_CELL_READ == state:
+                cell = new_cell(sr)
+                cell._quoted = False
+                cell._content_counts = NO_CONTENT_COUNTS
+                row._cells.append(cell)
+            if sr is None:
+                cell._content = b''.join(cps)
+            elif 1 == len(cps):
+                cell._content = b''
+                cell._begin, cell._end = cps[0]
+            else:
+                cell._content = b''.join(sr[x:y] for x, y in cps)
+            cell._subsequent_delimiter = -1
+        if row is not None:
+            row._newline_encoding = b''
+            row._size = bi - rbo
+            if not (1 == len(row._cells) and 0 == len(row._cells[0])):
+                yield row
+        del row, cell, cps, state, rbo, ps, pi, pp, errors
+
+        if csv_file is not None:
+            csv_file.close()
+        del csv_file, bl, sr
+
+        return None
+
+
+    def _parse_byte_range_paranoid(self, bb, be, csv_file = None) -> None:
+
+        assert isinstance(bb, int), type(bb)
+        # (the end is None if the csv file is compressed, in which case its
+        # decompressed size is known only once it has been read)
+        assert be is None or isinstance(be, int), type(be)
+        assert be is None or (0 <= bb and bb < be), (bb, be)
         
-        csv_file = open(self._csv_file_path, 'rb')
+        # sr: source [i.e., the mapping of the csv file, if it is mapped]
+        sr = self._mapping
+        if sr is None:
+            if csv_file is None:
+                csv_file = self._open_csv_file(bb)
+        else:
+            assert isinstance(sr, mmap.mmap), type(sr)
+            assert csv_file is None
+            assert len(sr) == os.path.getsize(self._csv_file_path), \
+                (len(sr), os.path.getsize(self._csv_file_path))
+            csv_file = None
+
+        # bs: block size
+        bs = self._block_size
+        assert isinstance(bs, int), type(bs)
+        assert 0 < bs, bs
         
         assert 0x22 == 34
         assert 0x22 == ord('"')
@@ -266,20 +1531,46 @@ class CSVTree:
         
         state = STATE_BEGIN_ROW_READ
 
-        # bi: byte index
-        bi = -1
+        # bi : byte index [in the csv file]
+        # rbi: row begin [byte] index [in the csv file, of the current row]
+        bi  = bb - 1
+        rbi = bb
+
+        # bl : block [of bytes read from the csv file]
+        # bli: block-local byte index [of the next byte to consume]
+        # bo : byte offset [in the csv file of the next block to read]
+        bl  = b''
+        bli = 0
+        bo  = bb
+
+        # pp: parser profile [if the parse is profiled; see _profile.py]
+        # ps: previous state [i.e., the state before the byte a]
+        pp = self._profile
+        ps = state
         
         b = None 
         while True:
             a = b
-            b = csv_file.read(1)
-            assert isinstance(b, bytes), type(b)
-            assert len(b) in (0, 1), len(b)
-            if 0 == len(b):
+            if pp is not None and a is not None:
+                assert pp.count_pass(ps, state, 0 if EOF == a else 1) is None
+                ps = state
+            if len(bl) == bli:
+                if sr is None:
+                    if be is None: bl = csv_file.read(bs)
+                    else         : bl = csv_file.read(min(bs, be - bo))
+                    assert isinstance(bl, bytes), type(bl)
+                    assert len(bl) <= bs, (len(bl), bs)
+                else:
+                    # (the mapping is walked in place, as a single block)
+                    bl = memoryview(sr)[bo:be]
+                bo += len(bl)
+                bli = 0
+            if 0 == len(bl):
                 b = EOF
             else:
-                assert 1 == len(b)
-                b = b[0]
+                assert bli < len(bl), (bli, len(bl))
+                b = bl[bli]
+                bli += 1
             assert isinstance(b, int), type(b)
             assert -1 <= b and b < 256, b
 
@@ -290,6 +1581,7 @@ class CSVTree:
 
                 assert 'row' not in locals()
                 row = self._get_row(-1)
+                row._size = bi - rbi
                 
                 assert 0 < len(row)
                 if 1 == len(row):
@@ -300,6 +1592,8 @@ class CSVTree:
                     del cell
                 del row
 
+                assert self._flush_rows() is None
+
                 break
             
             bi += 1
@@ -314,10 +1608,14 @@ class CSVTree:
                 # EOF: end of file -1
   
                 if STATE_BEGIN_ROW_READ == state: 
+                    # (the previous row, if any, ends where this one begins)
+                    if 1 == len(self._rows):
+                        self._get_row(-1)._size = bi - rbi
+                    rbi = bi
                     assert self._append_row() is None
                 assert 'row' not in locals()
                 row = self._get_row(-1)
-                assert row.append_cell() is None
+                assert row.append_cell(sr) is None
                 assert 'cell' not in locals()
                 cell = row.get_cell(-1)
 
@@ -338,7 +1636,7 @@ class CSVTree:
 
                 assert ab in (True, False), ab
                 if ab is True:
-                    assert cell.append_byte(b) is None
+                    assert cell.append_byte(b, bi) is None
                 del ab
 
                 assert qa in (True, False), qa
@@ -379,13 +1677,13 @@ class CSVTree:
                     row = self._get_row(-1)
                     assert 1 <= len(row)
                     assert row.newline_encoding_is_set() is True
-                    assert b'\x0a\x0d' == row.get_newline_encoding()
+                    assert b'\x0d\x0a' == row.get_newline_encoding()
                     del row
 
                     state = STATE_BEGIN_ROW_READ
 
                 else:
-                    raise ValueError(
+                    raise CSVSyntaxError(
                         f'byteidx={bi}, state={state}, byte=0x{b:2x}'
                     )
  
@@ -400,7 +1698,7 @@ class CSVTree:
                     assert 1 <= len(row)
 
                     if 1 != len(row):
-                        raise ValueError(
+                        raise CSVSyntaxError(
                             f'byteidx={bi}, state={state}, byte=0x{b:2x}'
                         )
 
@@ -414,7 +1712,7 @@ class CSVTree:
                     assert 1 <= len(cell)
 
                     if cell.content_is_only_spaces() is False:
-                        raise ValueError(
+                        raise CSVSyntaxError(
                             f'byteidx={bi}, state={state}, byte=0x{b:2x}'
                         )
 
@@ -459,7 +1757,7 @@ class CSVTree:
 
                     assert ab in (True, False), ab
                     if ab is True:
-                        cell.append_byte(b)
+                        cell.append_byte(b, bi)
                     del ab
 
                     assert cell.subsequent_delimiter_is_set() is False
@@ -507,7 +1805,7 @@ class CSVTree:
                 # EOF: end of file
                 elif EOF == b:
                     
-                    raise ValueError(
+                    raise CSVSyntaxError(
                         f'csv syntax error: byteidx={bi}, state={state}, byte=0x{b:2x}'
                     )
 
@@ -529,7 +1827,7 @@ class CSVTree:
 
                     assert cell.subsequent_delimiter_is_set() is False
 
-                    assert cell.append_byte(b) is None
+                    assert cell.append_byte(b, bi) is None
                     del cell
     
                     state = STATE_CONTINUE_QUOTED_CELL_READ
@@ -558,13 +1856,13 @@ class CSVTree:
                 elif LF  == b: ab = False; sd = -1  ; ne = b'\x0a'
                 elif CR  == b: ab = False; sd = -1  ; ne = b'\x0d\x0a'
                 elif EOF == b: ab = False; sd = -1  ; ne = b''
-                else         : raise ValueError(
+                else         : raise CSVSyntaxError(
                     f'csv syntax error: byteidx={bi}, state={state}, byte=0x{b:2x}'
                 )
 
                 assert ab in (True, False), ab
                 if ab is True:
-                    assert cell.append_byte(b) is None
+                    assert cell.append_byte(b, bi) is None
                 del ab
 
                 assert cell.subsequent_delimiter_is_set() is False
@@ -600,7 +1898,7 @@ class CSVTree:
                     assert 1 <= len(row)
                     assert row.newline_encoding_is_set() is False
                     assert row.leading_spaces_are_present() in (True, False)
-                    assert row.append_cell() is None
+                    assert row.append_cell(sr) is None
 
                     assert 'bell' not in locals()
                     assert 'cell' not in locals()
@@ -647,7 +1945,7 @@ class CSVTree:
                     elif LF  == b: ne = b'\x0a'
                     elif CR  == b: ne = b'\x0d\x0a'
                     elif EOF == b: ne = b''
-                    else         : raise ValueError(
+                    else         : raise CSVSyntaxError(
                         f'csv syntax error: byteidx={bi}, state={state}, byte=0x{b:2x}'
                     )
 
@@ -671,178 +1969,1139 @@ class CSVTree:
                 )
     
 
-        csv_file.close()
+        if csv_file is not None:
+            csv_file.close()
         del csv_file
+        # (the decompressed size of a compressed csv file is the number of
+        # bytes that were read from it)
+        if be is None:
+            be = bo
+        assert bo == be, (bo, be)
+        del bl, bli, bo, bs, sr
 
         # bi: bytes index [in the csv file]
-        assert bi == os.path.getsize(self._csv_file_path), \
-            (bi, os.path.getsize(self._csv_file_path))
-        del bi
+        assert bi == be, (bi, be)
+        del bi, rbi, bb, be
 
         assert STATE_EOF == state, state
-        del state
-   
-        assert 0 < len(self), len(self)
+        del state, ps, pp
     
         return None
 
 
+    # Opens the csv file for reading from byte bb; a compressed csv file is
+    # read through a decompressor, running in a thread of its own (see
+    # _compression.py), and only from its begin, as is a stream (see
+    # _stream.py), which can moreover only be read once.
+    def _open_csv_file(self, bb):
+        if self._stream is not None:
+            assert 0 == bb, bb
+            stream = self._stream
+            self._stream = StreamReader(())
+            return stream
+        if self._compression is None:
+            csv_file = open(self._csv_file_path, 'rb')
+            csv_file.seek(bb)
+            return csv_file
+        assert 0 == bb, bb
+        return ThreadedReader(
+            open_decompressed(self._csv_file_path, self._compression),
+            self._block_size,
+        )
+
+
+    # The mapping stays open for as long as the tree (or any cell content
+    # taken from it) is alive.
+    def _map_csv_file(self) -> mmap.mmap:
+        assert self._use_mmap in (True, False), self._use_mmap
+        if self._use_mmap is False:
+            return None
+        if self._stream is not None:
+            raise ValueError('a csv stream cannot be memory-mapped')
+        if self._compression is not None:
+            raise ValueError('a compressed csv file cannot be memory-mapped')
+        assert os.path.isfile(self._csv_file_path), self._csv_file_path
+        assert 0 < os.path.getsize(self._csv_file_path), self._csv_file_path
+        with open(self._csv_file_path, 'rb') as csv_file:
+            return mmap.mmap(csv_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+
+    def _get_byte_range(self) -> tuple:
+        if self._stream is not None or self._compression is not None:
+            if self._byte_range is not None:
+                raise ValueError(
+                    'a byte range of a compressed csv file or of a csv ' + \
+                    'stream cannot be parsed'
+                )
+            return (0, None)
+        size = os.path.getsize(self._csv_file_path)
+        if self._byte_range is None:
+            return (0, size)
+        assert isinstance(self._byte_range, tuple), type(self._byte_range)
+        assert 2 == len(self._byte_range), self._byte_range
+        bb, be = self._byte_range
+        assert isinstance(bb, int), type(bb)
+        assert isinstance(be, int), type(be)
+        assert 0 <= bb and bb < be and be <= size, (bb, be, size)
+        return (bb, be)
+
+
+    # The file is split into byte ranges that each begin at a row boundary
+    # (see _chunks.py), the ranges are parsed in worker processes, and the
+    # per-range results are merged in file order.
+    def _parse_csv_file_in_parallel(self) -> None:
+
+        assert isinstance(self._jobs, int), type(self._jobs)
+        assert 1 < self._jobs, self._jobs
+        assert 0 < os.path.getsize(self._csv_file_path), self._csv_file_path
+
+        bb, be = self._get_byte_range()
+
+        with ProcessPoolExecutor(max_workers = self._jobs) as executor:
+            # brs: byte ranges
+            brs = split_csv_file(
+                executor        = executor,
+                csv_file_path   = self._csv_file_path,
+                begin           = bb,
+                end             = be,
+                n_chunks        = self._jobs,
+                quote_character = self._quote_character,
+                block_size      = self._block_size,
+            )
+            futures = [
+                executor.submit(
+                    parse_byte_range,
+                    type(self),
+                    {
+                        'csv_file_path'      : self._csv_file_path,
+                        'quote_character'    : self._quote_character,
+                        'delimiter_character': self._delimiter_character,
+                        'block_size'         : self._block_size,
+                        'byte_range'         : br,
+                        'use_mmap'           : self._use_mmap,
+                        'engine'             : self._engine,
+                        'paranoid'           : self._paranoid,
+                        'profile'            : None \
+                            if self._profile is None else ParserProfile(),
+                        'distinct_precision' : self._distinct_precision,
+                    },
+                )
+                for br in brs
+            ]
+            del brs
+            for future in futures:
+                # pr: parse result
+                # pp: parser profile [of the worker]
+                pr, pp = future.result()
+                assert self._merge_parse_result(pr) is None
+                if pp is not None:
+                    assert self._profile.merge(pp) is None
+                del pr, pp
+            del futures
+
+        if self._byte_range is None:
+            assert 0 < len(self), len(self)
+
+        return None
+
+
+    def _get_parse_result(self) -> _CSVStore:
+        return self._store
+
+
+    def _merge_parse_result(self, store) -> None:
+        return self._store.extend(store)
+
+
     def __init__(
         self,
         csv_file_path,
         quote_character     = 0x22,
         delimiter_character = 0x2c,
+        block_size          = 1 << 20,
+        jobs                = 1,
+        byte_range          = None,
+        use_mmap            = False,
+        engine              = 'python',
+        paranoid            = False,
+        profile             = None,
+        lenient             = False,
+        distinct_precision  = None,
     ):
         self._csv_file_path       = csv_file_path
         self._quote_character     = quote_character
         self._delimiter_character = delimiter_character
+        self._block_size          = block_size
+        self._jobs                = jobs
+        self._byte_range          = byte_range
+        self._use_mmap            = use_mmap
+        self._engine              = engine
+        self._paranoid            = paranoid
+        self._profile             = profile
+        assert profile is None or isinstance(profile, ParserProfile), \
+            type(profile)
+        # (in lenient mode, the csv syntax errors are logged, rather than
+        # raised; see _errors.py; the numpy engine, and a parse in parallel,
+        # find the rows by the parity of the quote characters, which an error
+        # throws off, and so only the fast parser, in a single process,
+        # resynchronizes)
+        assert lenient in (True, False), lenient
+        if lenient is True and paranoid is True:
+            raise ValueError('the paranoid parser cannot parse leniently')
+        if lenient is True and 'python' != engine:
+            raise ValueError(f'the {engine} engine cannot parse leniently')
+        if lenient is True and 1 != jobs:
+            raise ValueError('a parse in parallel cannot be lenient')
+        self._errors              = ErrorLog() if lenient is True else None
+        self._distinct_precision  = distinct_precision
+        # (csv_file_path may instead be a stream; see _stream.py)
+        if is_stream(csv_file_path):
+            self._stream          = StreamReader(csv_file_path)
+            self._compression     = None
+        else:
+            self._stream          = None
+            self._compression     = detect_compression(csv_file_path)
+        self._mapping             = self._map_csv_file()
         self._rows                = []
-        self._parse_csv_file()
+        self._tabulated           = None
+        self._store               = self._CSVStore(
+            source          = self._mapping,
+            quote_character = quote_character,
+        )
+        assert isinstance(jobs, int), type(jobs)
+        assert 1 <= jobs, jobs
+        # (a compressed csv file or a stream can only be read from its begin,
+        # and so is not split into chunks)
+        with self._time_phase('parse'):
+            if 1 == jobs or self._stream is not None or \
+               self._compression is not None:
+                self._parse_csv_file()
+            else:
+                self._parse_csv_file_in_parallel()
+
+
+    # The csv file is closed on exit, unless there is none (i.e., the csv
+    # file is mapped).
+    @staticmethod
+    def _closing(csv_file):
+        if csv_file is None:
+            return contextlib.nullcontext()
+        return contextlib.closing(csv_file)
+
+
+    # The phase is timed if the tree is profiled (see _profile.py).
+    def _time_phase(self, phase):
+        if self._profile is None:
+            return contextlib.nullcontext()
+        return self._profile.time_phase(phase)
+
+
+    # Parses only the rows [rowidx_begin, rowidx_end) of the csv file, as the
+    # byte range that they span, found with the row index of the file (see
+    # _rowindex.py), which looks up the begins of the two rows alone; if the
+    # file has no (up to date) row index, the row begins are found with a
+    # scan up to the row rowidx_end, which is still much cheaper than a
+    # parse. The rows of the tree are indexed from 0.
+    @classmethod
+    def from_row_range(cls, csv_file_path, rowidx_begin, rowidx_end,
+                       index_path = None, **kwargs):
+
+        qc = kwargs.get('quote_character', 0x22)
+        bs = kwargs.get('block_size',      1 << 20)
+        assert 'byte_range' not in kwargs, kwargs
+        assert isinstance(rowidx_begin, int), type(rowidx_begin)
+        assert isinstance(rowidx_end,   int), type(rowidx_end)
+
+        # rbs: row begins
+        rbs = load_row_index(csv_file_path, index_path, qc)
+        if rbs is None:
+            rbs = build_row_index(csv_file_path, qc, bs, max(0, rowidx_end))
+        if not (0 <= rowidx_begin and rowidx_begin < rowidx_end and
+                rowidx_end <= len(rbs)):
+            raise IndexError((rowidx_begin, rowidx_end, len(rbs)))
+
+        bb = rbs[rowidx_begin]
+        if rowidx_end < len(rbs): be = rbs[rowidx_end]
+        else                    : be = os.path.getsize(csv_file_path)
+        del rbs
+
+        return cls(csv_file_path, byte_range = (bb, be), **kwargs)
 
 
     def __len__(self) -> int:
-        return len(self._rows)
+        return len(self._store)
+
+
+    def get_row(self, rowidx) -> _CSVStore._CSVRowView:
+        return self._store.get_row(rowidx)
+
+
+    # Returns the number of bytes of the csv file that each row spans (the
+    # store's own array; see _CSVStore.get_row_sizes).
+    def get_row_sizes(self) -> array:
+        return self._store.get_row_sizes()
+
+
+    # Returns the byte offset in the csv file at which each row begins (as a
+    # row index records them; see _rowindex.py).
+    def get_row_begins(self) -> array:
+        # rb: row begin
+        rb = self._get_byte_range()[0]
+        rbs = array('Q')
+        for rs in self._store.get_row_sizes():
+            rbs.append(rb)
+            rb += rs
+        return rbs
+
+
+    # Returns the error log of a lenient parse, or None.
+    def get_errors(self) -> ErrorLog:
+        return self._errors
+
+
+    # (the tree does not change once it has been parsed, so its statistics
+    # are tabulated once, and kept)
+    def _tabulate_statistics(self) -> 'CSVStatistics':
+
+        if self._tabulated is not None:
+            return self._tabulated
+
+        # csvs: csv statistics
+        csvs = CSVStatistics(
+            quote_character     = self._quote_character,
+            delimiter_character = self._delimiter_character,
+            distinct_precision  = self._distinct_precision,
+        )
+        # (the rows are added from the arrays of the store, rather than
+        # through a view of each; see CSVStatistics.add_store)
+        assert csvs.add_store(self._store) is None
+        self._tabulated = csvs
+
+        return csvs
 
 
     def get_statistics(self) -> dict:
+        with self._time_phase('statistics'):
+            return self._tabulate_statistics().get_statistics()
+
+
+    def get_column_statistics(self) -> list:
+        with self._time_phase('statistics'):
+            return self._tabulate_statistics().get_column_statistics()
+
+
+    def get_n_cells_in_row_histogram(self) -> list:
+        with self._time_phase('statistics'):
+            return self._tabulate_statistics().get_n_cells_in_row_histogram()
+
+
+
+class CSVStatistics:
+    def __init__(
+        self,
+        quote_character     = 0x22,
+        delimiter_character = 0x2c,
+        distinct_precision  = None,
+    ):
+        assert quote_character     in (0x22, 0x27), quote_character
+        assert delimiter_character in (0x2c, 0x09), delimiter_character
+        self._quote_character     = quote_character
+        self._delimiter_character = delimiter_character
+        self._distinct_precision  = distinct_precision
+
+        self._n_rows                          = 0
+        self._n_rows_ended_by_lf              = 0
+        self._n_rows_ended_by_crlf            = 0
+        self._n_rows_ended_by_eof             = 0
+        self._n_rows_with_leading_spaces      = 0
+        self._n_rows_with_trailing_spaces     = 0
+        self._n_cells                         = 0
+        self._n_unquoted_cells                = 0
+        self._n_quoted_cells                  = 0
+        self._n_cells_containing_a_quote_char = 0
+        self._n_cells_containing_a_lf         = 0
+        self._n_cells_containing_a_crlf       = 0
+        self._n_conventional_cell_delimiters  = 0
+        self._n_spaces_cell_delimiters        = 0
+        self._n_cells_in_row_max              = float('-inf')
+        self._n_cells_in_row_min              = float('inf')
+        self._first_rowidx_with_max_n_cells   = -1
+        self._first_rowidx_with_min_n_cells   = -1
+        self._n_quote_chars_inside_cells      = 0
+        self._n_lfs_inside_cells              = 0
+        self._n_crlfs_inside_cells            = 0
+
+        # The distributions: the exact number of rows of each number of
+        # cells, and sketches of the quantiles of the content lengths of the
+        # cells and of the sizes (in bytes, including the newline) of the
+        # rows (see _sketch.py).
+        self._n_rows_by_n_cells               = {}
+        self._cell_content_length_sketch      = QuantileSketch()
+        self._row_size_sketch                 = QuantileSketch()
+
+        # The sketches of the numbers of distinct rows, and of distinct
+        # cells in each column (see _sketch.py); they are opt-in (a distinct
+        # precision of None, the default, turns them off), as hashing each
+        # cell is not free, and a sketch of each column is 2**precision
+        # bytes, which every worker, cache and checkpoint carries.
+        self._distinct_rows_sketch            = None \
+            if distinct_precision is None else HyperLogLog(distinct_precision)
+        self._column_distinct_cells_sketches  = []
+
+        # The per-column statistics: the j-th element of each list is of the
+        # j-th cells of the rows (so they grow with the widest row, and not
+        # with the number of cells).
+        self._column_n_cells                  = []
+        self._column_n_quoted_cells           = []
+        self._column_n_empty_cells            = []
+        self._column_content_length_sum       = []
+        self._column_content_length_max       = []
+        self._column_n_lfs_inside_cells       = []
+        self._column_n_crlfs_inside_cells     = []
+
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+
+    def get_dialect(self) -> tuple:
+        return (self._quote_character, self._delimiter_character)
+
+
+    def get_distinct_precision(self) -> int:
+        return self._distinct_precision
+
+
+    def _grow_columns(self, width) -> None:
+        # gw: grow width
+        gw = width - len(self._column_n_cells)
+        if gw <= 0:
+            return None
+        for cs in (
+            self._column_n_cells,
+            self._column_n_quoted_cells,
+            self._column_n_empty_cells,
+            self._column_content_length_sum,
+            self._column_content_length_max,
+            self._column_n_lfs_inside_cells,
+            self._column_n_crlfs_inside_cells,
+        ):
+            cs.extend([0] * gw)
+        self._column_distinct_cells_sketches.extend(
+            None if self._distinct_precision is None
+            else HyperLogLog(self._distinct_precision)
+            for _ in range(gw)
+        )
+        return None
+
+
+    def add_row(self, row) -> None:
 
         qc = self._quote_character
         dc = self._delimiter_character
 
+        # qb: quote [character as] bytes
+        qb = bytes([qc])
+
         assert 0x20 == ord(' ')
         SP = 0x20
 
-        n_rows                          = len(self)
-        n_rows_ended_by_lf              = 0
-        n_rows_ended_by_crlf            = 0
-        n_rows_ended_by_eof             = 0
-        n_rows_with_leading_spaces      = 0
-        n_rows_with_trailing_spaces     = 0
-        n_cells                         = 0
-        n_unquoted_cells                = 0
-        n_quoted_cells                  = 0
-        n_cells_containing_a_quote_char = 0
-        n_cells_containing_a_lf         = 0
-        n_cells_containing_a_crlf       = 0
-        n_conventional_cell_delimiters  = 0
-        n_spaces_cell_delimiters        = 0
-        n_cells_in_row_max              = float('-inf')
-        n_cells_in_row_min              = float('inf')
-        first_rowidx_with_max_n_cells   = -1
-        first_rowidx_with_min_n_cells   = -1
-        n_quote_chars_inside_cells      = 0
-        n_lfs_inside_cells              = 0
-        n_crlfs_inside_cells            = 0
-
-        for i in range(n_rows):
-            row = self._get_row(i)
-
-            ne = row.get_newline_encoding()
-            if   b'\x0a'     == ne: n_rows_ended_by_lf   += 1
-            elif b'\x0d\x0a' == ne: n_rows_ended_by_crlf += 1
-            elif b''         == ne: n_rows_ended_by_eof  += 1
-            else                  : raise RuntimeError()
-            del ne
-
-            if row.leading_spaces_are_present():
-                n_rows_with_leading_spaces += 1
+        # i: row index [of row]
+        i = self._n_rows
+        self._n_rows += 1
+
+        ne = row.get_newline_encoding()
+        if   b'\x0a'     == ne: self._n_rows_ended_by_lf   += 1
+        elif b'\x0d\x0a' == ne: self._n_rows_ended_by_crlf += 1
+        elif b''         == ne: self._n_rows_ended_by_eof  += 1
+        else                  : raise RuntimeError()
+        del ne
+
+        if row.leading_spaces_are_present():
+            self._n_rows_with_leading_spaces += 1
+
+        # sd: subsequent delimiter
+        sd = row.get_cell(-1).get_subsequent_delimiter()
+        assert 0x20 == b' '[0]
+        assert 0x20 == ord(' ')
+        if   0x20 == sd: self._n_rows_with_trailing_spaces += 1
+        elif   -1 == sd: pass
+        else           : raise RuntimeError()
+        del sd
+
+        self._n_cells += len(row)
+
+        self._n_rows_by_n_cells[len(row)] = \
+            self._n_rows_by_n_cells.get(len(row), 0) + 1
+        assert self._row_size_sketch.add(row.get_size()) is None
+        # ccls: cell content length sketch
+        # dcss: distinct cells sketches [of the columns]
+        # drs : distinct rows sketch
+        # rh  : row hash
+        ccls = self._cell_content_length_sketch
+        dcss = self._column_distinct_cells_sketches
+        drs  = self._distinct_rows_sketch
+        rh   = 0
+
+        assert self._grow_columns(len(row)) is None
+
+        if len(row) < self._n_cells_in_row_min:
+            self._n_cells_in_row_min = len(row)
+            self._first_rowidx_with_min_n_cells = i
+
+        if self._n_cells_in_row_max < len(row):
+            self._n_cells_in_row_max = len(row)
+            self._first_rowidx_with_max_n_cells = i
+
+        for j in range(len(row)):
+            cell = row.get_cell(j)
+
+            # iq: [cell] is quoted
+            iq = cell.isquoted()
+            if   iq is True : self._n_quoted_cells   += 1
+            elif iq is False: self._n_unquoted_cells += 1
+            else            : raise RuntimeError()
+
+            # cl: content length
+            cl = len(cell)
+            ccls.add(cl)
+            self._column_n_cells           [j] += 1
+            self._column_content_length_sum[j] += cl
+            if self._column_content_length_max[j] < cl:
+                self._column_content_length_max[j] = cl
+            if iq is True:
+                self._column_n_quoted_cells[j] += 1
+            if 0 == cl:
+                self._column_n_empty_cells [j] += 1
+
+            if drs is not None:
+                # ch: cell hash
+                ch = hash_content(cell.get_content())
+                if iq is True:
+                    ch ^= HLL_QUOTED_MASK
+                assert dcss[j].add(ch) is None
+                rh = (rh * HLL_ROW_MULTIPLIER + ch) & HLL_MASK
+                del ch
+            del iq, cl
+
+            # (the counts are taken once per cell, and most cells have
+            # none; see NO_CONTENT_COUNTS)
+            ccs = cell.get_content_counts(qb)
+            if ccs is not NO_CONTENT_COUNTS:
+                n_qcs, n_lfs, n_crlfs = ccs
+
+                if 0 < n_qcs  : self._n_cells_containing_a_quote_char += 1
+                if 0 < n_crlfs: self._n_cells_containing_a_crlf       += 1
+                if 0 < n_lfs  : self._n_cells_containing_a_lf         += 1
+
+                self._n_quote_chars_inside_cells += n_qcs
+                self._n_crlfs_inside_cells       += n_crlfs
+                self._n_lfs_inside_cells         += n_lfs
+
+                self._column_n_lfs_inside_cells  [j] += n_lfs
+                self._column_n_crlfs_inside_cells[j] += n_crlfs
+
+                del n_qcs, n_lfs, n_crlfs
+            del ccs
+
+
+            # fc: [is] final cell
+            if   j+1 <  len(row): fc = False
+            elif j+1 == len(row): fc = True
+            else                : raise RuntimeError()
 
             # sd: subsequent delimiter
-            sd = row.get_cell(-1).get_subsequent_delimiter()
-            assert 0x20 == b' '[0]
-            assert 0x20 == ord(' ')
-            if   0x20 == sd: n_rows_with_trailing_spaces += 1
-            elif   -1 == sd: pass
-            else           : raise RuntimeError()
-            del sd
+            sd = cell.get_subsequent_delimiter()
+            if   fc is False: assert sd in (dc, SP), sd
+            elif fc is True : assert sd in (-1, SP), sd
+            else            : raise RuntimeError()
 
-            n_cells += len(row)
+            if   (fc is False) and (dc == sd): self._n_conventional_cell_delimiters += 1
+            elif (fc is False) and (SP == sd): self._n_spaces_cell_delimiters       += 1
+            del fc, sd
+        del ccls, dcss
 
-            if len(row) < n_cells_in_row_min:
-                n_cells_in_row_min = len(row)
-                first_rowidx_with_min_n_cells = i
+        if drs is not None:
+            assert drs.add(rh) is None
+        del drs, rh
 
-            if n_cells_in_row_max < len(row):
-                n_cells_in_row_max = len(row)
-                first_rowidx_with_max_n_cells = i
+        return None
 
-            for j in range(len(row)):
-                cell = row.get_cell(j)
 
-                # iq: [cell] is quoted
-                iq = cell.isquoted()
-                if   iq is True : n_quoted_cells   += 1
-                elif iq is False: n_unquoted_cells += 1
-                else            : raise RuntimeError()
-                del iq
+    # Adds all of the rows of a store (see CSVTree._CSVStore), as add_row
+    # would add each of them, but from the arrays of the store (see its bulk
+    # accessors), without a view of each row and cell. The counts that are
+    # sums over the rows or cells are taken from the arrays as a whole.
+    def add_store(self, store) -> None:
 
-                # cc: cell content
-                cc = cell.get_content()
-                assert isinstance(cc, bytes), type(cc)
-                if bytes([qc]) in cc:
-                    n_cells_containing_a_quote_char += 1
+        qc = self._quote_character
+        dc = self._delimiter_character
 
-                n_quote_chars_inside_cells += cc.count(bytes([qc]))
+        SP = 0x20
 
-                n_crlfs = cc.count(b'\x0d\x0a')
-                n_lfs = cc.count(b'\x0a') - n_crlfs
+        # (per row)
+        # res: row ends
+        # rss: row sizes
+        # nes: newline encodings [as codes]
+        # lss: leading spaces [bits]
+        res = store.get_row_ends()
+        rss = store.get_row_sizes()
+        nes = store.get_newline_encodings()
+        lss = store.get_leading_spaces()
+        # (per cell)
+        # cbs: cell begins [or None, if the csv file is not mapped]
+        # ces: cell ends
+        # qts: quoted [bits]
+        # sds: subsequent delimiters
+        # ccd: content counts dict [by cell index]
+        # cps: copied [bits, or None]
+        cbs = store.get_cell_begins()
+        ces = store.get_cell_ends()
+        qts = store.get_quoted()
+        sds = store.get_subsequent_delimiters()
+        ccd = store.get_content_counts()
+        cps = store.get_copied()
+
+        # nr: n rows
+        # nc: n cells
+        nr = len(res)
+        nc = len(ces)
+        if 0 == nr:
+            return None
+        assert nc == res[-1], (nc, res[-1])
+
+        # ri: row index offset [of the first row of the store, in self]
+        ri = self._n_rows
+        self._n_rows  += nr
+        self._n_cells += nc
+
+        # (the newline encodings, by their codes; see _CSVStore)
+        NES = store._NEWLINE_ENCODINGS
+        assert (b'', b'\x0a', b'\x0d\x0a') == NES, NES
+        self._n_rows_ended_by_eof  += nes.count(0)
+        self._n_rows_ended_by_lf   += nes.count(1)
+        self._n_rows_ended_by_crlf += nes.count(2)
+        assert nr == nes.count(0) + nes.count(1) + nes.count(2)
+
+        # (the unused bits of the final byte of a bit array are 0)
+        n_quoted = bin(int.from_bytes(qts, 'little')).count('1')
+        self._n_rows_with_leading_spaces += \
+            bin(int.from_bytes(lss, 'little')).count('1')
+        self._n_quoted_cells   += n_quoted
+        self._n_unquoted_cells += nc - n_quoted
+        del n_quoted
+
+        # (a cell is followed by the delimiter or spaces, unless it is the
+        # final cell of its row, which is followed by spaces or nothing)
+        # nts: n [rows with] trailing spaces
+        nts = sum(1 for e in res if SP == sds[e - 1])
+        self._n_rows_with_trailing_spaces    += nts
+        self._n_conventional_cell_delimiters += sds.count(dc)
+        self._n_spaces_cell_delimiters       += sds.count(SP) - nts
+        if nc != sds.count(dc) + sds.count(SP) + sds.count(-1) or \
+           nr != sds.count(-1) + nts:
+            raise RuntimeError()
+        del nts
+
+        for rs in rss:
+            assert self._row_size_sketch.add(rs) is None
+
+        # (the quote characters, lfs and cr lfs inside the cells; most
+        # cells have none, and so are not in ccd; see NO_CONTENT_COUNTS)
+        cnl  = self._column_n_lfs_inside_cells
+        cncl = self._column_n_crlfs_inside_cells
+        # r: row index [in the store, of the row of the cell ci]
+        r = 0
+        for ci, (n_qcs, n_lfs, n_crlfs) in sorted(ccd.items()):
+            while res[r] <= ci:
+                r += 1
+            # j: column index [of the cell ci]
+            j = ci - (0 if 0 == r else res[r - 1])
+            assert self._grow_columns(j + 1) is None
+
+            if 0 < n_qcs  : self._n_cells_containing_a_quote_char += 1
+            if 0 < n_crlfs: self._n_cells_containing_a_crlf       += 1
+            if 0 < n_lfs  : self._n_cells_containing_a_lf         += 1
+
+            self._n_quote_chars_inside_cells += n_qcs
+            self._n_crlfs_inside_cells       += n_crlfs
+            self._n_lfs_inside_cells         += n_lfs
+
+            cnl [j] += n_lfs
+            cncl[j] += n_crlfs
+        del cnl, cncl, r
+
+        # ccls: cell content length sketch
+        # dcss: distinct cells sketches [of the columns]
+        # drs : distinct rows sketch
+        # nrc : n rows by n cells
+        # cnc, cnq, cne, cls_, clm: the per-column n cells, n quoted cells,
+        #     n empty cells, content length sums and content length maxima
+        ccls = self._cell_content_length_sketch
+        dcss = self._column_distinct_cells_sketches
+        drs  = self._distinct_rows_sketch
+        nrc  = self._n_rows_by_n_cells
+        cnc  = self._column_n_cells
+        cnq  = self._column_n_quoted_cells
+        cne  = self._column_n_empty_cells
+        cls_ = self._column_content_length_sum
+        clm  = self._column_content_length_max
+
+        # (the contents are hashed from memoryviews of the buffers, and so
+        # are not copied)
+        cmv = memoryview(store.get_content())
+        smv = None if cps is None else memoryview(store.get_source())
+
+        # cb: cell begin [index, of the current row]
+        # ce: content end [of the previous cell, if the csv file is not
+        #     mapped]
+        cb = 0
+        ce = 0
+        for k in range(nr):
+            i = ri + k
+            # e: row end [cell index]
+            # w : width [i.e., the number of cells of the row]
+            e = res[k]
+            w = e - cb
+
+            nrc[w] = nrc.get(w, 0) + 1
+            if w < self._n_cells_in_row_min:
+                self._n_cells_in_row_min = w
+                self._first_rowidx_with_min_n_cells = i
+            if self._n_cells_in_row_max < w:
+                self._n_cells_in_row_max = w
+                self._first_rowidx_with_max_n_cells = i
+            if len(cnc) < w:
+                assert self._grow_columns(w) is None
+
+            # rh: row hash
+            rh = 0
+            for j in range(w):
+                ci = cb + j
 
-                if 0 < n_crlfs: n_cells_containing_a_crlf += 1
-                if 0 < n_lfs  : n_cells_containing_a_lf   += 1
+                # iq: [cell] is quoted
+                iq = (qts[ci >> 3] >> (ci & 7)) & 1
+
+                # cl: content length
+                # ns: [content] start
+                if cbs is None:
+                    ns = ce
+                    ce = ces[ci]
+                    cl = ce - ns
+                else:
+                    ns = cbs[ci]
+                    cl = ces[ci] - ns
+                ccls.add(cl)
+                cnc[j] += 1
+                cls_[j] += cl
+                if clm[j] < cl:
+                    clm[j] = cl
+                if iq:
+                    cnq[j] += 1
+                if 0 == cl:
+                    cne[j] += 1
+
+                if drs is not None:
+                    # ch: cell hash
+                    if cps is None or (cps[ci >> 3] >> (ci & 7)) & 1:
+                        ch = hash_content(cmv[ns:ns + cl])
+                    else:
+                        ch = hash_content(smv[ns:ns + cl])
+                    if iq:
+                        ch ^= HLL_QUOTED_MASK
+                    assert dcss[j].add(ch) is None
+                    rh = (rh * HLL_ROW_MULTIPLIER + ch) & HLL_MASK
+                    del ch
+
+            if drs is not None:
+                assert drs.add(rh) is None
+            cb = e
+        del ccls, dcss, drs, nrc, cnc, cnq, cne, cls_, clm
+        cmv.release()
+        if smv is not None:
+            smv.release()
+        del cmv, smv
 
-                n_crlfs_inside_cells += n_crlfs
-                n_lfs_inside_cells   += n_lfs
+        return None
 
-                del n_crlfs, n_lfs
-                del cc
 
+    # The rows of other are taken to follow the rows of self. The statistics
+    # of csv files of different dialects may only be merged (as they are for
+    # the aggregate over the files of a batch) if check_dialect is False.
+    def merge(self, other, check_dialect = True) -> None:
+
+        assert isinstance(other, CSVStatistics), type(other)
+        assert check_dialect in (True, False), check_dialect
+        if check_dialect is True:
+            assert self._quote_character     == other._quote_character
+            assert self._delimiter_character == other._delimiter_character
+        # (the sketches of the distinct values only merge at one precision)
+        if self._distinct_precision != other._distinct_precision:
+            raise ValueError(
+                'statistics of different distinct precisions cannot be ' + \
+                f'merged: {self._distinct_precision} != ' + \
+                f'{other._distinct_precision}'
+            )
+
+        # ro: row offset [of the rows of other]
+        ro = self._n_rows
+
+        if other._n_cells_in_row_min < self._n_cells_in_row_min:
+            self._n_cells_in_row_min = other._n_cells_in_row_min
+            self._first_rowidx_with_min_n_cells = \
+                ro + other._first_rowidx_with_min_n_cells
+
+        if self._n_cells_in_row_max < other._n_cells_in_row_max:
+            self._n_cells_in_row_max = other._n_cells_in_row_max
+            self._first_rowidx_with_max_n_cells = \
+                ro + other._first_rowidx_with_max_n_cells
+
+        del ro
+
+        self._n_rows                          += other._n_rows
+        self._n_rows_ended_by_lf              += other._n_rows_ended_by_lf
+        self._n_rows_ended_by_crlf            += other._n_rows_ended_by_crlf
+        self._n_rows_ended_by_eof             += other._n_rows_ended_by_eof
+        self._n_rows_with_leading_spaces      += other._n_rows_with_leading_spaces
+        self._n_rows_with_trailing_spaces     += other._n_rows_with_trailing_spaces
+        self._n_cells                         += other._n_cells
+        self._n_unquoted_cells                += other._n_unquoted_cells
+        self._n_quoted_cells                  += other._n_quoted_cells
+        self._n_cells_containing_a_quote_char += other._n_cells_containing_a_quote_char
+        self._n_cells_containing_a_lf         += other._n_cells_containing_a_lf
+        self._n_cells_containing_a_crlf       += other._n_cells_containing_a_crlf
+        self._n_conventional_cell_delimiters  += other._n_conventional_cell_delimiters
+        self._n_spaces_cell_delimiters        += other._n_spaces_cell_delimiters
+        self._n_quote_chars_inside_cells      += other._n_quote_chars_inside_cells
+        self._n_lfs_inside_cells              += other._n_lfs_inside_cells
+        self._n_crlfs_inside_cells            += other._n_crlfs_inside_cells
+
+        for n_cells, n_rows in other._n_rows_by_n_cells.items():
+            self._n_rows_by_n_cells[n_cells] = \
+                self._n_rows_by_n_cells.get(n_cells, 0) + n_rows
+        assert self._cell_content_length_sketch.merge(
+            other._cell_content_length_sketch
+        ) is None
+        assert self._row_size_sketch.merge(other._row_size_sketch) is None
+        if self._distinct_rows_sketch is not None:
+            assert self._distinct_rows_sketch.merge(
+                other._distinct_rows_sketch
+            ) is None
+
+        assert self._grow_columns(len(other._column_n_cells)) is None
+        for j in range(len(other._column_n_cells)):
+            self._column_n_cells             [j] += other._column_n_cells             [j]
+            self._column_n_quoted_cells      [j] += other._column_n_quoted_cells      [j]
+            self._column_n_empty_cells       [j] += other._column_n_empty_cells       [j]
+            self._column_content_length_sum  [j] += other._column_content_length_sum  [j]
+            self._column_n_lfs_inside_cells  [j] += other._column_n_lfs_inside_cells  [j]
+            self._column_n_crlfs_inside_cells[j] += other._column_n_crlfs_inside_cells[j]
+            self._column_content_length_max  [j]  = max(
+                self._column_content_length_max[j],
+                other._column_content_length_max[j],
+            )
+            if self._column_distinct_cells_sketches[j] is not None:
+                assert self._column_distinct_cells_sketches[j].merge(
+                    other._column_distinct_cells_sketches[j]
+                ) is None
 
-                # fc: [is] final cell
-                if   j+1 <  len(row): fc = False
-                elif j+1 == len(row): fc = True
-                else                : raise RuntimeError()
+        return None
 
-                # sd: subsequent delimiter
-                sd = cell.get_subsequent_delimiter()
-                if   fc is False: assert sd in (dc, SP), sd
-                elif fc is True : assert sd in (-1, SP), sd
-                else            : raise RuntimeError()
 
-                if   (fc is False) and (dc == sd): n_conventional_cell_delimiters += 1
-                elif (fc is False) and (SP == sd): n_spaces_cell_delimiters       += 1
-                del fc, sd
+    def get_statistics(self) -> dict:
+
+        assert 0 < self._n_rows, self._n_rows
+
+        # ndr: n distinct rows [estimated; at most the number of rows]
+        # nur: n duplicate rows [estimated]
+        if self._distinct_rows_sketch is None:
+            ndr = None
+            nur = None
+        else:
+            ndr = min(self._n_rows, self._distinct_rows_sketch.get_estimate())
+            nur = self._n_rows - ndr
 
         return \
             {
-                'n_rows'                         : n_rows, 
-                'n_rows_ended_by_lf'             : n_rows_ended_by_lf,
-                'n_rows_ended_by_crlf'           : n_rows_ended_by_crlf,
-                'n_rows_ended_by_eof'            : n_rows_ended_by_eof,
-                'n_rows_with_leading_spaces'     : n_rows_with_leading_spaces,
-                'n_rows_with_trailing_spaces'    : n_rows_with_trailing_spaces,
-                'n_cells'                        : n_cells,
-                'n_unquoted_cells'               : n_unquoted_cells,
-                'n_quoted_cells'                 : n_quoted_cells,
-                'n_cells_containing_a_quote_char': n_cells_containing_a_quote_char,
-                'n_cells_containing_a_lf'        : n_cells_containing_a_lf,
-                'n_cells_containing_a_crlf'      : n_cells_containing_a_crlf,
-                'n_conventional_cell_delimiters' : n_conventional_cell_delimiters,
-                'n_spaces_cell_delimiters'       : n_spaces_cell_delimiters,
-                'n_cells_in_row_max'             : n_cells_in_row_max,
-                'n_cells_in_row_rounded_mean'    : round(n_cells / n_rows),
-                'n_cells_in_row_min'             : n_cells_in_row_min,
-                'first_rowidx_with_max_n_cells'  : first_rowidx_with_max_n_cells,
-                'first_rowidx_with_min_n_cells'  : first_rowidx_with_min_n_cells,
-                'n_quote_chars_inside_cells'     : n_quote_chars_inside_cells,
-                'n_lfs_inside_cells'             : n_lfs_inside_cells,
-                'n_crlfs_inside_cells'           : n_crlfs_inside_cells,
+                'n_rows'                         : self._n_rows, 
+                'n_rows_ended_by_lf'             : self._n_rows_ended_by_lf,
+                'n_rows_ended_by_crlf'           : self._n_rows_ended_by_crlf,
+                'n_rows_ended_by_eof'            : self._n_rows_ended_by_eof,
+                'n_rows_with_leading_spaces'     : self._n_rows_with_leading_spaces,
+                'n_rows_with_trailing_spaces'    : self._n_rows_with_trailing_spaces,
+                'n_cells'                        : self._n_cells,
+                'n_unquoted_cells'               : self._n_unquoted_cells,
+                'n_quoted_cells'                 : self._n_quoted_cells,
+                'n_cells_containing_a_quote_char': self._n_cells_containing_a_quote_char,
+                'n_cells_containing_a_lf'        : self._n_cells_containing_a_lf,
+                'n_cells_containing_a_crlf'      : self._n_cells_containing_a_crlf,
+                'n_conventional_cell_delimiters' : self._n_conventional_cell_delimiters,
+                'n_spaces_cell_delimiters'       : self._n_spaces_cell_delimiters,
+                'n_cells_in_row_max'             : self._n_cells_in_row_max,
+                'n_cells_in_row_rounded_mean'    : round(self._n_cells / self._n_rows),
+                'n_cells_in_row_min'             : self._n_cells_in_row_min,
+                'first_rowidx_with_max_n_cells'  : self._first_rowidx_with_max_n_cells,
+                'first_rowidx_with_min_n_cells'  : self._first_rowidx_with_min_n_cells,
+                'n_quote_chars_inside_cells'     : self._n_quote_chars_inside_cells,
+                'n_lfs_inside_cells'             : self._n_lfs_inside_cells,
+                'n_crlfs_inside_cells'           : self._n_crlfs_inside_cells,
+                **{
+                    f'cell_content_length_{k}': v for k, v in
+                    self._cell_content_length_sketch.get_quantiles().items()
+                },
+                **{
+                    f'row_size_{k}': v for k, v in
+                    self._row_size_sketch.get_quantiles().items()
+                },
+                'n_distinct_rows_estimate'       : ndr,
+                'n_duplicate_rows_estimate'      : nur,
             }
 
 
+    # Returns the number of rows of each number of cells (i.e., the exact
+    # histogram of the numbers of cells in the rows), by number of cells.
+    def get_n_cells_in_row_histogram(self) -> list:
 
+        assert 0 < self._n_rows, self._n_rows
 
+        return [
+            {
+                'n_cells_in_row': n_cells,
+                'n_rows'        : n_rows,
+                'rows_ratio'    : n_rows / self._n_rows,
+            }
+            for n_cells, n_rows in sorted(self._n_rows_by_n_cells.items())
+        ]
+
+
+    # Returns the statistics of each column (i.e., of the j-th cells of the
+    # rows), in column order.
+    def get_column_statistics(self) -> list:
+
+        assert 0 < self._n_rows, self._n_rows
+
+        # css: column statistics
+        css = []
+        for j in range(len(self._column_n_cells)):
+            n = self._column_n_cells[j]
+            assert 0 < n, (j, n)
+            # dcs: distinct cells sketch
+            dcs = self._column_distinct_cells_sketches[j]
+            css.append(
+                {
+                    'column'                    : j,
+                    'n_cells'                   : n,
+                    'rows_reaching_ratio'       : n / self._n_rows,
+                    'n_quoted_cells'            : self._column_n_quoted_cells[j],
+                    'quoted_cells_ratio'        : self._column_n_quoted_cells[j] / n,
+                    'n_empty_cells'             : self._column_n_empty_cells[j],
+                    'content_length_max'        : self._column_content_length_max[j],
+                    'content_length_mean'       : self._column_content_length_sum[j] / n,
+                    'n_lfs_inside_cells'        : self._column_n_lfs_inside_cells[j],
+                    'n_crlfs_inside_cells'      : self._column_n_crlfs_inside_cells[j],
+                    'n_distinct_cells_estimate' : None \
+                        if dcs is None else min(n, dcs.get_estimate()),
+                }
+            )
+            del n, dcs
+
+        return css
+
+
+
+class CSVStream(CSVTree):
+    def __init__(
+        self,
+        csv_file_path,
+        quote_character     = 0x22,
+        delimiter_character = 0x2c,
+        block_size          = 1 << 20,
+        jobs                = 1,
+        byte_range          = None,
+        use_mmap            = False,
+        engine              = 'python',
+        paranoid            = False,
+        profile             = None,
+        lenient             = False,
+        distinct_precision  = None,
+    ):
+        # the statistics are updated as each row is completed
+        self._statistics = CSVStatistics(
+            quote_character     = quote_character,
+            delimiter_character = delimiter_character,
+            distinct_precision  = distinct_precision,
+        )
+        super().__init__(
+            csv_file_path       = csv_file_path,
+            quote_character     = quote_character,
+            delimiter_character = delimiter_character,
+            block_size          = block_size,
+            jobs                = jobs,
+            byte_range          = byte_range,
+            use_mmap            = use_mmap,
+            engine              = engine,
+            paranoid            = paranoid,
+            profile             = profile,
+            lenient             = lenient,
+            distinct_precision  = distinct_precision,
+        )
 
 
+    def __len__(self) -> int:
+        return len(self._statistics)
+
 
+    def _commit_row(self, row) -> None:
+        return self._statistics.add_row(row)
 
 
+    def _commit_store(self, store) -> None:
+        return self._statistics.add_store(store)
+
+
+    def _get_parse_result(self) -> CSVStatistics:
+        return self._statistics
+
+
+    def _merge_parse_result(self, statistics) -> None:
+        return self._statistics.merge(statistics)
+
+
+    def _tabulate_statistics(self) -> CSVStatistics:
+        return self._statistics
+
+
+    def get_statistics(self) -> dict:
+        with self._time_phase('statistics'):
+            return self._statistics.get_statistics()
+
+
+    def get_column_statistics(self) -> list:
+        with self._time_phase('statistics'):
+            return self._statistics.get_column_statistics()
+
+
+    def get_n_cells_in_row_histogram(self) -> list:
+        with self._time_phase('statistics'):
+            return self._statistics.get_n_cells_in_row_histogram()
+
+
+
+
+
+# A row view is a read-only view of a row of the csv file, as iter_rows
+# yields them: the content (bytes, or, if the csv file is memory-mapped, a
+# memoryview of the mapping), quoted attribute and subsequent delimiter of
+# each of its cells, and its newline encoding and size. The one view is
+# reused for each row that is yielded, as are the parser's row and cells
+# behind it (no row or cell object is allocated per row; see
+# _iter_byte_range_fast), and so a view is valid only until the next row is
+# yielded; a row that is to be kept must be copied (e.g., with
+# get_contents).
+class CSVRowView:
+    __slots__ = (
+        '_row',
+        '_rowidx',
+    )
+
+    def __init__(self):
+        self._row    = None
+        self._rowidx = -1
+
+
+    def _bind(self, row) -> None:
+        self._row     = row
+        self._rowidx += 1
+        return None
+
+
+    def get_rowidx(self) -> int:
+        return self._rowidx
+
+
+    def __len__(self) -> int:
+        return len(self._row._cells)
+
+
+    def get_content(self, colidx) -> bytes:
+        return self._row._cells[colidx].get_content()
+
+
+    def get_contents(self) -> list:
+        return [bytes(cell.get_content()) for cell in self._row._cells]
+
+
+    def isquoted(self, colidx) -> bool:
+        return self._row._cells[colidx]._quoted
+
+
+    def get_subsequent_delimiter(self, colidx) -> int:
+        return self._row._cells[colidx]._subsequent_delimiter
+
+
+    def get_newline_encoding(self) -> bytes:
+        return self._row._newline_encoding
+
+
+    def leading_spaces_are_present(self) -> bool:
+        return self._row._leading_spaces_are_present
+
+
+    def get_size(self) -> int:
+        return self._row._size
+
+
+
+# The source of iter_rows: a tree whose parse is deferred to iter_rows, and
+# which keeps none of the rows.
+class _CSVRowReader(CSVTree):
+    def _parse_csv_file(self) -> None:
+        return None
+
+
+
+# Yields a view of each row of the csv file (or stream; see _stream.py) as
+# soon as the parser has completed it, in constant memory: the rows are
+# neither kept nor tabulated, and the one view (see CSVRowView) is only valid
+# until the next row is yielded. The rows are parsed by the fast parser, in
+# a single process.
+def iter_rows(
+    csv_file_path,
+    quote_character     = 0x22,
+    delimiter_character = 0x2c,
+    block_size          = 1 << 20,
+    byte_range          = None,
+    use_mmap            = False,
+):
+    csvrr = _CSVRowReader(
+        csv_file_path,
+        quote_character     = quote_character,
+        delimiter_character = delimiter_character,
+        block_size          = block_size,
+        byte_range          = byte_range,
+        use_mmap            = use_mmap,
+    )
+
+    # bb: byte range begin
+    # be: byte range end
+    bb, be = csvrr._get_byte_range()
+    # (an empty csv file has no rows)
+    if bb == be:
+        return None
+
+    # (the csv file is opened here, rather than by the parser, so that it is
+    # closed however the iteration ends, even if it is abandoned)
+    if csvrr._mapping is None: csv_file = csvrr._open_csv_file(bb)
+    else                     : csv_file = None
+
+    # rv: row view
+    rv = CSVRowView()
+    with csvrr._closing(csv_file):
+        for row in csvrr._iter_byte_range_fast(
+            bb, be, csv_file, recycle = True
+        ):
+            rv._bind(row)
+            yield rv
+    del csvrr, bb, be, csv_file, rv
+
+    return None
@@ -1,42 +1,512 @@
+import os
 import sys
 import argparse
 
 from . import CSVTree
+from . import CSVStream
+from ._batch import expand_paths
+from ._batch import profile_csv_files
+from ._batch import BatchAggregate
+from ._output import FORMATS
+from ._output import BatchWriter
+from ._output import write_statistics
+from ._output import write_parser_profile
+from ._output import write_column_statistics
+from ._profile import ParserProfile
+from ._sniff import resolve_dialect
+from ._rowindex import write_row_index
+from ._sample import sample_statistics
+from ._checkpoint import CHECKPOINT_SUFFIX
+from ._checkpoint import get_statistics_incrementally
+from ._cache import MAX_SIZE
+from ._cache import StatisticsCache
+from ._cache import get_statistics_cached
+from ._sketch import HLL_PRECISION
+from ._sketch import HLL_MIN_PRECISION
+from ._sketch import HLL_MAX_PRECISION
 
 
-def print_statistics(**kwargs) -> int:
+# The dialect that the csv file was parsed with (whether it was given, or
+# sniffed) is reported ahead of its statistics.
+def get_dialect_statistics(quote_character, delimiter_character) -> dict:
+    return {
+        'quote_character'    : f'0x{quote_character    :02x}',
+        'delimiter_character': f'0x{delimiter_character:02x}',
+    }
 
-    csvt = CSVTree(**kwargs)
-    csvs = csvt.get_statistics()
-    assert isinstance(csvs, dict), type(csvs)
-    assert 0 < len(csvs)
 
-    max_k_width = max(len(    k ) for k in csvs.keys  ())
-    max_v_width = max(len(str(v)) for v in csvs.values())
+def print_statistics(csv_file_path, stream, checkpoint, format, sample,
+                     samples, sample_bytes, columns, histogram, row_index,
+                     rows, profile_parser, cache, cache_dir, cache_size,
+                     lenient, **kwargs) -> int:
 
-    for k, v in csvs.items():
-        k =     k .ljust(max_k_width)
-        v = str(v).rjust(max_v_width)
-        sys.stdout.write(f'{k}{" "*2}{v}\n')
+    if columns is True and histogram is True:
+        raise ValueError('--columns and --histogram are exclusive')
+
+    # (- is stdin, which is parsed as a stream; see _stream.py)
+    if '-' == csv_file_path:
+        if sample is True or checkpoint is not None or row_index is True or \
+           rows is not None:
+            raise ValueError(
+                '--sample, --checkpoint, --write-row-index and --rows ' + \
+                'take a csv file, not stdin'
+            )
+        csv_file_path = sys.stdin.buffer
+
+    # (in lenient mode, the statistics are those of the rows that were
+    # parsed, and the errors are written to stderr; see _errors.py)
+    if lenient is True:
+        if sample is True or checkpoint is not None or cache is True or \
+           rows is not None:
+            raise ValueError(
+                '--lenient takes none of --sample, --checkpoint, --cache ' + \
+                'and --rows'
+            )
+        if 1 != kwargs['jobs']:
+            raise ValueError('--lenient parses in a single process')
+        kwargs['lenient'] = True
+
+    # (the dialect is sniffed only on a cache miss; see _cache.py)
+    if cache is True:
+        if sample is True or checkpoint is not None or row_index is True or \
+           rows is not None or profile_parser is True:
+            raise ValueError(
+                '--cache takes none of --sample, --checkpoint, ' + \
+                '--write-row-index, --rows and --profile-parser'
+            )
+        csvs = get_statistics_cached(
+            csv_file_path,
+            StatisticsCache(cache_dir, cache_size),
+            stream,
+            **kwargs,
+        )
+        if columns is True:
+            assert write_column_statistics(
+                csvs.get_column_statistics(), format,
+            ) is None
+            return 0
+        if histogram is True:
+            assert write_column_statistics(
+                csvs.get_n_cells_in_row_histogram(), format,
+            ) is None
+            return 0
+        csvs = {
+            **get_dialect_statistics(*csvs.get_dialect()),
+            **csvs.get_statistics(),
+        }
+        assert write_statistics(csvs, format) is None
+        return 0
+
+    csv_file_path, kwargs = resolve_dialect(csv_file_path, kwargs)
+
+    if row_index is True:
+        ip = write_row_index(
+            csv_file_path,
+            quote_character = kwargs['quote_character'],
+            block_size      = kwargs['block_size'],
+        )
+        sys.stderr.write(f'wrote row index: {ip}\n')
+        del ip
+
+    if rows is not None:
+        return print_rows(csv_file_path, rows[0], rows[1], **kwargs)
+
+    # (the profile is written to stderr, after the statistics; see
+    # _profile.py)
+    if profile_parser is True:
+        if sample is True or checkpoint is not None:
+            raise ValueError(
+                '--profile-parser takes neither --sample nor --checkpoint'
+            )
+        kwargs['profile'] = ParserProfile()
+
+    if columns is True or histogram is True:
+        if sample is True or checkpoint is not None:
+            raise ValueError(
+                '--columns and --histogram take neither --sample nor ' + \
+                '--checkpoint'
+            )
+        if stream is True: csvt = CSVStream(csv_file_path, **kwargs)
+        else             : csvt = CSVTree  (csv_file_path, **kwargs)
+        # (both are written as tables; see _output.py; in lenient mode,
+        # every row may have been discarded)
+        if   0 == len(csvt) : css = []
+        elif columns is True: css = csvt.get_column_statistics()
+        else                : css = csvt.get_n_cells_in_row_histogram()
+        if 0 < len(css):
+            assert write_column_statistics(css, format) is None
+        del css
+        if profile_parser is True:
+            assert write_parser_profile(
+                kwargs['profile'].get_profile(), format,
+            ) is None
+        if lenient is True:
+            return write_errors(csvt.get_errors(), format)
+        return 0
+
+    if sample is True:
+        if 1 != kwargs['jobs']:
+            raise ValueError('--sample parses in a single process')
+        csvs = sample_statistics(
+            csv_file_path = csv_file_path,
+            n_samples     = samples,
+            sample_size   = sample_bytes,
+            **kwargs,
+        )
+    elif checkpoint is not None:
+        csvs = get_statistics_incrementally(
+            csv_file_path   = csv_file_path,
+            checkpoint_path = checkpoint,
+            **kwargs,
+        ).get_statistics()
+    elif lenient is True:
+        if stream is True: csvt = CSVStream(csv_file_path, **kwargs)
+        else             : csvt = CSVTree  (csv_file_path, **kwargs)
+        # (every row may have been discarded, in which case there are no
+        # statistics but the error summary)
+        csvs = {
+            **(csvt.get_statistics() if 0 < len(csvt) else {}),
+            **csvt.get_errors().get_summary(),
+        }
+    elif stream is True:
+        csvs = CSVStream(csv_file_path, **kwargs).get_statistics()
+    else:
+        assert stream is False, stream
+        csvs = CSVTree(csv_file_path, **kwargs).get_statistics()
+
+    csvs = {
+        **get_dialect_statistics(
+            kwargs['quote_character'],
+            kwargs['delimiter_character'],
+        ),
+        **csvs,
+    }
+    assert write_statistics(csvs, format) is None
+    if profile_parser is True:
+        sys.stdout.flush()
+        assert write_parser_profile(
+            kwargs['profile'].get_profile(), format,
+        ) is None
+    if lenient is True:
+        return write_errors(csvt.get_errors(), format)
 
     return 0
 
 
+# Writes the logged errors of a lenient parse to stderr (after the
+# statistics, which are on stdout), and returns the exit status: 1 if the
+# csv file had any errors.
+def write_errors(errors, format) -> int:
+    if 0 == len(errors):
+        return 0
+    sys.stdout.flush()
+    es = errors.get_errors()
+    if 0 < len(es):
+        assert write_column_statistics(es, format, out = sys.stderr) is None
+    del es
+    return 1
+
+
+# The rows [rowidx_begin, rowidx_end) are parsed on their own (with the row
+# index, if the csv file has one), and are written as they appear in the
+# file.
+def print_rows(csv_file_path, rowidx_begin, rowidx_end, **kwargs) -> int:
+
+    csvt = CSVTree.from_row_range(
+        csv_file_path,
+        rowidx_begin,
+        rowidx_end,
+        **kwargs,
+    )
+    # (the bytes that are written are those that the rows span; see
+    # CSVTree.get_row_begins)
+    bb = csvt.get_row_begins()[0]
+    be = bb + sum(csvt.get_row_sizes())
+    del csvt
+
+    with open(csv_file_path, 'rb') as csv_file:
+        csv_file.seek(bb)
+        sys.stdout.buffer.write(csv_file.read(be - bb))
+    sys.stdout.buffer.flush()
+
+    return 0
+
+
+# Each file's statistics are written as soon as it has been profiled, and
+# are followed by the aggregate over all of the files (see _output.py).
+def print_batch_statistics(csv_file_paths, stream, pool, workers, format,
+                           cache, cache_dir, cache_size, **kwargs) -> int:
+
+    bw = BatchWriter(format)
+
+    # (each file's statistics are merged into the aggregate, and dropped, as
+    # soon as the files before it are; see _batch.py)
+    ba = BatchAggregate(csv_file_paths)
+    for cfp, csvs, error in profile_csv_files(
+        csv_file_paths, stream, pool, workers, kwargs,
+        StatisticsCache(cache_dir, cache_size) if cache is True else None,
+    ):
+        assert ba.add(cfp, csvs) is None
+        if csvs is not None:
+            csvs = {
+                **get_dialect_statistics(*csvs.get_dialect()),
+                **csvs.get_statistics(),
+            }
+        assert bw.write_file(cfp, csvs, error) is None
+        del cfp, csvs, error
+
+    assert bw.write_aggregate(ba.get_statistics()) is None
+    del bw
+
+    # (the exit status is nonzero if any of the files failed)
+    if 0 < ba.get_n_failed():
+        return 1
+    return 0
+
+
 def main() -> int:
     
     # pr: parser root
     pr = argparse.ArgumentParser()
 
     pr.add_argument(
-        'csv_file_path'
+        'csv_file_paths',
+        nargs   = '+',
+        metavar = 'csv_file_path',
+        help    = 'csv file, directory (searched recursively), glob ' + \
+                  'pattern, or - for stdin; if more than one file is ' + \
+                  'given, each is profiled, followed by the aggregate ' + \
+                  'over all of them',
+    )
+    pr.add_argument(
+        '--quote-character',
+        choices = ['auto', 'double', 'single'],
+        default = 'auto',
+        help    = 'quote character: double (0x22), single (0x27), or ' + \
+                  'auto, to sniff it from a prefix of the csv file',
+    )
+    pr.add_argument(
+        '--delimiter-character',
+        choices = ['auto', 'comma', 'tab'],
+        default = 'auto',
+        help    = 'delimiter character: comma (0x2c), tab (0x09), or ' + \
+                  'auto, to sniff it from a prefix of the csv file',
+    )
+    pr.add_argument(
+        '--block-size',
+        type    = int,
+        default = 1 << 20,
+        help    = 'number of bytes read from the csv file per read call',
+    )
+    pr.add_argument(
+        '--jobs',
+        type    = int,
+        default = 1,
+        help    = 'number of worker processes that parse chunks of the ' + \
+                  'csv file in parallel',
+    )
+    pr.add_argument(
+        '--engine',
+        choices = ['python', 'numpy'],
+        default = 'python',
+        help    = 'parser engine; numpy finds the cell and row ' + \
+                  'boundaries in bulk with vectorized operations',
+    )
+    pr.add_argument(
+        '--paranoid',
+        action  = 'store_true',
+        help    = 'parse with the checked reference parser, which ' + \
+                  'validates every step of the state machine',
+    )
+    pr.add_argument(
+        '--mmap',
+        dest    = 'use_mmap',
+        action  = 'store_true',
+        help    = 'memory-map the csv file and parse it in place',
+    )
+    pr.add_argument(
+        '--stream',
+        action  = 'store_true',
+        help    = 'tabulate the statistics while parsing, keeping only ' + \
+                  'the current row in memory',
+    )
+    pr.add_argument(
+        '--checkpoint',
+        default = None,
+        help    = 'path of a checkpoint file (to which ' + \
+                  f'{CHECKPOINT_SUFFIX} is appended, unless it ends ' + \
+                  'with it); for an append-only csv file, only the ' + \
+                  'bytes appended since the checkpoint was saved are ' + \
+                  'parsed',
+    )
+    pr.add_argument(
+        '--sample',
+        action  = 'store_true',
+        help    = 'estimate the statistics, with 95%% confidence ' + \
+                  'intervals, from samples spread across the csv file',
+    )
+    pr.add_argument(
+        '--samples',
+        type    = int,
+        default = 16,
+        help    = 'number of samples taken in sample mode',
+    )
+    pr.add_argument(
+        '--sample-bytes',
+        type    = int,
+        default = 1 << 14,
+        help    = 'number of bytes parsed per sample in sample mode',
+    )
+    pr.add_argument(
+        '--columns',
+        action  = 'store_true',
+        help    = 'write the statistics of each column (i.e., of the ' + \
+                  'j-th cells of the rows) instead of those of the file',
+    )
+    pr.add_argument(
+        '--histogram',
+        action  = 'store_true',
+        help    = 'write the number of rows of each number of cells ' + \
+                  '(i.e., the histogram of the numbers of cells in the ' + \
+                  'rows) instead of the statistics of the file',
     )
-    pr.set_defaults(
-        func = print_statistics
+    pr.add_argument(
+        '--distinct-precision',
+        type    = int,
+        choices = [0, *range(HLL_MIN_PRECISION, HLL_MAX_PRECISION + 1)],
+        default = 0,
+        metavar = 'PRECISION',
+        help    = 'estimate the numbers of distinct rows and of distinct ' + \
+                  'cells in each column with hyperloglog sketches of ' + \
+                  'this precision: each sketch takes 2**PRECISION bytes, ' + \
+                  'and its relative standard error is about ' + \
+                  '1.04/sqrt(2**PRECISION) (e.g., ' + \
+                  f'{HLL_PRECISION}, i.e., 4 KiB and 1.6%%); the default, ' + \
+                  '0, turns the sketches off, as hashing each cell is ' + \
+                  'not free',
+    )
+    pr.add_argument(
+        '--write-row-index',
+        dest    = 'row_index',
+        action  = 'store_true',
+        help    = 'write a sidecar index of the offset of each row ' + \
+                  '(to the csv file path with .rowidx appended)',
+    )
+    pr.add_argument(
+        '--rows',
+        type    = int,
+        nargs   = 2,
+        metavar = ('BEGIN', 'END'),
+        default = None,
+        help    = 'write the rows [BEGIN, END) of the csv file, seeking ' + \
+                  'to them with its row index',
+    )
+    pr.add_argument(
+        '--profile-parser',
+        action  = 'store_true',
+        help    = 'write a profile of the parse to stderr: the bytes ' + \
+                  'consumed in each parser state, the transitions ' + \
+                  'between the states, and the wall and cpu time of the ' + \
+                  'parse and of the tabulation of the statistics',
+    )
+    pr.add_argument(
+        '--lenient',
+        action  = 'store_true',
+        help    = 'log csv syntax errors, rather than abort on the first, ' + \
+                  'resuming the parse at the next line feed; the ' + \
+                  'statistics are those of the rows parsed, and the ' + \
+                  'errors are written to stderr (the exit status is 1 ' + \
+                  'if there are any)',
+    )
+    pr.add_argument(
+        '--cache',
+        action  = 'store_true',
+        help    = 'take the statistics of a csv file that is unchanged ' + \
+                  'since it was last profiled from an on-disk cache, ' + \
+                  'and cache those of the others',
+    )
+    pr.add_argument(
+        '--cache-dir',
+        default = None,
+        help    = 'cache directory (default: $XDG_CACHE_HOME/csvinfo, ' + \
+                  'or ~/.cache/csvinfo)',
+    )
+    pr.add_argument(
+        '--cache-size',
+        type    = int,
+        default = MAX_SIZE,
+        help    = 'number of bytes that the cache may take before its ' + \
+                  'least recently used entries are evicted',
+    )
+    pr.add_argument(
+        '--format',
+        choices = list(FORMATS),
+        default = 'text',
+        help    = 'output format; in batch mode, json is columnar (a ' + \
+                  'list of values per statistic), and jsonl and tsv ' + \
+                  'have a record per file',
+    )
+    pr.add_argument(
+        '--pool',
+        choices = ['thread', 'process'],
+        default = 'process',
+        help    = 'kind of worker pool that profiles the files in batch mode',
+    )
+    pr.add_argument(
+        '--workers',
+        type    = int,
+        default = os.cpu_count(),
+        help    = 'number of files profiled concurrently in batch mode',
     )
 
     args = pr.parse_args()
-    del pr
     args = vars(args)
+
+    # (None is sniffed; see _sniff.py)
+    args['quote_character'] = {
+        'auto'  : None,
+        'double': 0x22,
+        'single': 0x27,
+    }[args['quote_character']]
+    args['delimiter_character'] = {
+        'auto'  : None,
+        'comma' : 0x2c,
+        'tab'   : 0x09,
+    }[args['delimiter_character']]
+
+    # (0, the default, turns the sketches of the distinct values off; see
+    # _sketch.py)
+    if 0 == args['distinct_precision']:
+        args['distinct_precision'] = None
+
+    # A single csv file (named as such, rather than found in a directory or
+    # by a glob pattern), or stdin (-), is profiled as before; anything else
+    # is a batch.
+    cfps = args.pop('csv_file_paths')
+    if 1 == len(cfps) and ('-' == cfps[0] or os.path.isfile(cfps[0])):
+        del args['pool'], args['workers']
+        args['csv_file_path'] = cfps[0]
+        args['func'] = print_statistics
+    else:
+        if args['checkpoint'] is not None:
+            pr.error('--checkpoint takes a single csv file')
+        if args['sample'] is True:
+            pr.error('--sample takes a single csv file')
+        if args['columns'] is True or args['histogram'] is True:
+            pr.error('--columns and --histogram take a single csv file')
+        if args['row_index'] is True or args['rows'] is not None:
+            pr.error('--write-row-index and --rows take a single csv file')
+        if args['profile_parser'] is True:
+            pr.error('--profile-parser takes a single csv file')
+        if args['lenient'] is True:
+            pr.error('--lenient takes a single csv file')
+        del args['checkpoint'], args['sample'], args['samples'], \
+            args['sample_bytes'], args['columns'], args['histogram'], \
+            args['row_index'], args['rows'], args['profile_parser'], \
+            args['lenient']
+        args['csv_file_paths'] = expand_paths(cfps)
+        args['func'] = print_batch_statistics
+    del pr, cfps
     
     func = args.pop('func')
     return func(**args)
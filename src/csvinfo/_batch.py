@@ -0,0 +1,204 @@
+import os
+import glob
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+
+from . import CSVTree
+from . import CSVStream
+from . import CSVStatistics
+from ._sniff import resolve_dialect
+from ._cache import CACHE_SUFFIX
+from ._cache import get_statistics_cached
+from ._rowindex import ROW_INDEX_SUFFIX
+from ._checkpoint import CHECKPOINT_SUFFIX
+
+
+# In batch mode many csv files are profiled in one invocation: the paths
+# given are expanded (directories recursively, glob patterns by matching),
+# and the files are profiled concurrently in a pool of worker threads or
+# processes, so that the interpreter start up and import cost is paid once.
+
+
+# The files that csvinfo itself writes (the row indices, see _rowindex.py,
+# the checkpoints, see _checkpoint.py, and the entries of the cache, see
+# _cache.py, and the temporary files of their atomic writes) are skipped
+# when a directory is walked or a glob pattern is matched, by their
+# suffixes. (A file that is named as such is kept.)
+SIDECAR_SUFFIXES = tuple(
+    suffix + tmp
+    for suffix in (ROW_INDEX_SUFFIX, CHECKPOINT_SUFFIX, CACHE_SUFFIX)
+    for tmp in ('', '.tmp')
+)
+
+
+def expand_paths(paths) -> list:
+
+    assert isinstance(paths, (list, tuple)), type(paths)
+
+    # cfps: csv file paths
+    cfps = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    file_path = os.path.join(dir_path, file_name)
+                    if not file_path.endswith(SIDECAR_SUFFIXES):
+                        cfps.append(file_path)
+                    del file_path
+        elif os.path.exists(path) or not glob.has_magic(path):
+            # (a path that does not exist is kept, so that it is reported)
+            cfps.append(path)
+        else:
+            cfps.extend(
+                expand_paths([
+                    p for p in sorted(glob.glob(path, recursive = True))
+                    if os.path.isdir(p) or not p.endswith(SIDECAR_SUFFIXES)
+                ])
+            )
+
+    # (a file that is reached more than once is profiled once)
+    # ucfps: unique csv file paths
+    ucfps = []
+    seen = set()
+    for cfp in cfps:
+        if cfp not in seen:
+            seen.add(cfp)
+            ucfps.append(cfp)
+    del cfps, seen
+
+    return ucfps
+
+
+# (with a cache, the statistics of a file that is unchanged since it was
+# last profiled are taken from the cache; see _cache.py)
+def profile_csv_file(csv_file_path, stream, kwargs,
+                     cache = None) -> CSVStatistics:
+
+    if not os.path.isfile(csv_file_path):
+        raise ValueError(f'not a file: {csv_file_path}')
+    if 0 == os.path.getsize(csv_file_path):
+        raise ValueError(f'empty file: {csv_file_path}')
+
+    if cache is not None:
+        return get_statistics_cached(csv_file_path, cache, stream, **kwargs)
+
+    csv_file_path, kwargs = resolve_dialect(csv_file_path, kwargs)
+
+    if stream is True:
+        csvt = CSVStream(csv_file_path, **kwargs)
+    else:
+        assert stream is False, stream
+        csvt = CSVTree(csv_file_path, **kwargs)
+
+    return csvt._tabulate_statistics()
+
+
+# Yields (csv file path, statistics, error) as each file is profiled, in
+# the order in which they finish; the error is the message of the exception
+# (e.g., the csv syntax error) that the file raised, if any, and the
+# statistics are then None.
+def profile_csv_files(csv_file_paths, stream, pool, workers, kwargs,
+                      cache = None):
+
+    assert pool in ('thread', 'process'), pool
+    assert isinstance(workers, int), type(workers)
+    assert 1 <= workers, workers
+
+    if 'thread' == pool: executor_type = ThreadPoolExecutor
+    else               : executor_type = ProcessPoolExecutor
+
+    with executor_type(max_workers = workers) as executor:
+        futures = {
+            executor.submit(
+                profile_csv_file, cfp, stream, kwargs, cache,
+            ): cfp
+            for cfp in csv_file_paths
+        }
+        for future in as_completed(futures):
+            cfp = futures.pop(future)
+            try:
+                csvs = future.result()
+            except (ValueError, OSError) as e:
+                yield (cfp, None, str(e))
+            # (whatever else a file raises, e.g., an assertion that its
+            # parse failed, fails the file alone, rather than the batch)
+            except Exception as e:
+                yield (cfp, None, f'{type(e).__name__}: {e}')
+            else:
+                yield (cfp, csvs, None)
+            del cfp
+
+    return None
+
+
+# The statistics of the files are merged in the order of the paths, so that
+# the row indices of the aggregate are those of the concatenation of the
+# files; the files that failed are left out (and counted). (The files may be
+# of different dialects, if they were sniffed.) As the files finish in any
+# order, the statistics of a file are merged as soon as those of all of the
+# files before it are, and are then dropped; only the statistics of the files
+# that finish ahead of an earlier one are held, so that the memory does not
+# grow with the number of files.
+class BatchAggregate:
+    def __init__(self, csv_file_paths):
+        assert isinstance(csv_file_paths, (list, tuple)), \
+            type(csv_file_paths)
+        self._csv_file_paths = csv_file_paths
+        # (the index of the next path to be merged, and the statistics, or
+        # None, of the files after it that have finished)
+        self._next_cfpidx    = 0
+        self._pending        = {}
+        self._statistics     = None
+        self._n_failed       = 0
+
+
+    def get_n_failed(self) -> int:
+        return self._n_failed
+
+
+    def add(self, csv_file_path, statistics) -> None:
+
+        assert csv_file_path not in self._pending, csv_file_path
+        assert statistics is None or isinstance(statistics, CSVStatistics), \
+            type(statistics)
+        self._pending[csv_file_path] = statistics
+
+        cfps = self._csv_file_paths
+        while self._next_cfpidx < len(cfps) and \
+              cfps[self._next_cfpidx] in self._pending:
+            csvs = self._pending.pop(cfps[self._next_cfpidx])
+            self._next_cfpidx += 1
+            if csvs is None:
+                self._n_failed += 1
+                continue
+            if self._statistics is None:
+                qc, dc = csvs.get_dialect()
+                self._statistics = CSVStatistics(
+                    quote_character     = qc,
+                    delimiter_character = dc,
+                    distinct_precision  = csvs.get_distinct_precision(),
+                )
+                del qc, dc
+            assert self._statistics.merge(csvs, check_dialect = False) is None
+            del csvs
+        del cfps
+
+        return None
+
+
+    def get_statistics(self) -> dict:
+
+        assert len(self._csv_file_paths) == self._next_cfpidx, \
+            (len(self._csv_file_paths), self._next_cfpidx)
+        assert 0 == len(self._pending), len(self._pending)
+
+        aggregate = {
+            'n_files'       : len(self._csv_file_paths),
+            'n_failed_files': self._n_failed,
+        }
+        if self._statistics is not None and 0 < len(self._statistics):
+            aggregate.update(self._statistics.get_statistics())
+
+        return aggregate
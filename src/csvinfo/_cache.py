@@ -0,0 +1,194 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+from . import CSVTree
+from . import CSVStream
+from . import CSVStatistics
+from ._sniff import resolve_dialect
+
+
+# The statistics of a csv file are cached on disk, keyed by the identity of
+# the file (its absolute path, inode, size and modification time), by the
+# precision of the sketches of the distinct values, and by the dialect that
+# was asked for (a dialect that is sniffed is asked for as None, so that a
+# cache hit does not even sniff); a file that is unchanged is then
+# profiled again without being read. The cache version is part of the key,
+# and is bumped whenever the statistics change.
+#
+# Each entry is a file of its own in the cache directory (named by the
+# digest of its key); an entry's modification time is its last use, and
+# once the entries take more than the maximum size, the least recently used
+# ones are evicted. The entries (and their temporary files) end with the
+# cache suffix, so that a batch that walks the cache directory skips them
+# (see _batch.py).
+
+CACHE_VERSION = 3
+
+CACHE_SUFFIX = '.csvinfo-cache'
+
+MAX_SIZE = 1 << 26
+
+
+def get_cache_dir() -> str:
+    # (XDG_CACHE_HOME, if set, is the root of the user's caches)
+    root = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'csvinfo')
+
+
+class StatisticsCache:
+    def __init__(self, cache_dir = None, max_size = MAX_SIZE):
+        assert isinstance(max_size, int), type(max_size)
+        assert 0 <= max_size, max_size
+        if cache_dir is None:
+            cache_dir = get_cache_dir()
+        self._cache_dir = cache_dir
+        self._max_size  = max_size
+
+
+    def get_key(self, csv_file_path, quote_character = None,
+                delimiter_character = None,
+                distinct_precision = None) -> tuple:
+        st = os.stat(csv_file_path)
+        return (
+            CACHE_VERSION,
+            os.path.abspath(csv_file_path),
+            st.st_ino,
+            st.st_size,
+            st.st_mtime_ns,
+            quote_character,
+            delimiter_character,
+            distinct_precision,
+        )
+
+
+    def _get_entry_path(self, key) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self._cache_dir, digest + CACHE_SUFFIX)
+
+
+    def load(self, key) -> CSVStatistics:
+
+        entry_path = self._get_entry_path(key)
+        try:
+            with open(entry_path, 'rb') as entry_file:
+                entry = pickle.load(entry_file)
+        except FileNotFoundError:
+            return None
+        # (an entry that cannot be read, e.g., one that was written by an
+        # older version of csvinfo, is a miss)
+        except (pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError):
+            return None
+        if not isinstance(entry, dict) or key != entry.get('key'):
+            return None
+        assert isinstance(entry['statistics'], CSVStatistics), \
+            type(entry['statistics'])
+
+        # (the entry was used, and so is the most recently used)
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+
+        return entry['statistics']
+
+
+    def save(self, key, statistics) -> None:
+
+        assert isinstance(statistics, CSVStatistics), type(statistics)
+
+        os.makedirs(self._cache_dir, exist_ok = True)
+
+        # (written to a temporary file of its own first, so that a
+        # concurrent reader never sees a partial entry)
+        fd, tmp_path = tempfile.mkstemp(
+            dir    = self._cache_dir,
+            suffix = CACHE_SUFFIX + '.tmp',
+        )
+        try:
+            with os.fdopen(fd, 'wb') as entry_file:
+                pickle.dump(
+                    {'key': key, 'statistics': statistics},
+                    entry_file,
+                )
+            os.replace(tmp_path, self._get_entry_path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        del fd, tmp_path
+
+        assert self._evict() is None
+
+        return None
+
+
+    def _evict(self) -> None:
+
+        # es: entries [(last use, size, path)]
+        es = []
+        for entry_name in os.listdir(self._cache_dir):
+            if not entry_name.endswith(CACHE_SUFFIX):
+                continue
+            entry_path = os.path.join(self._cache_dir, entry_name)
+            try:
+                st = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            es.append((st.st_mtime_ns, st.st_size, entry_path))
+            del entry_path, st
+
+        size = sum(e[1] for e in es)
+        es.sort()
+        for _, entry_size, entry_path in es:
+            if size <= self._max_size:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        del es, size
+
+        return None
+
+
+# Returns the statistics of the csv file from the cache, or else parses the
+# csv file (sniffing its dialect, if it is not given) and caches them.
+def get_statistics_cached(csv_file_path, cache, stream = False,
+                          **kwargs) -> CSVStatistics:
+
+    assert isinstance(cache, StatisticsCache), type(cache)
+    assert 'byte_range' not in kwargs, kwargs
+    if not isinstance(csv_file_path, (str, os.PathLike)):
+        raise ValueError('the statistics of a csv stream cannot be cached')
+    # (the statistics of a lenient parse are those of the rows that it kept,
+    # and go with its error log, which is not cached; see _errors.py)
+    if kwargs.get('lenient', False) is not False:
+        raise ValueError('the statistics of a lenient parse cannot be cached')
+
+    qc = kwargs.get('quote_character',     0x22)
+    dc = kwargs.get('delimiter_character', 0x2c)
+    dp = kwargs.get('distinct_precision',  None)
+
+    key = cache.get_key(csv_file_path, qc, dc, dp)
+    csvs = cache.load(key)
+    if csvs is not None:
+        return csvs
+
+    csv_file_path, kwargs = resolve_dialect(csv_file_path, kwargs)
+    if stream is True:
+        csvs = CSVStream(csv_file_path, **kwargs)._tabulate_statistics()
+    else:
+        assert stream is False, stream
+        csvs = CSVTree  (csv_file_path, **kwargs)._tabulate_statistics()
+
+    # (a file that changed while it was parsed is not cached)
+    if key == cache.get_key(csv_file_path, qc, dc, dp):
+        assert cache.save(key, csvs) is None
+    del key
+
+    return csvs
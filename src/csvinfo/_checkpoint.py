@@ -0,0 +1,173 @@
+import os
+import pickle
+import hashlib
+
+from . import CSVStream
+from . import CSVStatistics
+from ._chunks import find_last_row_end
+from ._compression import detect_compression
+
+
+# A checkpoint records how far an (append-only) csv file has been parsed:
+# the offset of the last complete row boundary that was reached, the parser
+# state there (which, at a row boundary, is always the begin-row-read state),
+# and the statistics of the rows before it. A later run parses only the
+# bytes that were appended after the offset, and merges their statistics
+# into those of the checkpoint.
+#
+# The checkpoint is only resumed from if the file still looks like the file
+# that it was taken of: the file must not have shrunk below the offset, and
+# the fingerprints (digests) of the head of the file and of the bytes just
+# before the offset must be unchanged; otherwise the file is taken to have
+# been truncated or rewritten, and is parsed in full.
+#
+# The path of a checkpoint ends with the checkpoint suffix (which is
+# appended to it, if it does not), so that a batch that walks the directory
+# of the csv file skips it (see _batch.py).
+
+CHECKPOINT_VERSION = 4
+
+CHECKPOINT_SUFFIX = '.csvinfo-checkpoint'
+
+# fs: fingerprint size [in bytes]
+FINGERPRINT_SIZE = 1 << 12
+
+
+def get_checkpoint_path(checkpoint_path) -> str:
+    if checkpoint_path.endswith(CHECKPOINT_SUFFIX):
+        return checkpoint_path
+    return checkpoint_path + CHECKPOINT_SUFFIX
+
+
+def _get_digest(csv_file_path, begin, end) -> str:
+    assert 0 <= begin and begin <= end, (begin, end)
+    with open(csv_file_path, 'rb') as csv_file:
+        csv_file.seek(begin)
+        bl = csv_file.read(end - begin)
+    assert len(bl) == end - begin, (len(bl), begin, end)
+    return hashlib.sha256(bl).hexdigest()
+
+
+def _get_fingerprints(csv_file_path, offset) -> tuple:
+    return (
+        _get_digest(csv_file_path, 0, min(FINGERPRINT_SIZE, offset)),
+        _get_digest(csv_file_path, max(0, offset - FINGERPRINT_SIZE), offset),
+    )
+
+
+def load_checkpoint(checkpoint_path, csv_file_path, quote_character,
+                    delimiter_character,
+                    distinct_precision = None) -> tuple:
+
+    # (nothing to resume from: the file is parsed from its begin)
+    empty = (
+        0,
+        CSVStatistics(
+            quote_character     = quote_character,
+            delimiter_character = delimiter_character,
+            distinct_precision  = distinct_precision,
+        ),
+    )
+
+    checkpoint_path = get_checkpoint_path(checkpoint_path)
+    if not os.path.isfile(checkpoint_path):
+        return empty
+
+    with open(checkpoint_path, 'rb') as checkpoint_file:
+        cp = pickle.load(checkpoint_file)
+    assert isinstance(cp, dict), type(cp)
+
+    if CHECKPOINT_VERSION != cp['version']:
+        return empty
+    if os.path.abspath(csv_file_path) != cp['csv_file_path']:
+        return empty
+    if quote_character     != cp['quote_character'    ] or \
+       delimiter_character != cp['delimiter_character']:
+        return empty
+    assert 'state_begin_row_read' == cp['state'], cp['state']
+
+    offset = cp['offset']
+    assert isinstance(offset, int), type(offset)
+
+    # the file was truncated
+    if os.path.getsize(csv_file_path) < offset:
+        return empty
+    # the file was rewritten
+    if cp['fingerprints'] != _get_fingerprints(csv_file_path, offset):
+        return empty
+
+    assert isinstance(cp['statistics'], CSVStatistics), type(cp['statistics'])
+    # (the sketches of the distinct values only merge at one precision)
+    if distinct_precision != cp['statistics'].get_distinct_precision():
+        return empty
+    return (offset, cp['statistics'])
+
+
+def save_checkpoint(checkpoint_path, csv_file_path, offset,
+                    statistics) -> None:
+
+    assert isinstance(statistics, CSVStatistics), type(statistics)
+
+    cp = {
+        'version'             : CHECKPOINT_VERSION,
+        'csv_file_path'       : os.path.abspath(csv_file_path),
+        'quote_character'     : statistics._quote_character,
+        'delimiter_character' : statistics._delimiter_character,
+        'offset'              : offset,
+        'state'               : 'state_begin_row_read',
+        'fingerprints'        : _get_fingerprints(csv_file_path, offset),
+        'statistics'          : statistics,
+    }
+
+    # (written to a temporary file first, so that an interrupted save does
+    # not leave a corrupt checkpoint behind)
+    checkpoint_path = get_checkpoint_path(checkpoint_path)
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'wb') as checkpoint_file:
+        pickle.dump(cp, checkpoint_file)
+    os.replace(tmp_path, checkpoint_path)
+
+    return None
+
+
+def get_statistics_incrementally(csv_file_path, checkpoint_path,
+                                 **kwargs) -> CSVStatistics:
+
+    assert 'byte_range' not in kwargs, kwargs
+    qc = kwargs.get('quote_character',     0x22)
+    dc = kwargs.get('delimiter_character', 0x2c)
+    bs = kwargs.get('block_size',          1 << 20)
+    dp = kwargs.get('distinct_precision',  None)
+
+    assert os.path.isfile(csv_file_path), csv_file_path
+    # (the offsets are those of the bytes of the file as it is on disk)
+    if detect_compression(csv_file_path) is not None:
+        raise ValueError(
+            f'a checkpoint requires an uncompressed csv file: {csv_file_path}'
+        )
+    size = os.path.getsize(csv_file_path)
+
+    offset, statistics = load_checkpoint(checkpoint_path, csv_file_path,
+                                         qc, dc, dp)
+
+    # The appended bytes up to the last complete row boundary are parsed and
+    # merged into the checkpoint; the bytes after it (a final row that may
+    # still be being written) are parsed, but are not checkpointed.
+    # lre: last row end
+    lre = find_last_row_end(csv_file_path, offset, size, qc, bs)
+
+    for bb, be, save in ((offset, lre, True), (lre, size, False)):
+        if bb < be:
+            csvs = CSVStream(
+                csv_file_path,
+                byte_range = (bb, be),
+                **kwargs,
+            )
+            assert statistics.merge(csvs._get_parse_result()) is None
+            del csvs
+        if save is True:
+            assert save_checkpoint(checkpoint_path, csv_file_path, be,
+                                   statistics) is None
+    del offset, lre
+
+    return statistics
@@ -0,0 +1,183 @@
+import os
+
+
+# A csv file is split into chunks that each begin at a row boundary, so that
+# each chunk can be parsed on its own, starting in the begin-row-read state.
+#
+# Every line feed that is not inside a quoted cell ends a row. Inside a
+# quoted cell a quote character is always doubled (or ends the cell), and
+# outside of a quoted cell a quote character always begins one (anything
+# else is a csv syntax error); so a byte is inside a quoted cell iff an odd
+# number of quote characters precede it in the file. The split is therefore
+# done in two passes: the quote characters of each (nominal) chunk are
+# counted, which gives the quote parity at each nominal chunk begin, and
+# then each nominal chunk begin is advanced to just past the first line feed
+# at or after it at which the parity is even.
+
+
+def count_byte(csv_file_path, begin, end, byte, block_size) -> int:
+
+    assert isinstance(byte, int), type(byte)
+    assert 0 <= byte and byte < 256, byte
+    assert 0 <= begin and begin <= end, (begin, end)
+
+    # ba: byte array [of length one, holding byte]
+    ba = bytes([byte])
+
+    n = 0
+    with open(csv_file_path, 'rb') as csv_file:
+        csv_file.seek(begin)
+        # bi: byte index
+        bi = begin
+        while bi < end:
+            bl = csv_file.read(min(block_size, end - bi))
+            assert 0 < len(bl), (bi, end)
+            n  += bl.count(ba)
+            bi += len(bl)
+        assert bi == end, (bi, end)
+
+    return n
+
+
+def find_row_begin(csv_file_path, begin, end, parity, quote_character,
+                   block_size) -> int:
+
+    assert 0 <= begin and begin <= end, (begin, end)
+    assert parity in (0, 1), parity
+
+    LF = b'\x0a'
+    qc = bytes([quote_character])
+
+    with open(csv_file_path, 'rb') as csv_file:
+        csv_file.seek(begin)
+        # bi: byte index [of the first byte of bl]
+        bi = begin
+        while bi < end:
+            bl = csv_file.read(min(block_size, end - bi))
+            assert 0 < len(bl), (bi, end)
+
+            # i: block-local index [of the next byte to scan]
+            i = 0
+            while True:
+                # j: block-local index of the next line feed
+                j = bl.find(LF, i)
+                if -1 == j:
+                    parity ^= bl.count(qc, i) & 1
+                    break
+                parity ^= bl.count(qc, i, j) & 1
+                if 0 == parity:
+                    return bi + j + 1
+                i = j + 1
+
+            bi += len(bl)
+        assert bi == end, (bi, end)
+
+    return end
+
+
+# Returns the offset just past the last line feed in [begin, end) that ends
+# a row (i.e., at which the quote parity is even, begin being a row begin),
+# or begin, if there is none.
+def find_last_row_end(csv_file_path, begin, end, quote_character,
+                      block_size) -> int:
+
+    assert 0 <= begin and begin <= end, (begin, end)
+
+    LF = b'\x0a'
+    qc = bytes([quote_character])
+
+    # lre: last row end
+    lre = begin
+    parity = 0
+    with open(csv_file_path, 'rb') as csv_file:
+        csv_file.seek(begin)
+        # bi: byte index [of the first byte of bl]
+        bi = begin
+        while bi < end:
+            bl = csv_file.read(min(block_size, end - bi))
+            assert 0 < len(bl), (bi, end)
+
+            # i: block-local index [of the next byte to scan]
+            i = 0
+            while True:
+                # j: block-local index of the next line feed
+                j = bl.find(LF, i)
+                if -1 == j:
+                    parity ^= bl.count(qc, i) & 1
+                    break
+                parity ^= bl.count(qc, i, j) & 1
+                if 0 == parity:
+                    lre = bi + j + 1
+                i = j + 1
+
+            bi += len(bl)
+        assert bi == end, (bi, end)
+
+    return lre
+
+
+def split_csv_file(executor, csv_file_path, begin, end, n_chunks,
+                   quote_character, block_size) -> list:
+
+    assert isinstance(n_chunks, int), type(n_chunks)
+    assert 1 <= n_chunks, n_chunks
+    assert 0 <= begin and begin < end, (begin, end)
+    assert end <= os.path.getsize(csv_file_path), (end, csv_file_path)
+
+    # nbs: nominal [chunk] begins
+    nbs = [begin + k * (end - begin) // n_chunks for k in range(n_chunks)]
+    nbs.append(end)
+
+    # first pass: quote parity at each nominal chunk begin
+    counts = list(
+        executor.map(
+            count_byte,
+            [csv_file_path  ] * n_chunks,
+            nbs[:-1],
+            nbs[1:],
+            [quote_character] * n_chunks,
+            [block_size     ] * n_chunks,
+        )
+    )
+    parities = [0]
+    for n in counts[:-1]:
+        parities.append((parities[-1] + n) % 2)
+    del counts
+
+    # second pass: advance each nominal chunk begin to a row begin
+    rbs = list(
+        executor.map(
+            find_row_begin,
+            [csv_file_path  ] * (n_chunks - 1),
+            nbs[1:-1],
+            [end            ] * (n_chunks - 1),
+            parities[1:],
+            [quote_character] * (n_chunks - 1),
+            [block_size     ] * (n_chunks - 1),
+        )
+    )
+    del nbs, parities
+
+    # Chunks that do not contain a row boundary of their own (for example,
+    # because they lie inside a large quoted cell) are absorbed into the
+    # preceding chunk.
+    # brs: byte ranges
+    brs = []
+    # bb: byte range begin
+    bb = begin
+    for rb in rbs + [end]:
+        assert bb <= end, (bb, end)
+        if bb < rb:
+            brs.append((bb, rb))
+            bb = rb
+    assert bb == end, (bb, end)
+    assert 0 < len(brs)
+
+    return brs
+
+
+def parse_byte_range(cls, kwargs):
+
+    csvt = cls(**kwargs)
+    # (the profile of the worker, if any, is merged into that of the parent)
+    return (csvt._get_parse_result(), csvt._profile)
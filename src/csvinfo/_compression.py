@@ -0,0 +1,125 @@
+import re
+import bz2
+import gzip
+import lzma
+import queue
+import threading
+
+
+# A compressed csv file is parsed straight from a streaming decompressor,
+# without being decompressed to disk first. Its compression format is
+# detected by its magic bytes (not by its file name extension).
+#
+# The decompression runs in a separate thread, which reads blocks ahead of
+# the parser into a bounded queue, so that it overlaps the parsing (the
+# decompressors release the GIL while they work).
+
+# (the magic of bz2, BZh, is followed by the block size, 1 to 9, and by the
+# magic of the first block, or of the end of the stream, if it is empty; the
+# three letters alone would take a plain csv file that begins with them
+# for bz2)
+MAGICS = (
+    ('gzip', re.compile(rb'\x1f\x8b'                                   )),
+    ('bz2' , re.compile(rb'BZh[1-9](?:1AY&SY|\x17\x72\x45\x38\x50\x90)')),
+    ('xz'  , re.compile(rb'\xfd\x37\x7a\x58\x5a\x00'                   )),
+    ('zstd', re.compile(rb'\x28\xb5\x2f\xfd'                           )),
+)
+
+# (the number of bytes that the longest magic takes)
+MAGIC_SIZE = 10
+
+
+def detect_compression(csv_file_path) -> str:
+    with open(csv_file_path, 'rb') as csv_file:
+        head = csv_file.read(MAGIC_SIZE)
+    for compression, magic in MAGICS:
+        if magic.match(head) is not None:
+            return compression
+    return None
+
+
+def open_decompressed(csv_file_path, compression):
+
+    if   'gzip' == compression: return gzip.open(csv_file_path, 'rb')
+    elif 'bz2'  == compression: return bz2 .open(csv_file_path, 'rb')
+    elif 'xz'   == compression: return lzma.open(csv_file_path, 'rb')
+    elif 'zstd' == compression:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                'zstd compressed csv files require zstandard: ' + \
+                'pip install csvinfo[zstd]'
+            ) from e
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(csv_file_path, 'rb'),
+            closefd = True,
+        )
+    else:
+        raise ValueError(f'unknown compression: {compression}')
+
+
+class ThreadedReader:
+    def __init__(self, raw, block_size, depth = 4):
+        assert isinstance(block_size, int), type(block_size)
+        assert 0 < block_size, block_size
+        self._raw        = raw
+        self._block_size = block_size
+        self._queue      = queue.Queue(maxsize = depth)
+        self._stop       = threading.Event()
+        # bl : block [currently being read from]
+        # bli: block-local index [of the next byte to read]
+        self._bl         = b''
+        self._bli        = 0
+        self._eof        = False
+        self._thread     = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+
+    def _run(self) -> None:
+        # (the end of the stream is put as an empty block, and an error is
+        # put as itself, to be raised in the reading thread)
+        try:
+            while not self._stop.is_set():
+                bl = self._raw.read(self._block_size)
+                self._queue.put(bl)
+                if 0 == len(bl):
+                    break
+        except BaseException as e:
+            self._queue.put(e)
+        return None
+
+
+    # Returns at most n bytes (fewer, at a block boundary); an empty result
+    # means that the end of the stream was reached.
+    def read(self, n) -> bytes:
+        assert isinstance(n, int), type(n)
+        assert 0 < n, n
+        if len(self._bl) == self._bli:
+            if self._eof is True:
+                return b''
+            bl = self._queue.get()
+            if isinstance(bl, BaseException):
+                raise bl
+            if 0 == len(bl):
+                self._eof = True
+                return b''
+            self._bl  = bl
+            self._bli = 0
+        bl = self._bl[self._bli:self._bli + n]
+        self._bli += len(bl)
+        return bl
+
+
+    def close(self) -> None:
+        self._stop.set()
+        # (the queue is drained, so that the thread is not left blocked on
+        # a full queue)
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout = 0.01)
+            except queue.Empty:
+                pass
+        self._thread.join()
+        self._raw.close()
+        return None
@@ -0,0 +1,66 @@
+# In lenient mode, a csv syntax error does not abort the parse: the error is
+# recorded in an error log, the row in which it occurred is discarded, and
+# the parse resumes at the next line feed (i.e., at the next plausible row
+# boundary; the bytes from the begin of the row up to it are skipped). The
+# statistics are then those of the rows that were parsed.
+#
+# The log keeps the first max_errors errors (with their byte index, the
+# index that the row would have had, the parser state, and the byte), and
+# counts all of them, and the bytes that were skipped.
+#
+# A lenient parse is in a single process: a parse in parallel (see
+# _chunks.py) splits the file where the parity of the quote characters says
+# that rows begin, and past an error, the parity may be off.
+
+MAX_ERRORS = 100
+
+
+class CSVSyntaxError(ValueError):
+    pass
+
+
+class ErrorLog:
+    def __init__(self, max_errors = MAX_ERRORS):
+        assert isinstance(max_errors, int), type(max_errors)
+        assert 0 <= max_errors, max_errors
+        self._max_errors      = max_errors
+        self._errors          = []
+        self._n_errors        = 0
+        self._n_skipped_bytes = 0
+
+
+    def __len__(self) -> int:
+        return self._n_errors
+
+
+    def add(self, byteidx, rowidx, state, byte) -> None:
+        self._n_errors += 1
+        if len(self._errors) < self._max_errors:
+            self._errors.append(
+                {
+                    'byteidx': byteidx,
+                    'rowidx' : rowidx,
+                    'state'  : state,
+                    'byte'   : None if -1 == byte else f'0x{byte:02x}',
+                }
+            )
+        return None
+
+
+    def skip(self, n_bytes) -> None:
+        assert isinstance(n_bytes, int), type(n_bytes)
+        assert 0 <= n_bytes, n_bytes
+        self._n_skipped_bytes += n_bytes
+        return None
+
+
+    def get_errors(self) -> list:
+        return [dict(error) for error in self._errors]
+
+
+    def get_summary(self) -> dict:
+        return {
+            'n_errors'       : self._n_errors,
+            'n_logged_errors': len(self._errors),
+            'n_skipped_bytes': self._n_skipped_bytes,
+        }
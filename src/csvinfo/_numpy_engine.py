@@ -0,0 +1,297 @@
+try:
+    import numpy
+except ImportError as e:
+    raise ImportError(
+        'the numpy engine requires numpy: pip install csvinfo[numpy]'
+    ) from e
+
+
+LF = 0x0a
+CR = 0x0d
+
+
+# Returns whether a block that continues a row (whose bytes before the block
+# leave the quote parity at parity) holds a line feed that ends the row, and
+# the quote parity at the end of the block. A block that does not is carried
+# on, without being indexed, so that a row that spans many blocks is not
+# indexed again with each of them.
+def scan_parity(bl, qc, parity) -> tuple:
+
+    assert isinstance(bl, bytes), type(bl)
+    assert parity in (0, 1), parity
+
+    if 0 == len(bl):
+        return (False, parity)
+
+    # a: [byte] array
+    # p: quote parity [through the byte]
+    a = numpy.frombuffer(bl, dtype = numpy.uint8)
+    p = numpy.bitwise_xor.accumulate((a == qc).view(numpy.uint8))
+    if 1 == parity:
+        p ^= 1
+
+    return (bool(numpy.any((a == LF) & (p == 0))), int(p[-1]))
+
+
+# Returns the number of set elements of the boolean array x before each of
+# its elements, and before its end.
+def _count_before(x) -> numpy.ndarray:
+    c = numpy.zeros(len(x) + 1, dtype = numpy.int64)
+    numpy.cumsum(x, out = c[1:])
+    return c
+
+
+# Builds the structural index of a block of the csv file that begins at a
+# row boundary, in the spirit of simdcsv: the positions of the quote
+# characters, delimiters, line feeds and carriage returns are found with
+# vectorized compares, and a prefix-xor over the quote positions gives, for
+# each byte, whether it is inside a quoted cell (the quote parity; see
+# _chunks.py). From these, the cells of all of the rows are found in bulk:
+# their bounds, quoted attributes, subsequent delimiters and content counts,
+# and which bytes of the block are content (see get_columns).
+#
+# Only the complete rows of the block are indexed (all of it, if final), and
+# the number of bytes they span (cut) is returned with the index; the
+# remaining bytes begin a row that continues in the next block.
+#
+# The rows that the vectorized path does not handle are marked irregular,
+# and are left to the scalar parser: those with leading spaces before a
+# quoted cell, with spaces after a quoted cell (whether as a delimiter or
+# trailing), and those with a csv syntax error. (The cells of an irregular
+# row are found as those of the others are, but are never used.)
+def index_rows(blk, qc, dc, final) -> tuple:
+
+    assert isinstance(blk, bytes), type(blk)
+    assert final in (True, False), final
+
+    # a: [byte] array
+    a = numpy.frombuffer(blk, dtype = numpy.uint8)
+
+    # q: [byte is a] quote character
+    # p: quote parity [through the byte]
+    # o: [byte is] outside of a quoted cell
+    q = a == qc
+    p = numpy.bitwise_xor.accumulate(q.view(numpy.uint8))
+    o = p == 0
+
+    lf = (a == LF) & o
+
+    # lfs: [positions of the] line feeds [that end rows]
+    lfs = numpy.flatnonzero(lf)
+
+    if final is True:
+        cut = len(a)
+    elif 0 == len(lfs):
+        return (0, None)
+    else:
+        cut = int(lfs[-1]) + 1
+
+    a  = a [:cut]
+    q  = q [:cut]
+    p  = p [:cut]
+    o  = o [:cut]
+    lf = lf[:cut]
+
+    # nx: next byte [-1 past the end]
+    # pv: previous byte [LF before the begin, since a row begins there]
+    nx = numpy.full(cut, -1, dtype = numpy.int16)
+    nx[:-1] = a[1:]
+    pv = numpy.full(cut, LF, dtype = numpy.int16)
+    pv[1:] = a[:-1]
+
+    # ir: [byte makes its row] irregular
+    ir = numpy.zeros(cut, dtype = bool)
+
+    # a carriage return outside of a quoted cell must end a row
+    cr = (a == CR) & o
+    ir |= cr & (nx != LF)
+
+    # a quote character that opens a quoted cell must begin the cell (or
+    # be the second of a doubled quote character)
+    ir |= q & ~o & (pv != dc) & (pv != LF) & (pv != qc)
+
+    # a quote character that closes a quoted cell must be doubled, or be
+    # followed by a delimiter, a newline or the end of the file
+    ir |= q & o & (nx != qc) & (nx != dc) & (nx != LF) & (nx != CR) & \
+        ((nx != -1) | (final is False))
+
+    # a quoted cell must be closed before the end of the file
+    if 0 < cut and 1 == p[-1]:
+        ir[-1] = True
+
+    # rbs: row begins
+    # res: row ends [position of the ending line feed, or cut at eof]
+    lfs = numpy.flatnonzero(lf)
+    rbs = numpy.concatenate(([0], lfs + 1))
+    res = numpy.concatenate((lfs, [cut]))
+    if rbs[-1] == cut:
+        # (there is no row after the final line feed)
+        rbs = rbs[:-1]
+        res = res[:-1]
+    nr = len(rbs)
+
+    # ri: row index [of each byte]
+    ri = numpy.cumsum(lf) - lf
+    irs = set(numpy.unique(ri[ir]).tolist())
+
+    # nes: newline encodings [as codes: eof, lf, cr lf; see _CSVStore]
+    # rces: row content ends
+    nes = numpy.where(res == cut, 0, 1).astype(numpy.int8)
+    crlf = numpy.zeros(nr, dtype = bool)
+    crlf[nes == 1] = cr[numpy.maximum(res[nes == 1] - 1, 0)] & \
+        (rbs[nes == 1] < res[nes == 1])
+    nes[crlf] = 2
+    rces = res - crlf
+
+    # dcs: [positions of the] delimiters [outside of quoted cells]
+    # dbs: [index in dcs of the first] delimiter [of each] row
+    dcs = numpy.flatnonzero((a == dc) & o)
+    dbs = numpy.searchsorted(dcs, rbs)
+
+    # The cells: each row's cells end at its delimiters, and at its content
+    # end; the first cell of row k is cell dbs[k] + k.
+    # ces: cell ends [raw, i.e., at the delimiter or the row content end]
+    # cbs: cell begins [raw, i.e., after the delimiter or at the row begin]
+    # fcs: first cells [of the rows]
+    # (fcs holds one more element, past the last cell)
+    ces = numpy.sort(numpy.concatenate((dcs, rces)))
+    fcs = numpy.append(dbs + numpy.arange(nr), len(ces))
+    cbs = numpy.empty(len(ces), dtype = ces.dtype)
+    cbs[1:] = ces[:-1] + 1
+    cbs[fcs[:-1]] = rbs
+
+    # qts: quoted [cells]
+    qts = (cbs < ces) & (a[numpy.minimum(cbs, max(cut - 1, 0))] == qc) \
+        if 0 < cut else numpy.zeros(len(ces), dtype = bool)
+    cbs = cbs + qts
+    ces = ces - qts
+
+    # The bytes of the contents of the cells are those that are neither a
+    # delimiter, nor a newline, nor a quote character, outside of a quoted
+    # cell, but for the second of each doubled quote character.
+    # kp: [byte is] kept [as content]
+    # ck: [number of bytes] kept [before each byte, and before cut]
+    dq = numpy.zeros(cut, dtype = bool)
+    dq[1:] = q[1:] & ~o[1:] & q[:-1] & o[:-1]
+    kp = ~(((a == dc) & o) | lf | cr | q) | dq
+    ck = _count_before(kp)
+
+    # The content counts (see NO_CONTENT_COUNTS): the quote characters, line
+    # feeds and cr lfs among the kept bytes of each cell.
+    # cq, cl, ccl: [numbers of kept] quote characters, line feeds and cr lfs
+    #              [before each byte]
+    kl = kp & (a == LF)
+    kcl = numpy.zeros(cut, dtype = bool)
+    kcl[:-1] = kp[:-1] & (a[:-1] == CR) & kl[1:]
+    cq  = _count_before(kp & q)
+    cl  = _count_before(kl)
+    ccl = _count_before(kcl)
+    nqs  = cq [ces] - cq [cbs]
+    ncls = ccl[ces] - ccl[cbs]
+    nls  = cl [ces] - cl [cbs] - ncls
+
+    # (an empty, final row at the end of the file, i.e., one that holds only
+    # an empty cell, is discarded, as it is by the scalar parser)
+    if 0 < nr and 0 == nes[-1] and nr - 1 not in irs and \
+       1 == fcs[-1] - fcs[-2] and ck[ces[-1]] == ck[cbs[-1]]:
+        rbs = rbs[:-1]
+        res = res[:-1]
+        nes = nes[:-1]
+        fcs = fcs[:-1]
+
+    return (
+        cut,
+        (
+            rbs,
+            res,
+            irs,
+            (a, kp, ck, nes, fcs, cbs, ces, qts, nqs, nls, ncls),
+        ),
+    )
+
+
+# Returns the columns of the rows [k, kk) of an indexed block (none of them
+# irregular; see index_rows), that begins at the byte offset co of the csv
+# file, in the layout of the arrays of _CSVStore (see _CSVStore.load_columns),
+# with the offsets of a store that holds only these rows. If the csv file is
+# mapped, the contents of the cells are spans of the mapping, but for those
+# of the cells that hold a (doubled) quote character, and the empty ones,
+# which are copied.
+def get_columns(co, cut, index, k, kk, dc, mapped) -> tuple:
+
+    rbs, res, _, (a, kp, ck, nes, fcs, cbs, ces, qts, nqs, nls, ncls) = index
+    assert 0 <= k and k < kk and kk <= len(rbs), (k, kk, len(rbs))
+
+    # ci, cci: cell index [of the first cell of row k, and past the last
+    #          cell of row kk - 1]
+    ci  = int(fcs[k])
+    cci = int(fcs[kk])
+
+    # rb, re: [the byte range that the rows span, including the newline]
+    rb = int(rbs[k])
+    re = int(res[kk - 1])
+    if re < cut:
+        re += 1
+
+    cbs = cbs[ci:cci]
+    ces = ces[ci:cci]
+
+    # (per cell)
+    # sds: subsequent delimiters [the delimiter, but after the final cell of
+    #      each row]
+    # ros: row [cell] ends
+    ros = numpy.append(fcs[k + 1:kk], cci) - ci
+    sds = numpy.full(cci - ci, dc, dtype = numpy.int8)
+    sds[ros - 1] = -1
+
+    ccd = {}
+    for j in numpy.flatnonzero((0 < nqs[ci:cci]) | (0 < nls[ci:cci]) |
+                               (0 < ncls[ci:cci])).tolist():
+        ccd[j] = (
+            int(nqs [ci + j]),
+            int(nls [ci + j]),
+            int(ncls[ci + j]),
+        )
+
+    # cls: content lengths
+    # sbs: store [cell] begins [or None, if the csv file is not mapped]
+    # ses: store [cell] ends
+    # cps: copied [bits, or None]
+    cls = ck[ces] - ck[cbs]
+    if mapped is False:
+        content = a[rb:re][kp[rb:re]].tobytes()
+        sbs = None
+        ses = ck[ces] - ck[rb]
+        cps = None
+    else:
+        # (the contents of the copied cells are concatenated)
+        # cp : copied [cells]
+        # ccl: copied [cell] content lengths
+        cp  = (0 < nqs[ci:cci]) | (0 == cls)
+        ccl = numpy.where(cp, cls, 0)
+        content = b''.join(
+            a[b:e][kp[b:e]].tobytes()
+            for b, e in zip(cbs[0 < ccl].tolist(), ces[0 < ccl].tolist())
+        )
+        ses = numpy.cumsum(ccl)
+        sbs = numpy.where(cp, ses - ccl, co + cbs)
+        ses = numpy.where(cp, ses,       co + ces)
+        sbs = sbs.astype(numpy.uint64).tobytes()
+        cps = numpy.packbits(cp, bitorder = 'little').tobytes()
+        del cp, ccl
+
+    rows = slice(k, kk)
+    return (
+        content,
+        sbs,
+        ses.astype(numpy.uint64).tobytes(),
+        cps,
+        numpy.packbits(qts[ci:cci], bitorder = 'little').tobytes(),
+        sds.tobytes(),
+        ccd,
+        ros.astype(numpy.uint64).tobytes(),
+        nes[rows].tobytes(),
+        bytes(-(-(kk - k) // 8)),
+        (res[rows] - rbs[rows] + (nes[rows] != 0)).astype(numpy.uint64)
+        .tobytes(),
+    )
@@ -0,0 +1,272 @@
+import sys
+import json
+
+
+# The statistics are written in one of several formats:
+#
+#   text : aligned key value lines, for people
+#   json : a json object (in batch mode, a columnar json object that maps
+#          each column to the list of its values, one per file, which
+#          columnar loaders such as pyarrow.Table.from_pydict take as is)
+#   jsonl: a json object per line (per file, in batch mode)
+#   tsv  : a header line and a line of tab-separated values (per file, in
+#          batch mode)
+#
+# Except for text (which aligns the values) and batch json (which is
+# columnar), the records are written as soon as they are known.
+
+FORMATS = ('text', 'json', 'jsonl', 'tsv')
+
+# The counts that the aggregate over the files of a batch has, and the files
+# do not (see _batch.py); in batch tsv, they are extra columns, which are
+# empty but in the final (aggregate) row.
+AGGREGATE_KEYS = ('n_files', 'n_failed_files')
+
+
+def _escape_tsv_field(v) -> str:
+    if v is None:
+        return ''
+    v = str(v)
+    v = v.replace('\\', '\\\\')
+    v = v.replace('\t', '\\t' )
+    v = v.replace('\n', '\\n' )
+    v = v.replace('\r', '\\r' )
+    return v
+
+
+def _write_tsv_line(vs, out) -> None:
+    out.write('\t'.join(_escape_tsv_field(v) for v in vs) + '\n')
+    return None
+
+
+def _write_text(csvs, out) -> None:
+
+    assert isinstance(csvs, dict), type(csvs)
+    assert 0 < len(csvs)
+
+    max_k_width = max(len(    k ) for k in csvs.keys  ())
+    max_v_width = max(len(str(v)) for v in csvs.values())
+
+    for k, v in csvs.items():
+        k =     k .ljust(max_k_width)
+        v = str(v).rjust(max_v_width)
+        out.write(f'{k}{" "*2}{v}\n')
+
+    return None
+
+
+def write_statistics(csvs, format = 'text', out = sys.stdout) -> None:
+
+    assert isinstance(csvs, dict), type(csvs)
+    assert format in FORMATS, format
+
+    if   'text'  == format: _write_text(csvs, out)
+    elif 'json'  == format: out.write(json.dumps(csvs, indent = 2) + '\n')
+    elif 'jsonl' == format: out.write(json.dumps(csvs) + '\n')
+    elif 'tsv'   == format:
+        _write_tsv_line(csvs.keys(),   out)
+        _write_tsv_line(csvs.values(), out)
+    else:
+        raise ValueError(f'unknown format: {format}')
+
+    return None
+
+
+# Writes the per-column statistics as a table with a row per column: aligned
+# for text, a list of objects for json, an object per line for jsonl, and a
+# header line and a line per column for tsv.
+def write_column_statistics(css, format = 'text', out = sys.stdout) -> None:
+
+    assert isinstance(css, list), type(css)
+    assert 0 < len(css)
+    assert format in FORMATS, format
+
+    if 'text' == format:
+        ks = list(css[0].keys())
+        # vss: values [of each column, formatted]
+        vss = [
+            [f'{v:.3f}' if isinstance(v, float) else str(v) for v in cs.values()]
+            for cs in css
+        ]
+        ws = [
+            max([len(k)] + [len(vs[i]) for vs in vss]) for i, k in enumerate(ks)
+        ]
+        out.write('  '.join(k.rjust(w) for k, w in zip(ks, ws)) + '\n')
+        for vs in vss:
+            out.write('  '.join(v.rjust(w) for v, w in zip(vs, ws)) + '\n')
+        del ks, vss, ws
+    elif 'json'  == format: out.write(json.dumps(css, indent = 2) + '\n')
+    elif 'jsonl' == format:
+        for cs in css:
+            out.write(json.dumps(cs) + '\n')
+    elif 'tsv'   == format:
+        _write_tsv_line(css[0].keys(), out)
+        for cs in css:
+            _write_tsv_line(cs.values(), out)
+    else:
+        raise ValueError(f'unknown format: {format}')
+
+    return None
+
+
+# The parser profile (see _profile.py) is flattened to key value pairs for
+# text and tsv: the wall and cpu time of each phase, the bytes consumed in
+# each state, and (for tsv) the count of each transition; for text, the
+# transitions follow as a table.
+def _flatten_parser_profile(profile, transitions) -> dict:
+    fpp = {}
+    for phase, ts in profile['phases'].items():
+        for k, v in ts.items():
+            fpp[f'{phase}_{k}'] = v
+    for state, n in profile['state_bytes'].items():
+        fpp[f'bytes_in_{state}'] = n
+    if transitions is True:
+        for t in profile['transitions']:
+            fpp[f'{t["from"]}->{t["to"]}'] = t['count']
+    return fpp
+
+
+def write_parser_profile(profile, format = 'text', out = sys.stderr) -> None:
+
+    assert isinstance(profile, dict), type(profile)
+    assert format in FORMATS, format
+
+    if   'text'  == format:
+        _write_text(_flatten_parser_profile(profile, False), out)
+        if 0 < len(profile['transitions']):
+            out.write('\n')
+            write_column_statistics(profile['transitions'], 'text', out)
+    elif 'json'  == format: out.write(json.dumps(profile, indent = 2) + '\n')
+    elif 'jsonl' == format: out.write(json.dumps(profile) + '\n')
+    elif 'tsv'   == format:
+        fpp = _flatten_parser_profile(profile, True)
+        _write_tsv_line(fpp.keys(),   out)
+        _write_tsv_line(fpp.values(), out)
+        del fpp
+    else:
+        raise ValueError(f'unknown format: {format}')
+
+    return None
+
+
+# Writes the statistics of the files of a batch, one record per file, as
+# each file is profiled, followed by the aggregate over all of them.
+#
+# The records of the files have the columns csv_file_path and error,
+# followed by the statistics (which are empty, or null, for a file that
+# failed). The columns of the statistics are taken from the first file that
+# did not fail; for tsv, the records of the files that failed before it are
+# held back until then, so that the header comes first.
+class BatchWriter:
+    def __init__(self, format = 'text', out = sys.stdout):
+        assert format in FORMATS, format
+        self._format  = format
+        self._out     = out
+        self._keys    = None
+        self._pending = []
+        # (batch json is columnar, and so is only written at the end)
+        self._columns = None
+
+
+    def _get_record(self, csv_file_path, csvs, error) -> dict:
+        assert self._keys is not None
+        record = {'csv_file_path': csv_file_path, 'error': error}
+        for k in self._keys:
+            record[k] = None if csvs is None else csvs.get(k)
+        return record
+
+
+    def _write_record(self, record) -> None:
+
+        if   'jsonl' == self._format:
+            self._out.write(json.dumps(record) + '\n')
+        elif 'tsv'   == self._format:
+            record = {**record, **{k: record.get(k) for k in AGGREGATE_KEYS}}
+            if self._columns is None:
+                _write_tsv_line(record.keys(), self._out)
+                self._columns = list(record.keys())
+            assert list(record.keys()) == self._columns, record.keys()
+            _write_tsv_line(record.values(), self._out)
+        elif 'json'  == self._format:
+            if self._columns is None:
+                self._columns = {k: [] for k in record.keys()}
+            for k, v in record.items():
+                self._columns[k].append(v)
+        else:
+            raise ValueError(f'unknown format: {self._format}')
+
+        return None
+
+
+    def write_file(self, csv_file_path, csvs, error) -> None:
+
+        assert (csvs is None) != (error is None), (csvs, error)
+
+        if 'text' == self._format:
+            self._out.write(f'==> {csv_file_path} <==\n')
+            if error is None: _write_text(csvs,             self._out)
+            else            : _write_text({'error': error}, self._out)
+            self._out.write('\n')
+            self._out.flush()
+            return None
+
+        if self._keys is None:
+            if csvs is None:
+                self._pending.append((csv_file_path, error))
+                return None
+            self._keys = list(csvs.keys())
+            pending = self._pending
+            self._pending = []
+            for cfp, e in pending:
+                self._write_record(self._get_record(cfp, None, e))
+            del pending
+
+        self._write_record(self._get_record(csv_file_path, csvs, error))
+        self._out.flush()
+
+        return None
+
+
+    def write_aggregate(self, aggregate) -> None:
+
+        assert isinstance(aggregate, dict), type(aggregate)
+
+        if 'text' == self._format:
+            self._out.write('==> * <==\n')
+            _write_text(aggregate, self._out)
+            return None
+
+        # (if every file failed, the files have no statistics columns)
+        if self._keys is None:
+            self._keys = []
+            pending = self._pending
+            self._pending = []
+            for cfp, e in pending:
+                self._write_record(self._get_record(cfp, None, e))
+            del pending
+
+        if   'jsonl' == self._format:
+            self._out.write(json.dumps({'aggregate': aggregate}) + '\n')
+        elif 'tsv'   == self._format:
+            # (the aggregate is a final row, whose path is *)
+            record = self._get_record('*', aggregate, None)
+            for k in AGGREGATE_KEYS:
+                record[k] = aggregate.get(k)
+            assert self._write_record(record) is None
+            del record
+        elif 'json'  == self._format:
+            if self._columns is None:
+                self._columns = {
+                    k: [] for k in ['csv_file_path', 'error'] + self._keys
+                }
+            self._out.write(
+                json.dumps(
+                    {'files': self._columns, 'aggregate': aggregate},
+                    indent = 2,
+                ) + '\n'
+            )
+        else:
+            raise ValueError(f'unknown format: {self._format}')
+        self._out.flush()
+
+        return None
@@ -0,0 +1,109 @@
+import time
+from contextlib import contextmanager
+
+
+# A parser profile records where the parser spends its work: the number of
+# bytes consumed in each state, the number of transitions between each pair
+# of states, and the wall and cpu time of each phase (the parse, and the
+# tabulation of the statistics). A tree (or stream) is profiled only if it is
+# given a profile; otherwise the parser does no more than check for one.
+#
+# A transition is counted per byte consumed, as the paranoid parser consumes
+# them: a byte that leaves the state unchanged is a transition from the state
+# to itself. (The fast parser moves from the begin of a cell to an unquoted
+# cell before consuming the first byte of the cell, and so counts that
+# transition with no byte; the paranoid parser ends the file with a
+# transition to the eof state. The numpy engine runs the state machine only
+# on the rows that it marks irregular, and so counts only those.)
+#
+# The cpu time is that of the calling process; for a parse in parallel (see
+# _chunks.py), the counts of the workers are merged in, but not their time.
+#
+# The hook, if any, is called with the phase and the profile at the end of
+# each phase, e.g., to send the profile to a metrics system.
+
+
+class ParserProfile:
+    def __init__(self, hook = None):
+        assert hook is None or callable(hook), type(hook)
+        # tr: transitions [(state, state) -> count]
+        # sb: state bytes [state -> count]
+        # ph: phases [phase -> [wall seconds, cpu seconds]]
+        self._tr   = {}
+        self._sb   = {}
+        self._ph   = {}
+        self._hook = hook
+
+
+    # (the hook may not be picklable, and is not sent to worker processes)
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        state['_hook'] = None
+        return state
+
+
+    # Counts a pass of the parser that consumed n_bytes bytes in the state
+    # state_from, and left it in the state state_to. A pass that did neither
+    # (e.g., a block refill) is not a transition, and is not counted.
+    def count_pass(self, state_from, state_to, n_bytes) -> None:
+        assert isinstance(n_bytes, int), type(n_bytes)
+        assert 0 <= n_bytes, n_bytes
+        if 0 == n_bytes and state_from == state_to:
+            return None
+        tr = self._tr
+        if 0 < n_bytes:
+            self._sb[state_from] = self._sb.get(state_from, 0) + n_bytes
+            if 1 < n_bytes:
+                k = (state_from, state_from)
+                tr[k] = tr.get(k, 0) + n_bytes - 1
+        k = (state_from, state_to)
+        tr[k] = tr.get(k, 0) + 1
+        return None
+
+
+    @contextmanager
+    def time_phase(self, phase):
+        w0 = time.perf_counter()
+        c0 = time.process_time()
+        try:
+            yield self
+        finally:
+            w1 = time.perf_counter()
+            c1 = time.process_time()
+            ts = self._ph.setdefault(phase, [0.0, 0.0])
+            ts[0] += w1 - w0
+            ts[1] += c1 - c0
+            del w0, c0, w1, c1, ts
+        if self._hook is not None:
+            self._hook(phase, self)
+
+
+    # The counts of another profile (e.g., of the chunk that a worker
+    # process parsed) are added to those of this one; its phases are not, as
+    # they overlap those of this one.
+    def merge(self, other) -> None:
+        assert isinstance(other, ParserProfile), type(other)
+        for k, n in other._tr.items():
+            self._tr[k] = self._tr.get(k, 0) + n
+        for k, n in other._sb.items():
+            self._sb[k] = self._sb.get(k, 0) + n
+        return None
+
+
+    def get_profile(self) -> dict:
+        return {
+            'phases': {
+                phase: {
+                    'wall_seconds': round(ts[0], 6),
+                    'cpu_seconds' : round(ts[1], 6),
+                }
+                for phase, ts in self._ph.items()
+            },
+            'state_bytes': dict(
+                sorted(self._sb.items(), key = lambda kv: -kv[1])
+            ),
+            'transitions': [
+                {'from': k[0], 'to': k[1], 'count': n}
+                for k, n in sorted(self._tr.items(), key = lambda kv: -kv[1])
+            ],
+        }
@@ -0,0 +1,352 @@
+import os
+import json
+import struct
+import hashlib
+from array import array
+
+from ._compression import detect_compression
+
+
+# A row index records the byte offset at which each row of a csv file
+# begins, so that any range of rows can be parsed on its own (as a byte
+# range) without parsing the rows before it.
+#
+# The row begins are found as the chunk begins are (see _chunks.py): a row
+# begins after each line feed at which the quote parity is even, and at the
+# begin of the file. (The empty row after a final line feed is not a row.)
+#
+# The index is written to a sidecar file (by default, the csv file path with
+# .rowidx appended): a json header line, which identifies the csv file (its
+# size, and digests of its head and tail) and the quote character that the
+# index was built with; then a table of anchors, one for every anchor
+# interval rows (the rows 0, K, 2K, ...), each of two fixed-width integers:
+# the row begin of the anchor row, and the offset (into the deltas) of the
+# deltas of the rows after it; and then the deltas: the differences between
+# the begins of the other rows and of the rows before them, each encoded as
+# an unsigned LEB128 varint (so a row of fewer than 128 bytes takes one byte
+# of the index). The begin of a row is then looked up by reading its anchor
+# and decoding (at most K - 1) deltas, whatever the number of rows.
+
+ROW_INDEX_VERSION = 2
+
+ROW_INDEX_ANCHOR_INTERVAL = 1 << 10
+
+# (an anchor: the row begin, and the offset of the deltas after it)
+ANCHOR = struct.Struct('<QQ')
+
+ROW_INDEX_SUFFIX = '.rowidx'
+
+# fs: fingerprint size [in bytes]
+FINGERPRINT_SIZE = 1 << 12
+
+
+def get_row_index_path(csv_file_path) -> str:
+    return csv_file_path + ROW_INDEX_SUFFIX
+
+
+def _get_fingerprint(csv_file_path) -> list:
+    size = os.path.getsize(csv_file_path)
+    with open(csv_file_path, 'rb') as csv_file:
+        head = csv_file.read(min(FINGERPRINT_SIZE, size))
+        csv_file.seek(max(0, size - FINGERPRINT_SIZE))
+        tail = csv_file.read()
+    return [
+        size,
+        hashlib.sha256(head).hexdigest(),
+        hashlib.sha256(tail).hexdigest(),
+    ]
+
+
+# Returns whether the bytes [begin, end) of the csv file are a row that holds
+# only an empty cell (i.e., two quote characters, with any spaces before and
+# after them), without reading more of it than it takes to tell.
+def _is_empty_cell_row(csv_file, begin, end, qc, block_size) -> bool:
+
+    assert begin < end, (begin, end)
+
+    SP = b'\x20'
+    # ex: expected [non-space bytes]
+    ex = qc + qc
+
+    csv_file.seek(begin)
+    # bi: byte index [of the first byte of bl]
+    bi = begin
+    while bi < end:
+        bl = csv_file.read(min(block_size, end - bi))
+        assert 0 < len(bl), (bi, end)
+        bi += len(bl)
+        if 0 < len(ex):
+            bl = bl.lstrip(SP) if ex == qc + qc else bl
+            # (the quote characters may straddle two blocks)
+            n = min(len(ex), len(bl))
+            if bl[:n] != ex[:n]:
+                return False
+            ex = ex[n:]
+            bl = bl[n:]
+        if 0 < len(bl.strip(SP)):
+            return False
+
+    return 0 == len(ex)
+
+
+# Returns the row begins of the csv file, found with a scan; if rowidx_end
+# is given, the scan stops once the begin of the row rowidx_end (or the end
+# of the file, if that is where the row would begin) is found, as the rows
+# [0, rowidx_end) then span [rbs[0], rbs[rowidx_end]).
+def build_row_index(csv_file_path, quote_character = 0x22,
+                    block_size = 1 << 20, rowidx_end = None) -> array:
+
+    assert os.path.isfile(csv_file_path), csv_file_path
+    # (the offsets are those of the bytes of the file as it is on disk)
+    if detect_compression(csv_file_path) is not None:
+        raise ValueError(
+            f'a row index requires an uncompressed csv file: {csv_file_path}'
+        )
+    size = os.path.getsize(csv_file_path)
+
+    LF = b'\x0a'
+    qc = bytes([quote_character])
+
+    # rbs: row begins
+    rbs = array('Q')
+    if 0 == size:
+        return rbs
+    rbs.append(0)
+
+    parity = 0
+    with open(csv_file_path, 'rb') as csv_file:
+        # bi: byte index [of the first byte of bl]
+        bi = 0
+        while bi < size:
+            bl = csv_file.read(min(block_size, size - bi))
+            assert 0 < len(bl), (bi, size)
+
+            # i: block-local index [of the next byte to scan]
+            i = 0
+            while True:
+                # j: block-local index of the next line feed
+                j = bl.find(LF, i)
+                if -1 == j:
+                    parity ^= bl.count(qc, i) & 1
+                    break
+                parity ^= bl.count(qc, i, j) & 1
+                if 0 == parity:
+                    rbs.append(bi + j + 1)
+                    if rowidx_end is not None and rowidx_end < len(rbs):
+                        return rbs
+                i = j + 1
+
+            bi += len(bl)
+        assert bi == size, (bi, size)
+
+        # (a final line feed ends the last row; it does not begin one, and
+        # neither does a final row that holds only an empty cell, which the
+        # parser discards)
+        if size == rbs[-1] or _is_empty_cell_row(
+            csv_file, rbs[-1], size, qc, block_size,
+        ):
+            rbs.pop()
+
+    return rbs
+
+
+def write_row_index(csv_file_path, index_path = None, quote_character = 0x22,
+                    block_size = 1 << 20,
+                    anchor_interval = ROW_INDEX_ANCHOR_INTERVAL) -> str:
+
+    assert isinstance(anchor_interval, int), type(anchor_interval)
+    assert 1 <= anchor_interval, anchor_interval
+
+    if index_path is None:
+        index_path = get_row_index_path(csv_file_path)
+
+    rbs = build_row_index(csv_file_path, quote_character, block_size)
+
+    header = {
+        'version'         : ROW_INDEX_VERSION,
+        'quote_character' : quote_character,
+        'fingerprint'     : _get_fingerprint(csv_file_path),
+        'n_rows'          : len(rbs),
+        'anchor_interval' : anchor_interval,
+    }
+
+    # ans: anchors
+    # ds : deltas [varint encoded]
+    ans = bytearray()
+    ds  = bytearray()
+    # pb: previous [row] begin
+    pb = 0
+    for rowidx, rb in enumerate(rbs):
+        if 0 == rowidx % anchor_interval:
+            ans += ANCHOR.pack(rb, len(ds))
+        else:
+            d = rb - pb
+            while 0x80 <= d:
+                ds.append((d & 0x7f) | 0x80)
+                d >>= 7
+            ds.append(d)
+        pb = rb
+    del rbs, pb
+
+    # (written to a temporary file first, so that an interrupted write does
+    # not leave a corrupt index behind)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as index_file:
+        index_file.write(json.dumps(header).encode() + b'\n')
+        index_file.write(ans)
+        index_file.write(ds)
+    os.replace(tmp_path, index_path)
+    del header, ans, ds
+
+    return index_path
+
+
+# A row index that was loaded: the begin of a row is looked up (with
+# rbs[rowidx]) by reading the anchor of its anchor interval, and decoding the
+# deltas of the rows from the anchor to it, from the index file; and the
+# begins of all of the rows are decoded in order by iterating it.
+class RowIndex:
+    __slots__ = (
+        '_index_path',
+        '_n_rows',
+        '_anchor_interval',
+        '_anchors_begin',
+        '_deltas_begin',
+        '_size',
+    )
+
+    def __init__(self, index_path, n_rows, anchor_interval, anchors_begin):
+        n_anchors = -(-n_rows // anchor_interval)
+        self._index_path      = index_path
+        self._n_rows          = n_rows
+        self._anchor_interval = anchor_interval
+        self._anchors_begin   = anchors_begin
+        self._deltas_begin    = anchors_begin + n_anchors * ANCHOR.size
+        self._size            = os.path.getsize(index_path)
+        if self._size < self._deltas_begin:
+            raise ValueError(f'truncated row index: {index_path}')
+
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+
+    def __getitem__(self, rowidx) -> int:
+
+        assert isinstance(rowidx, int), type(rowidx)
+        if not (0 <= rowidx and rowidx < self._n_rows):
+            raise IndexError(rowidx)
+
+        # ai: anchor index
+        # m : [the number of deltas from the anchor to the row]
+        ai, m = divmod(rowidx, self._anchor_interval)
+        with open(self._index_path, 'rb') as index_file:
+            # ab: anchor begin
+            ab = self._anchors_begin + ai * ANCHOR.size
+            index_file.seek(ab)
+            # (the deltas of the interval end where those of the next
+            # anchor begin, or at the end of the index)
+            ans = index_file.read(min(2 * ANCHOR.size,
+                                      self._deltas_begin - ab))
+            rb, db = ANCHOR.unpack_from(ans, 0)
+            if 0 == m:
+                return rb
+            # de: deltas end
+            if len(ans) == 2 * ANCHOR.size:
+                de = ANCHOR.unpack_from(ans, ANCHOR.size)[1]
+            else:
+                de = self._size - self._deltas_begin
+            index_file.seek(self._deltas_begin + db)
+            ds = index_file.read(de - db)
+        del ab, ans, db, de
+
+        # d: delta
+        # s: shift
+        d = 0
+        s = 0
+        for b in ds:
+            d |= (b & 0x7f) << s
+            if b & 0x80:
+                s += 7
+                continue
+            rb += d
+            m -= 1
+            if 0 == m:
+                return rb
+            d = 0
+            s = 0
+        raise ValueError(f'truncated row index: {self._index_path}')
+
+
+    def __iter__(self):
+
+        with open(self._index_path, 'rb') as index_file:
+            index_file.seek(self._anchors_begin)
+            ans = index_file.read(self._deltas_begin - self._anchors_begin)
+            ds = index_file.read()
+
+        # rb: row begin
+        # d : delta
+        # s : shift
+        rb = 0
+        d  = 0
+        s  = 0
+        # di: delta index [of the next byte of ds]
+        di = 0
+        for rowidx in range(self._n_rows):
+            if 0 == rowidx % self._anchor_interval:
+                rb, db = ANCHOR.unpack_from(
+                    ans, (rowidx // self._anchor_interval) * ANCHOR.size,
+                )
+                assert db == di, (db, di)
+                yield rb
+                continue
+            while True:
+                b = ds[di]
+                di += 1
+                d |= (b & 0x7f) << s
+                if b & 0x80:
+                    s += 7
+                    continue
+                break
+            rb += d
+            d = 0
+            s = 0
+            yield rb
+        assert len(ds) == di, (len(ds), di)
+
+        return None
+
+
+# Returns the row index of the csv file; or None, if there is no index, or if
+# it is stale (i.e., was built of another version of the file, or by another
+# version of csvinfo) or was built with another quote character.
+def load_row_index(csv_file_path, index_path = None,
+                   quote_character = 0x22) -> RowIndex:
+
+    if index_path is None:
+        index_path = get_row_index_path(csv_file_path)
+    if not os.path.isfile(index_path):
+        return None
+
+    with open(index_path, 'rb') as index_file:
+        try:
+            header = json.loads(index_file.readline())
+        except ValueError:
+            return None
+        anchors_begin = index_file.tell()
+
+    if not isinstance(header, dict) or \
+       ROW_INDEX_VERSION != header.get('version'):
+        return None
+    if quote_character != header['quote_character']:
+        return None
+    if _get_fingerprint(csv_file_path) != header['fingerprint']:
+        return None
+
+    return RowIndex(
+        index_path,
+        header['n_rows'],
+        header['anchor_interval'],
+        anchors_begin,
+    )
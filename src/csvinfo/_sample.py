@@ -0,0 +1,226 @@
+import os
+import math
+
+from . import CSVStream
+from . import CSVStatistics
+from ._chunks import find_row_begin
+from ._chunks import find_last_row_end
+from ._compression import detect_compression
+
+
+# The statistics of a (huge) csv file are estimated from samples of it: the
+# file is divided into n_samples equal strata, and from the begin of each
+# stratum (but the last, whose sample is taken from its end), sample_size
+# bytes (rounded down to whole rows) are parsed.
+#
+# A sample that begins inside the file must first be resynchronized to a row
+# boundary, with the quote-aware logic of _chunks.py; but the quote parity at
+# the begin of the sample is not known without counting the quote characters
+# before it (which is the full scan that sampling is meant to avoid). So both
+# parities are tried: the row begin found under each is parsed from, and the
+# sample is kept under the parity under which it parses without a csv syntax
+# error. A sample under which both parse is kept under the one whose rows are
+# consistent with those of the unambiguous samples (i.e., have numbers of
+# cells within the range of theirs), if only one is; and is otherwise
+# skipped, as is a sample under which neither parses, or that holds no
+# complete row.
+#
+# Each additive count is then extrapolated to the whole file as a ratio
+# estimate (count per byte of the samples, times the size of the file),
+# with a 95% confidence interval taken over the samples (as clusters). The
+# extremes (e.g., n_cells_in_row_max) are those of the samples, and so are
+# only bounds; the row indices of the extremes are not estimated. The
+# quantiles (e.g., row_size_p50) are those of the samples; and so are the
+# estimates of the numbers of distinct and duplicate rows, which do not grow
+# in proportion to the bytes, and so are not extrapolated (and are reported
+# as, e.g., n_distinct_rows_sample_estimate, as they are not estimates of
+# those of the whole file, as n_distinct_rows_estimate is). A count that is
+# of the file as a whole (e.g., n_rows_ended_by_eof, which is 0 or 1) is
+# that of the final sample (the one that reaches the end of the file), or,
+# if the final sample could not be parsed, is not known.
+
+Z_95 = 1.959963984540054
+
+PER_FILE_KEYS = ('n_rows_ended_by_eof',)
+
+
+def _get_additive_keys(csvs) -> list:
+    return [
+        k for k in csvs.keys()
+        if k.startswith('n_') and not k.startswith('n_cells_in_row_') and \
+           not k.endswith('_estimate') and k not in PER_FILE_KEYS
+    ]
+
+
+def _parse_sample(csv_file_path, bb, be, kwargs) -> CSVStatistics:
+    assert bb < be, (bb, be)
+    return CSVStream(
+        csv_file_path,
+        byte_range = (bb, be),
+        **kwargs,
+    )._tabulate_statistics()
+
+
+def sample_statistics(csv_file_path, n_samples, sample_size,
+                      **kwargs) -> dict:
+
+    assert 'byte_range' not in kwargs, kwargs
+    assert 1 == kwargs.get('jobs', 1), kwargs
+    assert isinstance(n_samples, int), type(n_samples)
+    assert 1 <= n_samples, n_samples
+    assert isinstance(sample_size, int), type(sample_size)
+    assert 0 < sample_size, sample_size
+
+    qc = kwargs.get('quote_character', 0x22)
+    bs = kwargs.get('block_size',      1 << 20)
+
+    assert os.path.isfile(csv_file_path), csv_file_path
+    # (the offsets are those of the bytes of the file as it is on disk)
+    if detect_compression(csv_file_path) is not None:
+        raise ValueError(
+            f'sampling requires an uncompressed csv file: {csv_file_path}'
+        )
+    size = os.path.getsize(csv_file_path)
+    assert 0 < size, csv_file_path
+
+    # (if the samples would cover the file, it is parsed in full, and the
+    # statistics are exact)
+    if size <= n_samples * sample_size:
+        csvs = CSVStream(csv_file_path, **kwargs).get_statistics()
+        csvs = {'sampled': False, **csvs}
+        return csvs
+
+    # samples  : (byte count, statistics, [whether it is the] final [sample])
+    #            [of each sample]
+    # ambiguous: [the samples under each parity, of each sample under which
+    #            both parities parse]
+    samples   = []
+    ambiguous = []
+    for k in range(n_samples):
+        # sb: sample begin [nominal]
+        # (the sample of the final stratum is taken from its end, rather
+        # than from its begin, so that it reaches the end of the file; see
+        # PER_FILE_KEYS)
+        sb = k * size // n_samples
+        if n_samples - 1 == k:
+            sb = max(sb, size - sample_size)
+        se = min(size, sb + sample_size)
+
+        # parsed: [the sample under each parity under which it parses]
+        # rbs   : row begins [of the parities tried]
+        parsed = []
+        rbs    = []
+        for parity in ((0,) if 0 == sb else (0, 1)):
+            # rb: row begin
+            # re: row end [of the last complete row of the sample]
+            if 0 == sb: rb = 0
+            else      : rb = find_row_begin(csv_file_path, sb, se, parity,
+                                            qc, bs)
+            # (both parities may lead to the same row begin, and so to the
+            # same rows)
+            if rb in rbs:
+                continue
+            rbs.append(rb)
+            if size == se: re = size
+            else         : re = find_last_row_end(csv_file_path, rb, se,
+                                                  qc, bs)
+            if not (rb < re):
+                continue
+            try:
+                csvs = _parse_sample(csv_file_path, rb, re, kwargs)
+            except ValueError:
+                continue
+            if 0 < len(csvs):
+                parsed.append((re - rb, csvs, size == re))
+            del csvs
+        if   1 == len(parsed): samples.append(parsed[0])
+        elif 2 == len(parsed): ambiguous.append(parsed)
+        del sb, se, parsed, rbs
+
+    # (a sample under which both parities parse is kept under the parity
+    # under which its rows have numbers of cells within the range of those
+    # of the unambiguous samples, if there is only one such parity)
+    if 0 < len(samples) and 0 < len(ambiguous):
+        # ncs: n cells [in row] (min, max) [of each sample]
+        def get_ncs(csvs) -> tuple:
+            d = csvs.get_statistics()
+            return (d['n_cells_in_row_min'], d['n_cells_in_row_max'])
+        ncs = [get_ncs(s) for _, s, _ in samples]
+        lo = min(mn for mn, _ in ncs)
+        hi = max(mx for _, mx in ncs)
+        for parsed in ambiguous:
+            consistent = [
+                p for p in parsed
+                if lo <= get_ncs(p[1])[0] and get_ncs(p[1])[1] <= hi
+            ]
+            if 1 == len(consistent):
+                samples.append(consistent[0])
+            del consistent
+        del ncs, lo, hi
+    del ambiguous
+
+    if 0 == len(samples):
+        raise ValueError(
+            f'no sample of {csv_file_path} could be parsed; ' + \
+            'try a larger sample size'
+        )
+
+    # csvs: [the merged] csv statistics [of the samples]
+    csvs = CSVStatistics(
+        quote_character     = kwargs.get('quote_character',     0x22),
+        delimiter_character = kwargs.get('delimiter_character', 0x2c),
+        distinct_precision  = kwargs.get('distinct_precision',  None),
+    )
+    for _, s, _ in samples:
+        assert csvs.merge(s) is None
+    merged = csvs.get_statistics()
+    del csvs
+
+    n = len(samples)
+    # nbs: n bytes [of each sample]
+    # ds : [the statistics] dicts [of each sample]
+    nbs = [b                  for b, _, _ in samples]
+    ds  = [s.get_statistics() for _, s, _ in samples]
+    # nsb: n sampled bytes
+    nsb = sum(nbs)
+    # fpc: finite population correction
+    fpc = max(0.0, 1.0 - nsb / size)
+
+    estimate = {
+        'sampled'         : True,
+        'n_samples'       : n,
+        'n_sampled_bytes' : nsb,
+        'n_sampled_rows'  : merged['n_rows'],
+    }
+    for key in _get_additive_keys(merged):
+        # r: ratio [i.e., count per byte]
+        r = merged[key] / nsb
+        if 1 < n:
+            # (the variance of the ratio estimate over the samples)
+            ss = sum(
+                (d[key] - r * b) ** 2 for b, d in zip(nbs, ds)
+            ) / (n - 1)
+            hw = Z_95 * size * math.sqrt(fpc * ss / n) / (nsb / n)
+            hw = round(hw)
+        else:
+            hw = None
+        estimate[key]           = round(r * size)
+        estimate[key + '_ci95'] = hw
+        del r, hw
+    for key in ('n_cells_in_row_max', 'n_cells_in_row_rounded_mean',
+                'n_cells_in_row_min'):
+        estimate[key] = merged[key]
+    for key in merged.keys():
+        if key.startswith(('cell_content_length_', 'row_size_')):
+            estimate[key] = merged[key]
+        elif key.endswith('_estimate'):
+            estimate[key[:-len('_estimate')] + '_sample_estimate'] = \
+                merged[key]
+    for key in PER_FILE_KEYS:
+        estimate[key] = None
+        for d, (_, _, final) in zip(ds, samples):
+            if final is True:
+                estimate[key] = d[key]
+    del samples, nbs, ds, merged
+
+    return estimate
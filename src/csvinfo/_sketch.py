@@ -0,0 +1,231 @@
+import math
+import hashlib
+
+
+# A quantile sketch summarizes a distribution of non-negative integers (the
+# content lengths of the cells, or the byte lengths of the rows) in bounded
+# memory: each value is counted in a bucket, and the buckets are exact for
+# the values below 2**SIGNIFICANT_BITS, and keep the SIGNIFICANT_BITS most
+# significant bits of the larger ones (so a quantile is reported rounded
+# down, by less than 1/2**(SIGNIFICANT_BITS-1) of itself). There are at most
+# 2**SIGNIFICANT_BITS buckets per power of two, whatever the number of
+# values; and as the buckets are fixed, two sketches merge exactly (unlike,
+# e.g., a sampling sketch), so that the sketches of the chunks of a parallel
+# parse, or of the files of a batch, add up to that of the whole.
+
+SIGNIFICANT_BITS = 8
+
+# The quantiles that are reported (besides the max, which is kept exactly).
+QUANTILES = (
+    ('p50', 0.50),
+    ('p90', 0.90),
+    ('p99', 0.99),
+)
+
+
+class QuantileSketch:
+    __slots__ = (
+        '_counts',
+        '_n',
+        '_max',
+    )
+
+    def __init__(self):
+        # (bucket key -> count; see _get_key)
+        self._counts = {}
+        self._n      = 0
+        self._max    = None
+
+
+    def __len__(self) -> int:
+        return self._n
+
+
+    # The key of a value below 2**SIGNIFICANT_BITS is the value itself; that
+    # of a larger value is its number of dropped bits (its shift), followed
+    # by its significant bits. The keys are ordered as the values are.
+    @staticmethod
+    def _get_key(v) -> int:
+        s = v.bit_length() - SIGNIFICANT_BITS
+        if s <= 0:
+            return v
+        return (s << SIGNIFICANT_BITS) | (v >> s)
+
+
+    # The least value of the bucket.
+    @staticmethod
+    def _get_value(k) -> int:
+        s = k >> SIGNIFICANT_BITS
+        if 0 == s:
+            return k
+        return (k & ((1 << SIGNIFICANT_BITS) - 1)) << s
+
+
+    def add(self, v) -> None:
+        # (inlined _get_key, as this is called per cell)
+        s = v.bit_length() - SIGNIFICANT_BITS
+        k = v if s <= 0 else (s << SIGNIFICANT_BITS) | (v >> s)
+        counts = self._counts
+        counts[k] = counts.get(k, 0) + 1
+        self._n += 1
+        if self._max is None or self._max < v:
+            self._max = v
+        return None
+
+
+    def merge(self, other) -> None:
+        assert isinstance(other, QuantileSketch), type(other)
+        for k, n in other._counts.items():
+            self._counts[k] = self._counts.get(k, 0) + n
+        self._n += other._n
+        if other._max is not None and \
+           (self._max is None or self._max < other._max):
+            self._max = other._max
+        return None
+
+
+    # Returns the least value v such that a fraction q of the values is at
+    # most v (as bucketed; the max is exact).
+    def get_quantile(self, q) -> int:
+        assert 0.0 <= q and q <= 1.0, q
+        if 0 == self._n:
+            return None
+        # r: rank [of the quantile, counted from 1]
+        r = max(1, math.ceil(q * self._n))
+        c = 0
+        for k in sorted(self._counts):
+            c += self._counts[k]
+            if r <= c:
+                return min(self._get_value(k), self._max)
+        return self._max
+
+
+    def get_quantiles(self) -> dict:
+        qs = {name: self.get_quantile(q) for name, q in QUANTILES}
+        qs['max'] = self._max
+        return qs
+
+
+# A HyperLogLog sketch estimates the number of distinct values (the contents
+# of the cells of a column, or the rows) in a fixed memory budget: each
+# value is hashed to 64 bits, the first precision bits of which select one
+# of 2**precision registers (of a byte each), and the register keeps the
+# largest rank (the position of the first 1 bit) of the rest of the bits of
+# the hashes that it was selected by. The relative standard error of the
+# estimate is about 1.04/sqrt(2**precision) (i.e., 1.6% at the suggested
+# precision of 12, with 4 KiB per sketch), and small counts are counted
+# (nearly) exactly, by linear counting. The statistics build these sketches
+# only if a distinct precision is given (see CSVStatistics).
+#
+# The hash is blake2b (rather than hash, which is salted per process), so
+# that the sketches of the chunks of a parallel parse, of the files of a
+# batch, or of the shards of a file profiled on different machines, merge
+# (register by register, by max) into the sketch of the whole; the sketches
+# of different precisions do not merge. A sketch is serialized with
+# to_bytes, and deserialized with from_bytes.
+
+HLL_PRECISION = 12
+
+HLL_MIN_PRECISION = 4
+HLL_MAX_PRECISION = 16
+
+# (the hash of a quoted cell is that of its content, flipped by a constant,
+# so that a quoted and an unquoted cell of the same content are distinct;
+# and the hash of a row is a polynomial, modulo 2**64, in the hashes of its
+# cells, so that the order of the cells matters)
+HLL_QUOTED_MASK    = 0x9e3779b97f4a7c15
+HLL_ROW_MULTIPLIER = 0x100000001b3
+HLL_MASK           = (1 << 64) - 1
+
+
+def hash_content(content) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(content, digest_size = 8).digest(), 'little',
+    )
+
+
+class HyperLogLog:
+    __slots__ = (
+        '_precision',
+        '_registers',
+    )
+
+    def __init__(self, precision = HLL_PRECISION):
+        assert isinstance(precision, int), type(precision)
+        if not (HLL_MIN_PRECISION <= precision and
+                precision <= HLL_MAX_PRECISION):
+            raise ValueError(
+                f'the precision of a hyperloglog sketch is from ' + \
+                f'{HLL_MIN_PRECISION} to {HLL_MAX_PRECISION}: {precision}'
+            )
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+
+
+    def get_precision(self) -> int:
+        return self._precision
+
+
+    # Adds the value whose (64 bit) hash is h.
+    def add(self, h) -> None:
+        p = self._precision
+        # w: [the rest of the] word [after the register index]
+        w = h & ((1 << (64 - p)) - 1)
+        # r: rank
+        r = 64 - p - w.bit_length() + 1
+        rs = self._registers
+        k = h >> (64 - p)
+        if rs[k] < r:
+            rs[k] = r
+        return None
+
+
+    def merge(self, other) -> None:
+        assert isinstance(other, HyperLogLog), type(other)
+        if self._precision != other._precision:
+            raise ValueError(
+                'hyperloglog sketches of different precisions cannot be ' + \
+                f'merged: {self._precision} != {other._precision}'
+            )
+        self._registers = bytearray(
+            map(max, self._registers, other._registers)
+        )
+        return None
+
+
+    def get_estimate(self) -> int:
+        rs = self._registers
+        m = len(rs)
+        if   16 == m: alpha = 0.673
+        elif 32 == m: alpha = 0.697
+        elif 64 == m: alpha = 0.709
+        else        : alpha = 0.7213 / (1.0 + 1.079 / m)
+        # (the registers are counted by value, rather than summed one by
+        # one)
+        s = 0.0
+        for r in range(64 - self._precision + 2):
+            n = rs.count(r)
+            if 0 < n:
+                s += n * 2.0 ** -r
+        e = alpha * m * m / s
+        # (the small range correction: linear counting)
+        z = rs.count(0)
+        if e <= 2.5 * m and 0 < z:
+            e = m * math.log(m / z)
+        return round(e)
+
+
+    def to_bytes(self) -> bytes:
+        return bytes([self._precision]) + bytes(self._registers)
+
+
+    @classmethod
+    def from_bytes(cls, b) -> 'HyperLogLog':
+        hll = cls(b[0])
+        if len(b) != 1 + len(hll._registers):
+            raise ValueError(
+                f'not a hyperloglog sketch of precision {b[0]}: ' + \
+                f'{len(b)} bytes'
+            )
+        hll._registers[:] = b[1:]
+        return hll
@@ -0,0 +1,204 @@
+import io
+import os
+
+from . import CSVStream
+from ._compression import open_decompressed
+from ._compression import detect_compression
+from ._stream import is_stream
+from ._stream import peek_stream
+
+
+# The dialect (quote character and delimiter character) of a csv file is
+# sniffed from a prefix of it, before it is parsed in full.
+#
+# The candidates are first screened by byte frequency: a quote character or a
+# delimiter character that does not occur in the prefix is only kept if it is
+# the default, since it would parse the prefix as the default does. Each of
+# the remaining (quote character, delimiter character) pairs is then used to
+# parse the prefix (up to its last complete row), and is scored:
+#
+#   1. the prefix must parse without a csv syntax error;
+#   2. the rows should be consistent, i.e., all have the same number of cells;
+#   3. the more delimiters per row, the better (a delimiter character that is
+#      never used makes every row a single cell, which is trivially
+#      consistent);
+#   4. the more quoted cells, the better (a quote character that quotes
+#      nothing is no evidence of itself);
+#
+# and ties are broken in favor of the defaults (0x22 and 0x2c).
+
+QUOTE_CHARACTERS     = (0x22, 0x27)
+DELIMITER_CHARACTERS = (0x2c, 0x09)
+
+# ps: prefix size [in bytes]
+PREFIX_SIZE = 1 << 14
+
+
+# Returns the offset just past the last line feed of the prefix that ends a
+# row (as find_last_row_end does, but in memory), or 0, if there is none.
+def _find_last_row_end(prefix, qc) -> int:
+    LF = b'\x0a'
+    qb = bytes([qc])
+    # lre: last row end
+    lre = 0
+    parity = 0
+    i = 0
+    while True:
+        j = prefix.find(LF, i)
+        if -1 == j:
+            break
+        parity ^= prefix.count(qb, i, j) & 1
+        if 0 == parity:
+            lre = j + 1
+        i = j + 1
+    return lre
+
+
+# The prefix (up to its last complete row, unless it is the whole file) is
+# parsed in memory, as a stream (see _stream.py); the sketches of the
+# distinct values, which the score does not take, are not built.
+def _score_dialect(prefix, is_whole, qc, dc, block_size) -> tuple:
+
+    # lre: last row end
+    lre = len(prefix)
+    if is_whole is False:
+        lre = _find_last_row_end(prefix, qc)
+        if 0 == lre:
+            # (the prefix holds no complete row; it is parsed as is)
+            lre = len(prefix)
+
+    try:
+        csvs = CSVStream(
+            io.BytesIO(prefix[:lre]),
+            quote_character     = qc,
+            delimiter_character = dc,
+            block_size          = block_size,
+            distinct_precision  = None,
+        )
+    except ValueError:
+        return None
+    if 0 == len(csvs):
+        return None
+    csvs = csvs.get_statistics()
+
+    n_delimiters = csvs['n_conventional_cell_delimiters'] + \
+                   csvs['n_spaces_cell_delimiters']
+
+    return (
+        csvs['n_cells_in_row_min'] == csvs['n_cells_in_row_max'],
+        n_delimiters / csvs['n_rows'],
+        csvs['n_quoted_cells'],
+        qc == QUOTE_CHARACTERS[0],
+        dc == DELIMITER_CHARACTERS[0],
+    )
+
+
+def sniff_dialect(csv_file_path, quote_character = None,
+                  delimiter_character = None, prefix_size = PREFIX_SIZE,
+                  block_size = 1 << 20) -> tuple:
+
+    assert os.path.isfile(csv_file_path), csv_file_path
+    assert 0 < os.path.getsize(csv_file_path), csv_file_path
+
+    # (the prefix of a compressed csv file is that of its decompressed bytes)
+    compression = detect_compression(csv_file_path)
+    if compression is None:
+        csv_file = open(csv_file_path, 'rb')
+    else:
+        csv_file = open_decompressed(csv_file_path, compression)
+    with csv_file:
+        # (one byte more than the prefix is read, to tell whether the prefix
+        # is the whole file)
+        prefix = csv_file.read(prefix_size + 1)
+    del compression, csv_file
+    is_whole = len(prefix) <= prefix_size
+    prefix = prefix[:prefix_size]
+
+    return sniff_prefix_dialect(
+        prefix,
+        is_whole,
+        quote_character     = quote_character,
+        delimiter_character = delimiter_character,
+        block_size          = block_size,
+    )
+
+
+# Sniffs the dialect from the prefix of a csv file (or stream) that is given;
+# is_whole tells whether the prefix is the whole of it.
+def sniff_prefix_dialect(prefix, is_whole, quote_character = None,
+                         delimiter_character = None,
+                         block_size = 1 << 20) -> tuple:
+
+    assert isinstance(prefix, bytes), type(prefix)
+    assert is_whole in (True, False), is_whole
+
+    # qcs: quote characters [that are candidates]
+    # dcs: delimiter characters [that are candidates]
+    # (a character that is given is the only candidate)
+    if quote_character is None:
+        qcs = [c for c in QUOTE_CHARACTERS if 0 < prefix.count(bytes([c]))]
+        if QUOTE_CHARACTERS[0] not in qcs:
+            qcs.insert(0, QUOTE_CHARACTERS[0])
+    else:
+        qcs = [quote_character]
+    if delimiter_character is None:
+        dcs = [c for c in DELIMITER_CHARACTERS if 0 < prefix.count(bytes([c]))]
+        if DELIMITER_CHARACTERS[0] not in dcs:
+            dcs.insert(0, DELIMITER_CHARACTERS[0])
+    else:
+        dcs = [delimiter_character]
+
+    # (if no candidate parses the prefix, the first is kept, so that the
+    # full parse reports the csv syntax error)
+    best = (qcs[0], dcs[0])
+    best_score = None
+    for qc in qcs:
+        for dc in dcs:
+            score = _score_dialect(prefix, is_whole, qc, dc, block_size)
+            if score is None:
+                continue
+            if best_score is None or best_score < score:
+                best = (qc, dc)
+                best_score = score
+            del score
+    del prefix, qcs, dcs, best_score
+
+    return best
+
+
+# Returns the csv file path (or stream) and kwargs, with the quote_character
+# and delimiter_character of kwargs set; those that are None are sniffed. (A
+# stream is replaced by one that yields the prefix that was sniffed from it,
+# and then the rest of it.)
+def resolve_dialect(csv_file_path, kwargs) -> tuple:
+
+    qc = kwargs.get('quote_character',     QUOTE_CHARACTERS    [0])
+    dc = kwargs.get('delimiter_character', DELIMITER_CHARACTERS[0])
+    if qc is not None and dc is not None:
+        return (csv_file_path, kwargs)
+
+    bs = kwargs.get('block_size', 1 << 20)
+    if is_stream(csv_file_path):
+        prefix, csv_file_path = peek_stream(csv_file_path, PREFIX_SIZE + 1,
+                                            bs)
+        qc, dc = sniff_prefix_dialect(
+            prefix[:PREFIX_SIZE],
+            len(prefix) <= PREFIX_SIZE,
+            quote_character     = qc,
+            delimiter_character = dc,
+            block_size          = bs,
+        )
+        del prefix
+    else:
+        qc, dc = sniff_dialect(
+            csv_file_path,
+            quote_character     = qc,
+            delimiter_character = dc,
+            block_size          = bs,
+        )
+
+    kwargs = dict(kwargs)
+    kwargs['quote_character']     = qc
+    kwargs['delimiter_character'] = dc
+
+    return (csv_file_path, kwargs)
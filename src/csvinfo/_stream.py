@@ -0,0 +1,85 @@
+import os
+
+
+# Besides a named csv file, a csv tree (or stream) can be parsed from any
+# readable binary file-like object (e.g., sys.stdin.buffer, or the body of an
+# object-store response), or from an iterator of byte chunks; such a source
+# is read once, from its begin to its end, in blocks, as a compressed csv file
+# is (see _compression.py).
+
+
+def is_stream(source) -> bool:
+    return not isinstance(source, (str, os.PathLike))
+
+
+class StreamReader:
+    def __init__(self, source):
+        assert is_stream(source), type(source)
+        if hasattr(source, 'read'):
+            self._file   = source
+            self._chunks = None
+        else:
+            self._file   = None
+            self._chunks = iter(source)
+        # bl : block [of the iterator, currently being read from]
+        # bli: block-local index [of the next byte to read]
+        self._bl  = b''
+        self._bli = 0
+
+
+    # Returns at most n bytes; an empty result means that the end of the
+    # source was reached.
+    def read(self, n) -> bytes:
+        assert isinstance(n, int), type(n)
+        assert 0 < n, n
+        if self._file is not None:
+            bl = self._file.read(n)
+            if not isinstance(bl, (bytes, bytearray)):
+                raise TypeError(
+                    f'a csv stream must be read as bytes, not {type(bl)}'
+                )
+            return bytes(bl)
+        while len(self._bl) == self._bli:
+            bl = next(self._chunks, None)
+            if bl is None:
+                return b''
+            if not isinstance(bl, (bytes, bytearray, memoryview)):
+                raise TypeError(
+                    f'a csv stream must be read as bytes, not {type(bl)}'
+                )
+            self._bl  = bytes(bl)
+            self._bli = 0
+        bl = self._bl[self._bli:self._bli + n]
+        self._bli += len(bl)
+        return bl
+
+
+    # (the source belongs to the caller, and so is left open)
+    def close(self) -> None:
+        return None
+
+
+# Reads a prefix of (at most n bytes of) the source, and returns it, with a
+# source that yields the prefix and then the rest of the source; so that the
+# prefix can be looked at (e.g., sniffed) before the source is parsed.
+def peek_stream(source, n, block_size = 1 << 20) -> tuple:
+
+    sr = StreamReader(source)
+
+    prefix = b''
+    while len(prefix) < n:
+        bl = sr.read(n - len(prefix))
+        if 0 == len(bl):
+            break
+        prefix += bl
+
+    def chunks():
+        yield prefix
+        while True:
+            bl = sr.read(block_size)
+            if 0 == len(bl):
+                break
+            yield bl
+        return None
+
+    return (prefix, chunks())
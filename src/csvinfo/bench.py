@@ -0,0 +1,402 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from . import CSVTree
+
+
+def write_quoted_cell_csv_file(csv_file_path, cell_size) -> None:
+
+    assert isinstance(cell_size, int), type(cell_size)
+    assert 0 < cell_size, cell_size
+
+    # A single row holding a single quoted cell, whose content resembles an
+    # embedded, multi-line json blob (and so contains doubled quote
+    # characters and line feeds).
+    unit = b'{""key"": ""value"", ""n"": 12345}\n'
+    n_units = -(-cell_size // len(unit))
+
+    with open(csv_file_path, 'wb') as csv_file:
+        csv_file.write(b'"')
+        csv_file.write(unit * n_units)
+        csv_file.write(b'"\n')
+
+    return None
+
+
+def bench_quoted_cell(cell_sizes_mb, block_size) -> int:
+
+    assert 0 < len(cell_sizes_mb), cell_sizes_mb
+
+    # The parse time per megabyte should stay (roughly) constant as the cell
+    # grows: building a cell must be linear, not quadratic, in its length.
+    header = ('cell_size_mb', 'file_size_b', 'parse_s', 'parse_mb_per_s')
+    sys.stdout.write('  '.join(header) + '\n')
+
+    with tempfile.TemporaryDirectory() as tmp_dir_path:
+        csv_file_path = os.path.join(tmp_dir_path, 'quoted_cell.csv')
+
+        for cell_size_mb in cell_sizes_mb:
+            write_quoted_cell_csv_file(
+                csv_file_path,
+                int(cell_size_mb * (1 << 20)),
+            )
+            file_size = os.path.getsize(csv_file_path)
+
+            t0 = time.perf_counter()
+            csvt = CSVTree(csv_file_path, block_size = block_size)
+            t1 = time.perf_counter()
+            assert 1 == len(csvt), len(csvt)
+            del csvt
+
+            os.remove(csv_file_path)
+
+            parse_s = t1 - t0
+            row = (
+                f'{cell_size_mb:g}'                       .rjust(len(header[0])),
+                f'{file_size}'                            .rjust(len(header[1])),
+                f'{parse_s:.3f}'                          .rjust(len(header[2])),
+                f'{file_size / (1 << 20) / parse_s:.3f}'  .rjust(len(header[3])),
+            )
+            sys.stdout.write('  '.join(row) + '\n')
+            sys.stdout.flush()
+
+    return 0
+
+
+# The shapes of csv (and ssv) file that the suite generates. Each shape
+# maps to its quote character, its delimiter character, and the generator
+# of one of its rows (which is given the random number generator).
+#
+#   narrow   : few short unquoted cells per row
+#   wide     : many short unquoted cells per row
+#   quoted   : every cell quoted, some holding delimiters
+#   newlines : quoted cells with embedded LFs and CRLFs, and CRLF rows
+#   doubled  : quoted cells with doubled quote characters
+#   ssv      : quoted cells delimited by (runs of) spaces, so that the parser
+#              goes through the burn-spaces state
+#   tab      : the narrow shape, tab delimited
+
+def _gen_word(rng, lo, hi) -> bytes:
+    return bytes(rng.choices(b'abcdefghijklmnopqrstuvwxyz0123456789',
+                             k = rng.randint(lo, hi)))
+
+
+def _gen_narrow_row(rng, dc) -> bytes:
+    return bytes([dc]).join(_gen_word(rng, 1, 8) for _ in range(5)) + b'\n'
+
+
+def _gen_wide_row(rng, dc) -> bytes:
+    return bytes([dc]).join(_gen_word(rng, 1, 8) for _ in range(200)) + b'\n'
+
+
+def _gen_quoted_row(rng, dc) -> bytes:
+    cells = []
+    for _ in range(8):
+        cell = _gen_word(rng, 1, 12)
+        if 0 == rng.randrange(4):
+            cell += bytes([dc]) + _gen_word(rng, 1, 12)
+        cells.append(b'"' + cell + b'"')
+    return bytes([dc]).join(cells) + b'\n'
+
+
+def _gen_newlines_row(rng, dc) -> bytes:
+    cells = []
+    for _ in range(6):
+        n_lines = rng.randint(1, 4)
+        cell = rng.choice((b'\n', b'\r\n')).join(
+            _gen_word(rng, 1, 16) for _ in range(n_lines)
+        )
+        cells.append(b'"' + cell + b'"')
+    return bytes([dc]).join(cells) + rng.choice((b'\n', b'\r\n'))
+
+
+def _gen_doubled_row(rng, dc) -> bytes:
+    cells = []
+    for _ in range(6):
+        cell = b'""'.join(_gen_word(rng, 1, 8) for _ in range(rng.randint(1, 4)))
+        cells.append(b'"' + cell + b'"')
+    return bytes([dc]).join(cells) + b'\n'
+
+
+def _gen_ssv_row(rng, dc) -> bytes:
+    cells = [b'"' + _gen_word(rng, 1, 12) + b'"' for _ in range(8)]
+    row = b''
+    for cell in cells[:-1]:
+        row += cell + b' ' * rng.randint(1, 3)
+    return row + cells[-1] + b'\n'
+
+
+SHAPES = {
+    'narrow'   : (0x22, 0x2c, _gen_narrow_row  ),
+    'wide'     : (0x22, 0x2c, _gen_wide_row    ),
+    'quoted'   : (0x22, 0x2c, _gen_quoted_row  ),
+    'newlines' : (0x22, 0x2c, _gen_newlines_row),
+    'doubled'  : (0x22, 0x2c, _gen_doubled_row ),
+    'ssv'      : (0x22, 0x2c, _gen_ssv_row     ),
+    'tab'      : (0x22, 0x09, _gen_narrow_row  ),
+}
+
+
+def write_shape_csv_file(csv_file_path, shape, size, seed) -> int:
+
+    assert shape in SHAPES, shape
+    assert isinstance(size, int), type(size)
+    assert 0 < size, size
+
+    _, dc, gen_row = SHAPES[shape]
+    rng = random.Random(seed)
+
+    # (rows are written until the file reaches size bytes)
+    n_rows = 0
+    n_bytes = 0
+    with open(csv_file_path, 'wb') as csv_file:
+        while n_bytes < size:
+            rows = b''.join(gen_row(rng, dc) for _ in range(1024))
+            csv_file.write(rows)
+            n_bytes += len(rows)
+            n_rows  += 1024
+        del rows
+
+    return n_rows
+
+
+def _get_commit() -> str:
+    try:
+        cp = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd            = os.path.dirname(os.path.abspath(__file__)),
+            capture_output = True,
+            check          = True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return cp.stdout.decode().strip()
+
+
+def _bench_csv_file(csv_file_path, qc, dc, kwargs) -> dict:
+
+    # (run in a fresh worker process, so that its peak rss is its own)
+    t0 = time.perf_counter()
+    csvt = CSVTree(
+        csv_file_path,
+        quote_character     = qc,
+        delimiter_character = dc,
+        **kwargs,
+    )
+    t1 = time.perf_counter()
+    csvs = csvt.get_statistics()
+    t2 = time.perf_counter()
+    n_rows = len(csvt)
+    del csvt
+    assert n_rows == csvs['n_rows'], (n_rows, csvs['n_rows'])
+
+    # (ru_maxrss is in KiB on linux, and in bytes on macos)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if 'Darwin' != platform.system():
+        peak_rss *= 1024
+
+    return {
+        'n_rows'       : n_rows,
+        'parse_s'      : t1 - t0,
+        'statistics_s' : t2 - t1,
+        'peak_rss_b'   : peak_rss,
+    }
+
+
+def bench_suite(shapes, size_mb, seed, repeat, output, **kwargs) -> int:
+
+    assert 0 < len(shapes), shapes
+    assert 1 <= repeat, repeat
+
+    header = ('shape', 'file_size_b', 'n_rows', 'parse_s', 'statistics_s',
+              'parse_mb_per_s', 'rows_per_s', 'peak_rss_mb')
+    # sw: shape [column] width
+    sw = max(len(h) for h in [header[0]] + list(shapes))
+    sys.stdout.write('  '.join((header[0].ljust(sw),) + header[1:]) + '\n')
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir_path:
+        for shape in shapes:
+            csv_file_path = os.path.join(tmp_dir_path, f'{shape}.csv')
+            write_shape_csv_file(
+                csv_file_path,
+                shape,
+                int(size_mb * (1 << 20)),
+                seed,
+            )
+            file_size = os.path.getsize(csv_file_path)
+            qc, dc, _ = SHAPES[shape]
+
+            # (the best of the repeats is kept, as the least disturbed)
+            best = None
+            for _ in range(repeat):
+                with ProcessPoolExecutor(max_workers = 1) as executor:
+                    r = executor.submit(
+                        _bench_csv_file, csv_file_path, qc, dc, kwargs,
+                    ).result()
+                if best is None or r['parse_s'] < best['parse_s']:
+                    best = r
+            os.remove(csv_file_path)
+
+            result = {
+                'shape'          : shape,
+                'file_size_b'    : file_size,
+                'n_rows'         : best['n_rows'],
+                'parse_s'        : best['parse_s'],
+                'statistics_s'   : best['statistics_s'],
+                'parse_mb_per_s' : file_size / (1 << 20) / best['parse_s'],
+                'rows_per_s'     : best['n_rows'] / best['parse_s'],
+                'peak_rss_b'     : best['peak_rss_b'],
+            }
+            results.append(result)
+            del best
+
+            row = (
+                shape,
+                f'{file_size}',
+                f'{result["n_rows"]}',
+                f'{result["parse_s"]:.3f}',
+                f'{result["statistics_s"]:.3f}',
+                f'{result["parse_mb_per_s"]:.3f}',
+                f'{result["rows_per_s"]:.0f}',
+                f'{result["peak_rss_b"] / (1 << 20):.1f}',
+            )
+            row = [shape.ljust(sw)] + \
+                  [v.rjust(len(h)) for v, h in zip(row[1:], header[1:])]
+            sys.stdout.write('  '.join(row) + '\n')
+            sys.stdout.flush()
+
+    if output is not None:
+        with open(output, 'w') as output_file:
+            json.dump(
+                {
+                    'commit'   : _get_commit(),
+                    'python'   : platform.python_version(),
+                    'platform' : platform.platform(),
+                    'time'     : time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    'size_mb'  : size_mb,
+                    'seed'     : seed,
+                    'repeat'   : repeat,
+                    'kwargs'   : kwargs,
+                    'results'  : results,
+                },
+                output_file,
+                indent = 2,
+            )
+            output_file.write('\n')
+
+    return 0
+
+
+def main() -> int:
+
+    # pr: parser root
+    # sp: subparsers
+    pr = argparse.ArgumentParser()
+    sp = pr.add_subparsers(required = True)
+
+    # ps: parser [for the] suite
+    ps = sp.add_parser(
+        'suite',
+        help = 'time parsing and statistics tabulation over generated ' + \
+               'csv and ssv files of several shapes',
+    )
+    ps.add_argument(
+        '--shapes',
+        choices = list(SHAPES.keys()),
+        nargs   = '+',
+        default = list(SHAPES.keys()),
+    )
+    ps.add_argument(
+        '--size-mb',
+        type    = float,
+        default = 16,
+        help    = 'size of each generated file, in MiB',
+    )
+    ps.add_argument(
+        '--seed',
+        type    = int,
+        default = 0,
+    )
+    ps.add_argument(
+        '--repeat',
+        type    = int,
+        default = 1,
+        help    = 'number of times each file is parsed; the best is kept',
+    )
+    ps.add_argument(
+        '--output',
+        default = None,
+        help    = 'path of a json file to save the results to',
+    )
+    ps.add_argument(
+        '--block-size',
+        type    = int,
+        default = 1 << 20,
+    )
+    ps.add_argument(
+        '--jobs',
+        type    = int,
+        default = 1,
+    )
+    ps.add_argument(
+        '--engine',
+        choices = ['python', 'numpy'],
+        default = 'python',
+    )
+    ps.add_argument(
+        '--paranoid',
+        action  = 'store_true',
+    )
+    ps.add_argument(
+        '--mmap',
+        dest    = 'use_mmap',
+        action  = 'store_true',
+    )
+    ps.set_defaults(
+        func = bench_suite
+    )
+    del ps
+
+    # pq: parser [for the] quoted cell [benchmark]
+    pq = sp.add_parser(
+        'quoted-cell',
+        help = 'time parsing a single, large quoted cell',
+    )
+    pq.add_argument(
+        '--cell-sizes-mb',
+        type    = float,
+        nargs   = '+',
+        default = [1, 2, 5, 10],
+        help    = 'sizes of the single quoted cell to parse, in MiB',
+    )
+    pq.add_argument(
+        '--block-size',
+        type    = int,
+        default = 1 << 20,
+    )
+    pq.set_defaults(
+        func = bench_quoted_cell
+    )
+    del pq, sp
+
+    args = pr.parse_args()
+    del pr
+    args = vars(args)
+
+    func = args.pop('func')
+    return func(**args)
+
+
+
+if '__main__' == __name__:
+    sys.exit(main())
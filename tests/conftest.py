@@ -0,0 +1,86 @@
+import os
+import random
+
+import pytest
+
+from csvinfo.bench import write_shape_csv_file
+
+
+# The csv files of the tests are generated: small random ones (see _gen_csv),
+# which mix quoted and unquoted cells, doubled quote characters, newlines
+# inside of quoted cells, spaces as delimiters, lf and cr lf row ends, and,
+# if invalid, a csv syntax error; and larger ones of the shapes of the
+# benchmark suite (see bench.py).
+
+def _gen_csv(seed, qc = 0x22, dc = 0x2c, n_rows = None,
+             invalid = False) -> bytes:
+
+    rng = random.Random(seed)
+    q = bytes([qc])
+    d = bytes([dc])
+    # (the other quote and delimiter characters are content)
+    ab  = b'ab xyz019' + (b"'" if 0x22 == qc else b'"') + \
+          (b'\t' if 0x2c == dc else b',')
+    qab = ab + b'\n\r\n,\t ' + q
+
+    out = bytearray()
+    if n_rows is None:
+        n_rows = rng.randint(1, 30)
+    for i in range(n_rows):
+        n_cells = rng.randint(1, 6)
+        # pq: previous [cell is] quoted
+        pq = False
+        for j in range(n_cells):
+            quoted = rng.random() < 0.5
+            if 0 == j and quoted is True and rng.random() < 0.2:
+                out += b' ' * rng.randint(1, 3)
+            if 0 < j:
+                if pq is True and quoted is True and rng.random() < 0.3:
+                    out += b' ' * rng.randint(1, 3)
+                else:
+                    out += d
+            if quoted is True:
+                c = bytes(rng.choice(qab) for _ in range(rng.randint(0, 8)))
+                out += q + c.replace(q, q + q) + q
+            else:
+                c = bytes(rng.choice(ab) for _ in range(rng.randint(0, 8)))
+                # (only spaces may precede a quoted first cell, and so an
+                # unquoted first cell of only spaces is not)
+                if 0 == j and 0 < len(c) and 0 == len(c.strip(b' ')):
+                    c = b'k' + c
+                out += c
+            pq = quoted
+        if pq is True and rng.random() < 0.2:
+            out += b' ' * rng.randint(1, 3)
+        if n_rows - 1 != i or rng.random() < 0.5:
+            out += rng.choice((b'\n', b'\r\n'))
+
+    if invalid is True and 0 < len(out):
+        k = rng.randrange(len(out))
+        out[k:k] = bytes([rng.choice(b'"\r ,x')])
+
+    return bytes(out)
+
+
+@pytest.fixture
+def gen_csv():
+    return _gen_csv
+
+
+@pytest.fixture
+def make_csv_file(tmp_path):
+    def make_csv_file(data, name = 'test.csv') -> str:
+        csv_file_path = os.path.join(tmp_path, name)
+        with open(csv_file_path, 'wb') as csv_file:
+            csv_file.write(data)
+        return csv_file_path
+    return make_csv_file
+
+
+@pytest.fixture
+def make_shape_csv_file(tmp_path):
+    def make_shape_csv_file(shape, size, seed = 0) -> str:
+        csv_file_path = os.path.join(tmp_path, f'{shape}_{size}_{seed}.csv')
+        assert write_shape_csv_file(csv_file_path, shape, size, seed) > 0
+        return csv_file_path
+    return make_shape_csv_file
@@ -0,0 +1,87 @@
+import os
+
+from csvinfo import CSVTree
+from csvinfo._batch import BatchAggregate
+from csvinfo._batch import expand_paths
+from csvinfo._batch import profile_csv_files
+from csvinfo._cache import StatisticsCache
+from csvinfo._cache import get_statistics_cached
+from csvinfo._rowindex import write_row_index
+from csvinfo._checkpoint import get_statistics_incrementally
+
+
+# The aggregate of a batch is the statistics of the concatenation of its
+# files, in the order of their paths, however the files finish; and a file
+# that fails is counted, and fails alone.
+
+def _make_batch(make_csv_file, gen_csv) -> list:
+    cfps = [
+        make_csv_file(gen_csv(seed, n_rows = 20) + b'\n', name = f'{seed}.csv')
+        for seed in range(6)
+    ]
+    cfps.insert(3, make_csv_file(b'a,b"\n', name = 'bad.csv'))
+    return cfps
+
+
+def test_aggregate_in_path_order(make_csv_file, gen_csv):
+    cfps = _make_batch(make_csv_file, gen_csv)
+    results = dict(
+        (cfp, csvs)
+        for cfp, csvs, _ in profile_csv_files(cfps, False, 'thread', 3, {})
+    )
+    assert 1 == sum(1 for csvs in results.values() if csvs is None)
+
+    data = b''
+    for cfp in cfps:
+        if results[cfp] is not None:
+            with open(cfp, 'rb') as csv_file:
+                data += csv_file.read()
+    expected = {
+        'n_files'       : len(cfps),
+        'n_failed_files': 1,
+        **CSVTree(make_csv_file(data, name = 'all.csv')).get_statistics(),
+    }
+
+    for order in (cfps, cfps[::-1], cfps[1::2] + cfps[0::2]):
+        ba = BatchAggregate(cfps)
+        for cfp in order:
+            assert ba.add(cfp, results[cfp]) is None
+        assert 1 == ba.get_n_failed()
+        assert expected == ba.get_statistics(), order
+
+
+def test_aggregate_holds_only_early_files(make_csv_file, gen_csv):
+    cfps = _make_batch(make_csv_file, gen_csv)
+    csvs = CSVTree(cfps[0])._tabulate_statistics()
+    # (in order, each file is merged, and dropped, as it is added)
+    ba = BatchAggregate(cfps)
+    for cfp in cfps:
+        assert ba.add(cfp, csvs) is None
+        assert 0 == len(ba._pending)
+    # (a file is held only until the files before it are added)
+    ba = BatchAggregate(cfps)
+    for k, cfp in enumerate(cfps[:0:-1]):
+        assert ba.add(cfp, csvs) is None
+        assert k + 1 == len(ba._pending)
+    assert ba.add(cfps[0], csvs) is None
+    assert 0 == len(ba._pending)
+    assert len(csvs) * len(cfps) == ba.get_statistics()['n_rows']
+
+
+def test_expand_paths_skips_sidecar_files(make_csv_file, tmp_path):
+    cfps = [
+        make_csv_file(b'a,b\n', name = 'a.csv'),
+        # (a csv file in cp1252 may begin with 0x80, the euro sign)
+        make_csv_file(b'\x80,b\n', name = 'euro.csv'),
+        make_csv_file(b'a,b\n', name = 'c.tmp'),
+    ]
+    write_row_index(cfps[0])
+    get_statistics_incrementally(cfps[0], str(tmp_path / 'a'))
+    cache = StatisticsCache(str(tmp_path / 'cache'))
+    get_statistics_cached(cfps[0], cache)
+    assert 6 == sum(len(fns) for _, _, fns in os.walk(tmp_path))
+
+    assert sorted(cfps) == expand_paths([str(tmp_path)])
+    assert sorted(cfps) == expand_paths([str(tmp_path / '**')])
+    # (a file that is named as such is kept)
+    assert [cfps[0] + '.rowidx'] == expand_paths([cfps[0] + '.rowidx'])
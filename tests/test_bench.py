@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo.bench import SHAPES
+from csvinfo.bench import bench_suite
+from csvinfo.bench import write_shape_csv_file
+from csvinfo.bench import write_quoted_cell_csv_file
+
+
+# The files of the benchmark suite are generated from a seed, and so are the
+# same from run to run; each is of its shape, and parses.
+
+# (for each shape, a statistic that the shape must exercise)
+SHAPE_STATISTICS = {
+    'narrow'   : 'n_conventional_cell_delimiters',
+    'wide'     : 'n_conventional_cell_delimiters',
+    'quoted'   : 'n_quoted_cells',
+    'newlines' : 'n_lfs_inside_cells',
+    'doubled'  : 'n_quote_chars_inside_cells',
+    'ssv'      : 'n_spaces_cell_delimiters',
+    'tab'      : 'n_conventional_cell_delimiters',
+}
+
+
+@pytest.mark.parametrize('shape', sorted(SHAPES.keys()))
+def test_shape(tmp_path, shape):
+    assert sorted(SHAPES.keys()) == sorted(SHAPE_STATISTICS.keys())
+    qc, dc, _ = SHAPES[shape]
+
+    cfps = [str(tmp_path / f'{k}.csv') for k in range(3)]
+    n_rows = write_shape_csv_file(cfps[0], shape, 1 << 16, 0)
+    assert n_rows == write_shape_csv_file(cfps[1], shape, 1 << 16, 0)
+    write_shape_csv_file(cfps[2], shape, 1 << 16, 1)
+    # ds: data [of each file]
+    ds = []
+    for cfp in cfps:
+        with open(cfp, 'rb') as csv_file:
+            ds.append(csv_file.read())
+    # (the same seed gives the same file, and another seed another file)
+    assert ds[0] == ds[1]
+    assert ds[0] != ds[2]
+    assert 1 << 16 <= len(ds[0])
+
+    csvs = CSVTree(cfps[0], qc, dc).get_statistics()
+    assert n_rows == csvs['n_rows']
+    assert 0 < csvs[SHAPE_STATISTICS[shape]], shape
+    if 'wide' == shape:
+        assert 200 == csvs['n_cells_in_row_min']
+
+
+def test_quoted_cell(tmp_path):
+    csv_file_path = str(tmp_path / 'quoted_cell.csv')
+    assert write_quoted_cell_csv_file(csv_file_path, 1 << 16) is None
+    csvt = CSVTree(csv_file_path)
+    assert 1 == len(csvt)
+    assert 1 == len(csvt.get_row(0))
+    # (the cell, with its doubled quote characters, spans the file)
+    assert 1 << 16 <= csvt.get_row(0).get_size()
+    assert 0 < csvt.get_statistics()['n_quote_chars_inside_cells']
+
+
+def test_bench_suite_output(tmp_path, capsys):
+    output = str(tmp_path / 'bench.json')
+    assert 0 == bench_suite(['narrow', 'ssv'], 0.05, 0, 1, output)
+    # (a row of the table per shape, after the header)
+    lines = capsys.readouterr().out.splitlines()
+    assert 3 == len(lines)
+    assert ['narrow', 'ssv'] == [line.split()[0] for line in lines[1:]]
+    with open(output) as output_file:
+        report = json.load(output_file)
+    assert ['narrow', 'ssv'] == [r['shape'] for r in report['results']]
+    for r in report['results']:
+        assert 0 < r['n_rows']
+        assert 0 < r['parse_s']
+        assert 0 < r['peak_rss_b']
@@ -0,0 +1,115 @@
+import io
+import os
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo._cache import CACHE_SUFFIX
+from csvinfo._cache import StatisticsCache
+from csvinfo._cache import get_statistics_cached
+
+
+# The statistics of a csv file are cached on disk by the identity of the
+# file and by the dialect (and sketch precision) that was asked for: an
+# unchanged file is not parsed again, and a changed one always is.
+
+@pytest.fixture
+def n_parses(monkeypatch):
+    n = [0]
+    parse_csv_file = CSVTree._parse_csv_file
+    def count_parse(self):
+        n[0] += 1
+        return parse_csv_file(self)
+    monkeypatch.setattr(CSVTree, '_parse_csv_file', count_parse)
+    return n
+
+
+def _get_entry_names(cache_dir) -> list:
+    return sorted(os.listdir(cache_dir))
+
+
+def test_cache_hit(make_csv_file, tmp_path, n_parses):
+    csv_file_path = make_csv_file(b'a,b\nc,d\n')
+    cache = StatisticsCache(str(tmp_path / 'cache'))
+    expected = CSVTree(csv_file_path).get_statistics()
+    n_parses[0] = 0
+    for stream in (False, True, False):
+        csvs = get_statistics_cached(csv_file_path, cache, stream)
+        assert expected == csvs.get_statistics()
+    # (the stream hits the entry of the tree, as their statistics are the
+    # same)
+    assert 1 == n_parses[0]
+    assert 1 == len(_get_entry_names(tmp_path / 'cache'))
+    assert all(n.endswith(CACHE_SUFFIX)
+               for n in _get_entry_names(tmp_path / 'cache'))
+
+
+def test_cache_invalidation(make_csv_file, tmp_path, n_parses):
+    csv_file_path = make_csv_file(b'a,b\nc,d\n')
+    cache = StatisticsCache(str(tmp_path / 'cache'))
+    csvs = get_statistics_cached(csv_file_path, cache).get_statistics()
+    assert 2 == csvs['n_rows']
+    assert 1 == n_parses[0]
+
+    # (a file of another size)
+    make_csv_file(b'a,b\nc,d\ne,f\n')
+    csvs = get_statistics_cached(csv_file_path, cache).get_statistics()
+    assert 3 == csvs['n_rows']
+    assert 2 == n_parses[0]
+
+    # (a file of the same size, modified at another time)
+    make_csv_file(b'a,b\ncd\ne,f\n')
+    st = os.stat(csv_file_path)
+    os.utime(csv_file_path, ns = (st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    csvs = get_statistics_cached(csv_file_path, cache).get_statistics()
+    assert 1 == csvs['n_cells_in_row_min']
+    assert 3 == n_parses[0]
+
+    # (another dialect, or sketch precision, is another entry)
+    get_statistics_cached(csv_file_path, cache, delimiter_character = 0x09)
+    get_statistics_cached(csv_file_path, cache, distinct_precision  = 12)
+    assert 5 == n_parses[0]
+    get_statistics_cached(csv_file_path, cache, delimiter_character = 0x09)
+    get_statistics_cached(csv_file_path, cache, distinct_precision  = 12)
+    assert 5 == n_parses[0]
+
+
+def test_unreadable_entry_is_a_miss(make_csv_file, tmp_path, n_parses):
+    csv_file_path = make_csv_file(b'a,b\n')
+    cache = StatisticsCache(str(tmp_path / 'cache'))
+    get_statistics_cached(csv_file_path, cache)
+    for entry_name in _get_entry_names(tmp_path / 'cache'):
+        with open(tmp_path / 'cache' / entry_name, 'wb') as entry_file:
+            entry_file.write(b'not a pickle')
+    assert 1 == len(get_statistics_cached(csv_file_path, cache))
+    assert 2 == n_parses[0]
+
+
+def test_eviction(make_csv_file, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    cfps = [make_csv_file(b'a,b\n', name = f'{k}.csv') for k in range(3)]
+    get_statistics_cached(cfps[0], StatisticsCache(cache_dir))
+    entry_size = os.path.getsize(
+        os.path.join(cache_dir, _get_entry_names(cache_dir)[0])
+    )
+    # (the cache holds two entries; the least recently used is evicted)
+    cache = StatisticsCache(cache_dir, 2 * entry_size + entry_size // 2)
+    get_statistics_cached(cfps[1], cache)
+    entry_path = cache._get_entry_path(cache.get_key(cfps[0], 0x22, 0x2c))
+    os.utime(entry_path, ns = (0, 0))
+    get_statistics_cached(cfps[2], cache)
+    assert 2 == len(_get_entry_names(cache_dir))
+    assert not os.path.exists(entry_path)
+
+
+def test_tree_memoizes_statistics(make_csv_file):
+    csvt = CSVTree(make_csv_file(b'a,b\n'))
+    assert csvt._tabulate_statistics() is csvt._tabulate_statistics()
+    assert csvt.get_statistics() == csvt.get_statistics()
+
+
+def test_stream_not_cached(tmp_path):
+    with pytest.raises(ValueError):
+        get_statistics_cached(
+            io.BytesIO(b'a,b\n'), StatisticsCache(str(tmp_path / 'cache'))
+        )
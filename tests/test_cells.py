@@ -0,0 +1,35 @@
+from csvinfo import CSVTree
+
+
+# The content of a cell is accumulated in place, a byte at a time, and
+# frozen into bytes once the cell has ended; a large (e.g., multi-line,
+# quoted) cell is built in linear time.
+
+def test_append_byte_accumulates_in_place():
+    cell = CSVTree._CSVRow._CSVCell()
+    # bu: buffer
+    bu = cell._content
+    for b in b'x"\n' * 10000:
+        assert cell.append_byte(b) is None
+    # (the bytes are appended to the one buffer, rather than each making a
+    # copy of the content)
+    assert cell._content is bu
+    assert 30000 == len(cell)
+    assert cell.set_subsequent_delimiter(-1) is None
+    assert isinstance(cell.get_content(), bytes)
+    assert b'x"\n' * 10000 == cell.get_content()
+
+
+def test_large_quoted_cell(make_csv_file):
+    # c: content [of the cell]
+    c = b'{"k": "v\r\n"}\n' * (1 << 14)
+    csv_file_path = make_csv_file(
+        b'a,"' + c.replace(b'"', b'""') + b'",b\n'
+    )
+    for kwargs in ({'paranoid': True}, {}, {'block_size': 1000}):
+        csvt = CSVTree(csv_file_path, **kwargs)
+        assert 1 == len(csvt)
+        assert c == bytes(csvt.get_row(0).get_cell(1).get_content()), kwargs
+        csvs = csvt.get_statistics()
+        assert c.count(b'"')    == csvs['n_quote_chars_inside_cells']
+        assert c.count(b'\r\n') == csvs['n_crlfs_inside_cells']
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo._errors import CSVSyntaxError
+from csvinfo._checkpoint import load_checkpoint
+from csvinfo._checkpoint import get_statistics_incrementally
+
+
+# The statistics of an append-only csv file that are resumed from a
+# checkpoint must be those of a full parse, however the appends split the
+# rows (including in the middle of a quoted cell, or of a cr lf).
+
+def _append(csv_file_path, data) -> None:
+    with open(csv_file_path, 'ab') as csv_file:
+        csv_file.write(data)
+    return None
+
+
+def test_resume_matches_full_parse(make_csv_file, gen_csv, tmp_path):
+    for seed in range(10):
+        data = b''.join(gen_csv(100 * seed + k, n_rows = 10) + b'\n'
+                        for k in range(10))
+        csv_file_path = make_csv_file(b'', name = f'{seed}.csv')
+        checkpoint_path = str(tmp_path / f'{seed}.checkpoint')
+        # (the file grows by uneven appends, which split rows and cells)
+        i = 0
+        for k in range(1, 9):
+            j = len(data) * k * k // 64
+            _append(csv_file_path, data[i:j])
+            i = j
+            if 0 == os.path.getsize(csv_file_path):
+                continue
+            # (an append that ends in a quoted cell leaves the file with a
+            # csv syntax error, until the next append closes it)
+            try:
+                csvt = CSVTree(csv_file_path)
+            except CSVSyntaxError as e:
+                with pytest.raises(CSVSyntaxError) as f:
+                    get_statistics_incrementally(csv_file_path,
+                                                 checkpoint_path)
+                assert str(e) == str(f.value), (seed, k)
+                continue
+            csvs = get_statistics_incrementally(csv_file_path,
+                                                checkpoint_path)
+            assert csvt.get_statistics() == csvs.get_statistics(), (seed, k)
+            assert csvt.get_column_statistics() == \
+                   csvs.get_column_statistics(), (seed, k)
+        _append(csv_file_path, data[i:])
+        csvs = get_statistics_incrementally(csv_file_path, checkpoint_path)
+        assert CSVTree(csv_file_path).get_statistics() == \
+               csvs.get_statistics(), seed
+
+
+def test_checkpoint_offset(make_csv_file, tmp_path):
+    csv_file_path = make_csv_file(b'a,b\n"c\nd",e\nf,g')
+    checkpoint_path = str(tmp_path / 'test.checkpoint')
+    csvs = get_statistics_incrementally(csv_file_path, checkpoint_path)
+    assert 3 == len(csvs)
+    # (the checkpoint is at the last complete row end; the final row, which
+    # may still be being written, is parsed but not checkpointed)
+    offset, cs = load_checkpoint(checkpoint_path, csv_file_path, 0x22, 0x2c)
+    assert 12 == offset
+    assert 2 == len(cs)
+    _append(csv_file_path, b'h\ni,j\n')
+    csvs = get_statistics_incrementally(csv_file_path, checkpoint_path)
+    assert CSVTree(csv_file_path).get_statistics() == csvs.get_statistics()
+    offset, cs = load_checkpoint(checkpoint_path, csv_file_path, 0x22, 0x2c)
+    assert os.path.getsize(csv_file_path) == offset
+    assert 4 == len(cs)
+
+
+def test_stale_checkpoint(make_csv_file, tmp_path):
+    csv_file_path = make_csv_file(b'a,b\nc,d\n')
+    checkpoint_path = str(tmp_path / 'test.checkpoint')
+    assert 2 == len(get_statistics_incrementally(csv_file_path,
+                                                 checkpoint_path))
+
+    # (a file that was truncated, or rewritten, is parsed in full)
+    make_csv_file(b'a,b\n')
+    assert (0, 0) == tuple(
+        x if isinstance(x, int) else len(x)
+        for x in load_checkpoint(checkpoint_path, csv_file_path, 0x22, 0x2c)
+    )
+    assert 1 == len(get_statistics_incrementally(csv_file_path,
+                                                 checkpoint_path))
+    make_csv_file(b'x,y\nz,w\n')
+    assert 2 == len(get_statistics_incrementally(csv_file_path,
+                                                 checkpoint_path))
+    assert CSVTree(csv_file_path).get_statistics() == \
+           get_statistics_incrementally(csv_file_path,
+                                        checkpoint_path).get_statistics()
+
+    # (as is one of another dialect, or distinct precision)
+    assert 0 == load_checkpoint(checkpoint_path, csv_file_path, 0x27,
+                                0x2c)[0]
+    assert 0 == load_checkpoint(checkpoint_path, csv_file_path, 0x22, 0x2c,
+                                distinct_precision = 8)[0]
+    assert 8 == load_checkpoint(checkpoint_path, csv_file_path, 0x22,
+                                0x2c)[0]
@@ -0,0 +1,90 @@
+import bz2
+import gzip
+import lzma
+import threading
+import importlib.util
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+from csvinfo import iter_rows
+from csvinfo._errors import CSVSyntaxError
+from csvinfo._compression import detect_compression
+
+
+# A compressed csv file is parsed from its decompressed bytes, as the csv
+# file itself would be, by every parser; its compression is detected by its
+# magic bytes.
+
+COMPRESSIONS = (
+    ('gzip', gzip.compress),
+    ('bz2' , bz2 .compress),
+    ('xz'  , lzma.compress),
+)
+
+
+def _get_statistics(csvt) -> tuple:
+    return (csvt.get_statistics(), csvt.get_column_statistics())
+
+
+@pytest.mark.parametrize('compression, compress', COMPRESSIONS)
+def test_compressed_matches_plain(make_csv_file, make_shape_csv_file,
+                                  compression, compress):
+    csv_file_path = make_shape_csv_file('newlines', 1 << 16)
+    with open(csv_file_path, 'rb') as csv_file:
+        data = csv_file.read()
+    cfp = make_csv_file(compress(data), name = 'test.csv.z')
+    assert compression == detect_compression(cfp)
+    assert detect_compression(csv_file_path) is None
+
+    expected = _get_statistics(CSVTree(csv_file_path))
+    kwargss = [{}, {'block_size': 1000}, {'paranoid': True}]
+    if importlib.util.find_spec('numpy') is not None:
+        kwargss.append({'engine': 'numpy'})
+    for kwargs in kwargss:
+        assert expected == _get_statistics(CSVTree  (cfp, **kwargs)), kwargs
+        assert expected == _get_statistics(CSVStream(cfp, **kwargs)), kwargs
+    assert len(CSVTree(csv_file_path)) == sum(1 for _ in iter_rows(cfp))
+
+
+def test_zstd(make_csv_file):
+    zstandard = pytest.importorskip('zstandard')
+    data = b'a,"b\nc"\r\nd,e\n' * 1000
+    cfp = make_csv_file(zstandard.ZstdCompressor().compress(data))
+    assert 'zstd' == detect_compression(cfp)
+    assert _get_statistics(CSVTree(make_csv_file(data, name = 'plain.csv'))) \
+        == _get_statistics(CSVTree(cfp))
+
+
+def test_magic_bytes(make_csv_file):
+    # (a plain csv file that merely begins with the letters of a magic is
+    # not taken for a compressed one)
+    for data in (b'BZh,a\n', b'BZh9,a\n', b'BZh91AY,a\n', b'\x1f,a\n'):
+        assert detect_compression(make_csv_file(data)) is None, data
+    assert 'bz2' == detect_compression(make_csv_file(bz2.compress(b'')))
+    assert 'bz2' == detect_compression(make_csv_file(bz2.compress(b'a\n')))
+
+
+def test_compressed_rejects_mmap_and_byte_range(make_csv_file):
+    cfp = make_csv_file(gzip.compress(b'a,b\nc,d\n'))
+    with pytest.raises(ValueError):
+        CSVTree(cfp, use_mmap = True)
+    with pytest.raises(ValueError):
+        CSVTree(cfp, byte_range = (0, 4))
+
+
+def test_compressed_error_closes_reader(make_csv_file):
+    # (a csv syntax error early in a large compressed csv file must not
+    # leave the reader thread behind)
+    cfp = make_csv_file(gzip.compress(b'a,b"\n' + b'c,d\n' * (1 << 18)))
+    n_threads = threading.active_count()
+    for kwargs in ({}, {'paranoid': True}):
+        with pytest.raises(CSVSyntaxError):
+            CSVTree(cfp, block_size = 1 << 10, **kwargs)
+    # (and neither must an iteration that is abandoned)
+    for _ in zip(range(3), iter_rows(make_csv_file(
+        gzip.compress(b'a,b\n' * (1 << 18)), name = 'other.csv.gz',
+    ), block_size = 1 << 10)):
+        pass
+    assert n_threads == threading.active_count()
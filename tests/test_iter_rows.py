@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import iter_rows
+
+
+# iter_rows yields the rows of a full parse, through one view that is reused
+# for each row (and so is valid only until the next row is yielded), and
+# without allocating a row or cell object per row.
+
+def _get_row(row) -> tuple:
+    return (
+        [bytes(row.get_content(j)) for j in range(len(row))],
+        [row.isquoted(j) for j in range(len(row))],
+        [row.get_subsequent_delimiter(j) for j in range(len(row))],
+        row.get_newline_encoding(),
+        row.get_size(),
+    )
+
+
+def _get_tree_rows(csvt) -> list:
+    rows = []
+    for i in range(len(csvt)):
+        row = csvt.get_row(i)
+        cells = [row.get_cell(j) for j in range(len(row))]
+        rows.append((
+            [bytes(cell.get_content()) for cell in cells],
+            [cell.isquoted() for cell in cells],
+            [cell.get_subsequent_delimiter() for cell in cells],
+            row.get_newline_encoding(),
+            row.get_size(),
+        ))
+    return rows
+
+
+def test_iter_rows_matches_tree(make_csv_file, gen_csv):
+    for seed in range(30):
+        data = gen_csv(seed, n_rows = 30)
+        csv_file_path = make_csv_file(data)
+        try:
+            expected = _get_tree_rows(CSVTree(csv_file_path))
+        except AssertionError:
+            continue
+        for kwargs in ({}, {'block_size': 3}, {'use_mmap': True}):
+            assert expected == [
+                _get_row(rv) for rv in iter_rows(csv_file_path, **kwargs)
+            ], (seed, kwargs)
+        assert expected == [_get_row(rv) for rv in iter_rows(io.BytesIO(data))]
+
+
+def test_view_is_valid_until_next_row(make_csv_file):
+    csv_file_path = make_csv_file(b'a,"b"\nc,d,e\r\nf\n')
+    for kwargs in ({}, {'use_mmap': True}):
+        rows = iter_rows(csv_file_path, **kwargs)
+        rv = next(rows)
+        assert 0 == rv.get_rowidx()
+        assert [b'a', b'b'] == rv.get_contents()
+        # (a copy survives the next row; the view does not)
+        kept = rv.get_contents()
+        assert rv is next(rows)
+        assert 1 == rv.get_rowidx()
+        assert [b'c', b'd', b'e'] == rv.get_contents()
+        assert [b'a', b'b'] == kept
+        assert rv is next(rows)
+        assert [b'f'] == rv.get_contents()
+        assert not rv.isquoted(0)
+        with pytest.raises(StopIteration):
+            next(rows)
+
+
+def test_no_row_or_cell_is_allocated_per_row(make_csv_file, monkeypatch):
+    counts = {'rows': 0, 'cells': 0}
+
+    row_init  = CSVTree._CSVRow.__init__
+    cell_init = CSVTree._CSVRow._CSVCell.__init__
+    def count_row(self, *args):
+        counts['rows'] += 1
+        return row_init(self, *args)
+    def count_cell(self, *args):
+        counts['cells'] += 1
+        return cell_init(self, *args)
+    monkeypatch.setattr(CSVTree._CSVRow, '__init__', count_row)
+    monkeypatch.setattr(CSVTree._CSVRow._CSVCell, '__init__', count_cell)
+
+    csv_file_path = make_csv_file(b'a,"b""c",d\n' * 1000 + b'e,f,g,h\n')
+    assert 1001 == sum(1 for _ in iter_rows(csv_file_path))
+    assert {'rows': 1, 'cells': 4} == counts
@@ -0,0 +1,113 @@
+import io
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+from csvinfo._cache import StatisticsCache
+from csvinfo._cache import get_statistics_cached
+from csvinfo._errors import ErrorLog
+from csvinfo._errors import CSVSyntaxError
+
+
+# A lenient parse logs each csv syntax error, discards the row in which it
+# occurred, and resumes at the next line feed.
+
+def test_lenient_resyncs(make_csv_file):
+    csv_file_path = make_csv_file(b'a,b\nc"d,e\nf,g\n"h"i\nj,k')
+    with pytest.raises(CSVSyntaxError):
+        CSVTree(csv_file_path)
+
+    csvt = CSVTree(csv_file_path, lenient = True)
+    assert 3 == len(csvt)
+    assert [b'a', b'f', b'j'] == [
+        csvt.get_row(i).get_cell(0).get_content() for i in range(3)
+    ]
+    el = csvt.get_errors()
+    assert [
+        {'byteidx':  5, 'rowidx': 1, 'byte': '0x22',
+         'state': 'state_continue_unquoted_cell_read'},
+        {'byteidx': 17, 'rowidx': 2, 'byte': '0x69',
+         'state': 'state_continue_quoted_cell_read_char_after_qc'},
+    ] == el.get_errors()
+    assert {
+        'n_errors'       : 2,
+        'n_logged_errors': 2,
+        'n_skipped_bytes': len(b'c"d,e\n') + len(b'"h"i\n'),
+    } == el.get_summary()
+
+
+def test_lenient_unclosed_quote_at_eof(make_csv_file):
+    csv_file_path = make_csv_file(b'a,b\n"c\n')
+    csvt = CSVTree(csv_file_path, lenient = True)
+    assert 1 == len(csvt)
+    assert [{'byteidx': 7, 'rowidx': 1, 'byte': None,
+             'state': 'state_continue_quoted_cell_read'}] == \
+           csvt.get_errors().get_errors()
+    assert 3 == csvt.get_errors().get_summary()['n_skipped_bytes']
+
+
+def test_lenient_matches_strict(make_csv_file, gen_csv):
+    for seed in range(60):
+        data = gen_csv(seed, invalid = 1 == seed % 2)
+        csv_file_path = make_csv_file(data)
+        try:
+            strict = CSVTree(csv_file_path)
+        except CSVSyntaxError as e:
+            strict = e
+        except AssertionError:
+            continue
+        csvt = CSVTree(csv_file_path, lenient = True)
+        el = csvt.get_errors()
+        if isinstance(strict, CSVSyntaxError):
+            # (the first error logged is the error that a strict parse
+            # raises)
+            assert 1 <= len(el), seed
+            assert f'byteidx={el.get_errors()[0]["byteidx"]},' in \
+                   str(strict), seed
+        else:
+            assert 0 == len(el), seed
+            assert strict.get_statistics() == csvt.get_statistics(), seed
+        # (the rows and the skipped bytes tile the csv file, up to a final
+        # row that holds only an empty cell)
+        n = sum(csvt.get_row_sizes()) + el.get_summary()['n_skipped_bytes']
+        assert n <= len(data) and b'\n' not in data[n:], seed
+        # (and a stream, or a memory-mapped csv file, is parsed alike)
+        for other in (
+            CSVStream(io.BytesIO(data), lenient = True, block_size = 5),
+            CSVTree(csv_file_path, lenient = True, use_mmap = True),
+        ):
+            assert csvt.get_statistics() == other.get_statistics(), seed
+            assert el.get_errors() == other.get_errors().get_errors(), seed
+
+
+def test_lenient_max_errors(make_csv_file):
+    csv_file_path = make_csv_file(b'a,b\n' + b'c"d\n' * 500 + b'e,f\n')
+    el = CSVTree(csv_file_path, lenient = True).get_errors()
+    assert 500 == len(el)
+    assert {
+        'n_errors'       : 500,
+        'n_logged_errors': 100,
+        'n_skipped_bytes': 2000,
+    } == el.get_summary()
+    el = ErrorLog(max_errors = 0)
+    assert el.add(0, 0, 'state_begin_row_read', 0x22) is None
+    assert 1 == len(el) and [] == el.get_errors()
+
+
+@pytest.mark.parametrize('kwargs', (
+    {'paranoid': True},
+    {'engine'  : 'numpy'},
+    {'jobs'    : 2},
+))
+def test_lenient_rejected(make_csv_file, kwargs):
+    csv_file_path = make_csv_file(b'a,b\n')
+    with pytest.raises(ValueError):
+        CSVTree(csv_file_path, lenient = True, **kwargs)
+
+
+def test_lenient_not_cached(make_csv_file, tmp_path):
+    csv_file_path = make_csv_file(b'a,b\nc"d\n')
+    cache = StatisticsCache(str(tmp_path / 'cache'))
+    with pytest.raises(ValueError):
+        get_statistics_cached(csv_file_path, cache, lenient = True)
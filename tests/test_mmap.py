@@ -0,0 +1,65 @@
+import io
+import mmap
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+
+
+# A memory-mapped csv file is parsed in place: the content of a cell that
+# is a span of the file is a memoryview of the mapping, rather than a copy;
+# only the content of a cell that is not (e.g., one with a doubled quote
+# character, whose content drops one of them) is copied.
+
+def test_contents_are_views_of_the_mapping(make_csv_file):
+    csv_file_path = make_csv_file(b'abc,"d\ne",f\n"g""h",,i\n')
+    csvt = CSVTree(csv_file_path, use_mmap = True)
+    assert isinstance(csvt._mapping, mmap.mmap)
+    contents = [
+        csvt.get_row(i).get_cell(j).get_content()
+        for i in range(len(csvt))
+        for j in range(len(csvt.get_row(i)))
+    ]
+    assert [b'abc', b'd\ne', b'f', b'g"h', b'', b'i'] == \
+           [bytes(c) for c in contents]
+    assert all(isinstance(c, memoryview) for c in contents)
+    # (an empty cell spans no bytes of the mapping, and so is not a view of
+    # it either)
+    assert [True, True, True, False, False, True] == \
+           [c.obj is csvt._mapping for c in contents]
+    # (only the contents of the copied cells are in the store)
+    assert b'g"h' == bytes(csvt._store.get_content())
+
+
+def test_contents_outlive_the_tree(make_csv_file):
+    csv_file_path = make_csv_file(b'abc,def\n')
+    csvt = CSVTree(csv_file_path, use_mmap = True)
+    content = csvt.get_row(0).get_cell(1).get_content()
+    del csvt
+    assert b'def' == bytes(content)
+
+
+def test_mapped_matches_read(make_csv_file, gen_csv):
+    for seed in range(30):
+        csv_file_path = make_csv_file(gen_csv(seed, n_rows = 20))
+        try:
+            csvt = CSVTree(csv_file_path)
+        except AssertionError:
+            continue
+        for kwargs in ({}, {'paranoid': True}, {'block_size': 2}):
+            csvm = CSVTree(csv_file_path, use_mmap = True, **kwargs)
+            assert len(csvt) == len(csvm)
+            for i in range(len(csvt)):
+                assert [
+                    bytes(csvt.get_row(i).get_cell(j).get_content())
+                    for j in range(len(csvt.get_row(i)))
+                ] == [
+                    bytes(csvm.get_row(i).get_cell(j).get_content())
+                    for j in range(len(csvm.get_row(i)))
+                ], (seed, kwargs, i)
+
+
+def test_stream_rejects_mmap():
+    with pytest.raises(ValueError):
+        CSVStream(io.BytesIO(b'a,b\n'), use_mmap = True)
@@ -0,0 +1,92 @@
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+from csvinfo._errors import CSVSyntaxError
+
+_numpy_engine = pytest.importorskip('csvinfo._numpy_engine')
+
+
+# The numpy engine must agree with the fast parser: on the rows and the
+# statistics of a csv file that parses (including its irregular rows, which
+# it leaves to the scalar parser), whether the rows are stored or streamed,
+# and on the error of one that does not; at any block size, including one
+# that a row spans many of.
+
+DIALECTS = ((0x22, 0x2c), (0x27, 0x2c), (0x22, 0x09))
+
+
+def _get_rows(csvt, qb) -> list:
+    rows = []
+    for i in range(len(csvt)):
+        row = csvt.get_row(i)
+        rows.append((
+            row.get_newline_encoding(),
+            row.get_size(),
+            row.leading_spaces_are_present(),
+            [
+                (bytes(cell.get_content()), cell.isquoted(),
+                 cell.get_subsequent_delimiter(),
+                 cell.get_content_counts(qb))
+                for cell in (row.get_cell(j) for j in range(len(row)))
+            ],
+        ))
+    return rows
+
+
+def _get_outcome(csv_file_path, qc, dc, kwargs) -> tuple:
+    try:
+        csvt = CSVTree(csv_file_path, qc, dc, **kwargs)
+        csvs = CSVStream(csv_file_path, qc, dc, **kwargs)
+    except CSVSyntaxError as e:
+        return ('csv syntax error', str(e))
+    # (a csv file whose only row holds only an empty cell has no rows)
+    except AssertionError:
+        return ('no rows', None)
+    return (
+        'statistics',
+        _get_rows(csvt, bytes([qc])),
+        csvt.get_statistics(),
+        csvt.get_column_statistics(),
+        csvs.get_statistics(),
+        csvs.get_column_statistics(),
+    )
+
+
+@pytest.mark.parametrize('invalid', (False, True))
+@pytest.mark.parametrize('qc, dc', DIALECTS)
+def test_numpy_engine_agrees(make_csv_file, gen_csv, qc, dc, invalid):
+    for seed in range(40):
+        csv_file_path = make_csv_file(
+            gen_csv(seed, qc, dc, invalid = invalid)
+        )
+        expected = _get_outcome(csv_file_path, qc, dc, {})
+        for kwargs in (
+            {'engine': 'numpy'},
+            {'engine': 'numpy', 'block_size': 5},
+            {'engine': 'numpy', 'use_mmap': True},
+            {'engine': 'numpy', 'use_mmap': True, 'block_size': 3},
+        ):
+            assert expected == \
+                   _get_outcome(csv_file_path, qc, dc, kwargs), (seed, kwargs)
+
+
+def test_numpy_engine_long_rows(make_csv_file):
+    # (a quoted cell that spans many blocks, and holds newlines and
+    # delimiters, between short rows)
+    csv_file_path = make_csv_file(
+        b'a,b\n1,"' + b'x,y\n""z' * 4096 + b'"\n2,3\n' + \
+        b'"' + b'w\r\n' * 1000 + b'",4'
+    )
+    expected = _get_outcome(csv_file_path, 0x22, 0x2c, {})
+    for bs in (1, 7, 100, 1 << 16):
+        assert expected == _get_outcome(
+            csv_file_path, 0x22, 0x2c, {'engine': 'numpy', 'block_size': bs}
+        ), bs
+
+
+def test_scan_parity():
+    assert (False, 1) == _numpy_engine.scan_parity(b'ab"c\n', 0x22, 0)
+    assert (True,  0) == _numpy_engine.scan_parity(b'ab"c\n', 0x22, 1)
+    assert (True,  0) == _numpy_engine.scan_parity(b'a"b"\n', 0x22, 0)
+    assert (False, 1) == _numpy_engine.scan_parity(b'',       0x22, 1)
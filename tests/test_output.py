@@ -0,0 +1,148 @@
+import io
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+import csvinfo
+from csvinfo import CSVTree
+from csvinfo._output import BatchWriter
+from csvinfo._output import write_statistics
+from csvinfo._output import write_column_statistics
+
+
+# The statistics are written as aligned text, or in one of the machine
+# readable formats (json, jsonl and tsv), which must read back as the
+# statistics that were written.
+
+CSVS = {'n_rows': 3, 'ratio': 0.5, 'name': 'a\tb\nc', 'none': None}
+
+
+def _read_tsv(text) -> list:
+    return [line.split('\t') for line in text.splitlines()]
+
+
+def test_write_statistics():
+    out = io.StringIO()
+    assert write_statistics(CSVS, 'json', out) is None
+    assert CSVS == json.loads(out.getvalue())
+
+    out = io.StringIO()
+    assert write_statistics(CSVS, 'jsonl', out) is None
+    assert 1 == len(out.getvalue().splitlines())
+    assert CSVS == json.loads(out.getvalue())
+
+    out = io.StringIO()
+    assert write_statistics(CSVS, 'tsv', out) is None
+    assert [list(CSVS.keys()), ['3', '0.5', 'a\\tb\\nc', '']] == \
+           _read_tsv(out.getvalue())
+
+    out = io.StringIO()
+    assert write_statistics(CSVS, 'text', out) is None
+    lines = out.getvalue().splitlines()
+    assert 'n_rows' == lines[0].split()[0]
+    assert 1 == len(set(len(line) for line in lines[:2]))
+
+
+def test_write_column_statistics():
+    css = [{'column': j, 'n_cells': 10 - j} for j in range(3)]
+    out = io.StringIO()
+    assert write_column_statistics(css, 'jsonl', out) is None
+    assert css == [json.loads(line) for line in out.getvalue().splitlines()]
+    out = io.StringIO()
+    assert write_column_statistics(css, 'tsv', out) is None
+    assert [['column', 'n_cells'], ['0', '10'], ['1', '9'], ['2', '8']] == \
+           _read_tsv(out.getvalue())
+
+
+def test_batch_writer():
+    aggregate = {'n_files': 3, 'n_failed_files': 1, 'n_rows': 5}
+    a = {'n_rows': 2}
+    b = {'n_rows': 3}
+
+    # (a record per file, written as soon as the file is, and the aggregate)
+    out = io.StringIO()
+    bw = BatchWriter('jsonl', out)
+    assert bw.write_file('a.csv', a, None) is None
+    assert 1 == len(out.getvalue().splitlines())
+    assert bw.write_file('x.csv', None, 'error') is None
+    assert bw.write_file('b.csv', b, None) is None
+    assert bw.write_aggregate(aggregate) is None
+    assert [
+        {'csv_file_path': 'a.csv', 'error': None,    'n_rows': 2},
+        {'csv_file_path': 'x.csv', 'error': 'error', 'n_rows': None},
+        {'csv_file_path': 'b.csv', 'error': None,    'n_rows': 3},
+        {'aggregate': aggregate},
+    ] == [json.loads(line) for line in out.getvalue().splitlines()]
+
+    # (the header comes first, even if the first file failed; and the
+    # aggregate is a final row)
+    out = io.StringIO()
+    bw = BatchWriter('tsv', out)
+    assert bw.write_file('x.csv', None, 'error') is None
+    assert '' == out.getvalue()
+    assert bw.write_file('a.csv', a, None) is None
+    assert bw.write_aggregate(aggregate) is None
+    assert [
+        ['csv_file_path', 'error', 'n_rows', 'n_files', 'n_failed_files'],
+        ['x.csv',         'error', '',       '',        ''              ],
+        ['a.csv',         '',      '2',      '',        ''              ],
+        ['*',             '',      '5',      '3',       '1'             ],
+    ] == _read_tsv(out.getvalue())
+
+    # (batch json is columnar)
+    out = io.StringIO()
+    bw = BatchWriter('json', out)
+    assert bw.write_file('a.csv', a, None) is None
+    assert bw.write_file('b.csv', b, None) is None
+    assert '' == out.getvalue()
+    assert bw.write_aggregate(aggregate) is None
+    assert {
+        'files': {
+            'csv_file_path': ['a.csv', 'b.csv'],
+            'error'        : [None,    None   ],
+            'n_rows'       : [2,       3      ],
+        },
+        'aggregate': aggregate,
+    } == json.loads(out.getvalue())
+
+
+# (the command line, run as it is by its users, in a process of its own)
+def _run_csvinfo(args) -> bytes:
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.path.dirname(os.path.dirname(csvinfo.__file__)),
+    }
+    return subprocess.run(
+        [sys.executable, '-m', 'csvinfo', *args],
+        capture_output = True,
+        check          = True,
+        env            = env,
+    ).stdout
+
+
+@pytest.mark.parametrize('format', ('json', 'jsonl'))
+def test_main_format(make_csv_file, format):
+    csv_file_path = make_csv_file(b'a,"b"\nc,d\n')
+    assert {
+        'quote_character'    : '0x22',
+        'delimiter_character': '0x2c',
+        **CSVTree(csv_file_path).get_statistics(),
+    } == json.loads(_run_csvinfo(['--format', format, csv_file_path]))
+
+
+def test_main_batch_tsv(make_csv_file):
+    cfps = [
+        make_csv_file(b'a,b\nc,d\n', name = 'a.csv'),
+        make_csv_file(b'e,f,g\n',     name = 'b.csv'),
+    ]
+    rows = _read_tsv(_run_csvinfo(['--format', 'tsv', *cfps]).decode())
+    assert 4 == len(rows)
+    assert 1 == len(set(len(row) for row in rows))
+    # ni: n_rows [column] index
+    ni = rows[0].index('n_rows')
+    assert [cfps[0], cfps[1], '*'] == [row[0] for row in rows[1:]]
+    assert ['2', '1', '3'] == [row[ni] for row in rows[1:]]
+    assert '2' == rows[3][rows[0].index('n_files')]
@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+from csvinfo._chunks import split_csv_file
+
+
+# A parse in parallel (jobs > 1) splits the csv file at row boundaries, and
+# must give the statistics (and rows) of a parse in a single process, which
+# includes quoted cells that hold newlines across the chunk boundaries.
+
+SHAPES = ('narrow', 'quoted', 'newlines', 'doubled', 'ssv')
+
+
+def _get_statistics(csvt) -> tuple:
+    return (
+        csvt.get_statistics(),
+        csvt.get_column_statistics(),
+        csvt.get_n_cells_in_row_histogram(),
+    )
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+def test_parallel_matches_serial(make_shape_csv_file, shape):
+    csv_file_path = make_shape_csv_file(shape, 1 << 17)
+    serial = CSVTree(csv_file_path)
+    for kwargs in (
+        {'jobs': 2},
+        {'jobs': 3, 'block_size': 1 << 10},
+        {'jobs': 4, 'use_mmap': True},
+    ):
+        parallel = CSVTree(csv_file_path, **kwargs)
+        assert len(serial) == len(parallel), kwargs
+        assert _get_statistics(serial) == _get_statistics(parallel), kwargs
+        assert list(serial.get_row_sizes()) == \
+               list(parallel.get_row_sizes()), kwargs
+        assert _get_statistics(serial) == \
+               _get_statistics(CSVStream(csv_file_path, **kwargs)), kwargs
+
+
+def test_parallel_random(make_csv_file, gen_csv):
+    for seed in range(20):
+        csv_file_path = make_csv_file(
+            b''.join(gen_csv(1000 * seed + k, n_rows = 20) + b'\n'
+                     for k in range(20))
+        )
+        assert _get_statistics(CSVTree(csv_file_path)) == \
+               _get_statistics(CSVTree(csv_file_path, jobs = 3,
+                                       block_size = 7)), seed
+
+
+def test_split_csv_file_tiles(make_shape_csv_file):
+    csv_file_path = make_shape_csv_file('newlines', 1 << 16)
+    size = os.path.getsize(csv_file_path)
+    with ProcessPoolExecutor(max_workers = 2) as executor:
+        brs = split_csv_file(
+            executor        = executor,
+            csv_file_path   = csv_file_path,
+            begin           = 0,
+            end             = size,
+            n_chunks        = 5,
+            quote_character = 0x22,
+            block_size      = 1 << 10,
+        )
+    # (the byte ranges tile the file, and each begins at a row begin)
+    assert 0 == brs[0][0] and size == brs[-1][1]
+    assert all(a[1] == b[0] for a, b in zip(brs, brs[1:]))
+    rbs = set(CSVTree(csv_file_path).get_row_begins())
+    assert all(bb in rbs for bb, _ in brs)
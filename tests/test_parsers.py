@@ -0,0 +1,141 @@
+import io
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+from csvinfo._errors import CSVSyntaxError
+
+
+# The fast parser (at any block size, and on a memory-mapped csv file), the
+# paranoid parser and the streaming statistics must agree: on the statistics
+# of a csv file that parses, and on the error (its type and its message) of
+# one that does not.
+
+DIALECTS = ((0x22, 0x2c), (0x27, 0x2c), (0x22, 0x09))
+
+KWARGSS = (
+    {'paranoid'  : True},
+    {},
+    {'block_size': 1},
+    {'block_size': 3},
+    {'use_mmap'  : True},
+    {'use_mmap'  : True, 'block_size': 2},
+)
+
+
+def _get_outcome(cls, csv_file_path, qc, dc, kwargs) -> tuple:
+    try:
+        csvt = cls(csv_file_path, qc, dc, **kwargs)
+    except CSVSyntaxError as e:
+        return ('csv syntax error', str(e))
+    # (a csv file whose only row holds only an empty cell has no rows)
+    except AssertionError:
+        return ('no rows', None)
+    return (
+        'statistics',
+        csvt.get_statistics(),
+        csvt.get_column_statistics(),
+        csvt.get_n_cells_in_row_histogram(),
+    )
+
+
+@pytest.mark.parametrize('invalid', (False, True))
+@pytest.mark.parametrize('qc, dc', DIALECTS)
+def test_parsers_agree(make_csv_file, gen_csv, qc, dc, invalid):
+    for seed in range(40):
+        csv_file_path = make_csv_file(
+            gen_csv(seed, qc, dc, invalid = invalid)
+        )
+        # (the paranoid parser is the reference)
+        outcomes = [
+            _get_outcome(cls, csv_file_path, qc, dc, kwargs)
+            for cls in (CSVTree, CSVStream)
+            for kwargs in KWARGSS
+            if not (cls is CSVStream and 'paranoid' in kwargs)
+        ]
+        for outcome in outcomes[1:]:
+            assert outcome == outcomes[0], (seed, outcome, outcomes[0])
+
+
+@pytest.mark.parametrize('data, message', (
+    (b'a,b"c\n',   'byteidx=3, state=state_continue_unquoted_cell_read, '
+                   'byte=0x22'),
+    (b'"a"b\n',    'csv syntax error: byteidx=3, '
+                   'state=state_continue_quoted_cell_read_char_after_qc, '
+                   'byte=0x62'),
+    (b'a\rb\n',    'byteidx=2, state=state_end_read_cr_lf, byte=0x62'),
+    (b'a,"b\n',    'csv syntax error: byteidx=5, '
+                   'state=state_continue_quoted_cell_read, byte=0x-1'),
+    (b'"a"  b\n',  'csv syntax error: byteidx=5, '
+                   'state=state_continue_burn_spaces, byte=0x62'),
+))
+def test_syntax_error_messages(make_csv_file, data, message):
+    csv_file_path = make_csv_file(data)
+    for kwargs in KWARGSS:
+        with pytest.raises(CSVSyntaxError) as e:
+            CSVTree(csv_file_path, **kwargs)
+        assert message == str(e.value), kwargs
+    # (a csv syntax error is a ValueError)
+    with pytest.raises(ValueError):
+        CSVStream(io.BytesIO(data))
+
+
+def test_statistics(make_csv_file):
+    csv_file_path = make_csv_file(
+        b'a,"b ""c""",d\r\n'
+        b'  "e\nf"  "g"\n'
+        b'h,,\n'
+        b'""'
+    )
+    for kwargs in KWARGSS:
+        csvs = CSVTree(csv_file_path, **kwargs).get_statistics()
+        assert 3 == csvs['n_rows'], kwargs
+        assert 1 == csvs['n_rows_ended_by_crlf']
+        assert 2 == csvs['n_rows_ended_by_lf']
+        assert 0 == csvs['n_rows_ended_by_eof']
+        assert 1 == csvs['n_rows_with_leading_spaces']
+        assert 8 == csvs['n_cells']
+        assert 3 == csvs['n_quoted_cells']
+        assert 4 == csvs['n_conventional_cell_delimiters']
+        assert 1 == csvs['n_spaces_cell_delimiters']
+        assert 2 == csvs['n_quote_chars_inside_cells']
+        assert 1 == csvs['n_lfs_inside_cells']
+        assert 2 == csvs['n_cells_in_row_min']
+        assert 3 == csvs['n_cells_in_row_max']
+
+
+class _CountingReader:
+    def __init__(self, csv_file, sizes):
+        self._csv_file = csv_file
+        self._sizes    = sizes
+
+    def read(self, n) -> bytes:
+        bl = self._csv_file.read(n)
+        self._sizes.append(len(bl))
+        return bl
+
+    def close(self) -> None:
+        return self._csv_file.close()
+
+
+def test_read_in_blocks(make_csv_file, monkeypatch):
+    # (the csv file is read in blocks of block_size bytes, rather than a
+    # byte at a time; and a row, a cell, or a cr lf, that straddles two
+    # blocks is parsed as any other)
+    sizes = []
+    open_csv_file = CSVTree._open_csv_file
+    monkeypatch.setattr(
+        CSVTree, '_open_csv_file',
+        lambda self, bb: _CountingReader(open_csv_file(self, bb), sizes),
+    )
+    csv_file_path = make_csv_file(b'a,"b\r\nc",d\r\n' * 1000)
+    for kwargs in ({'paranoid': True}, {}):
+        del sizes[:]
+        csvs = CSVTree(csv_file_path, block_size = 1000, **kwargs) \
+            .get_statistics()
+        assert 12 == sum(1 for n in sizes if 0 < n), kwargs
+        assert all(1000 == n for n in sizes[:12]), kwargs
+        assert 1000 == csvs['n_rows']
+        assert 1000 == csvs['n_rows_ended_by_crlf']
+        assert 1000 == csvs['n_crlfs_inside_cells']
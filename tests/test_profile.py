@@ -0,0 +1,41 @@
+from csvinfo import CSVTree
+from csvinfo._profile import ParserProfile
+
+
+# The counts of a parser profile are those of the bytes that the parser
+# consumed, and of the state changes that they made, and so do not depend
+# on the block size (a block refill is not a pass of the parser).
+
+def _get_counts(csv_file_path, kwargs) -> tuple:
+    pp = ParserProfile()
+    CSVTree(csv_file_path, profile = pp, **kwargs)
+    p = pp.get_profile()
+    # (the transitions of equal counts are in no particular order)
+    return (
+        p['state_bytes'],
+        sorted((t['from'], t['to'], t['count']) for t in p['transitions']),
+    )
+
+
+def test_counts_do_not_depend_on_block_size(make_csv_file, gen_csv):
+    for seed in range(20):
+        csv_file_path = make_csv_file(gen_csv(seed, n_rows = 20))
+        for kwargs in ({}, {'paranoid': True}):
+            try:
+                expected = _get_counts(csv_file_path, kwargs)
+            except AssertionError:
+                break
+            for bs in (1, 2, 3, 7, 64):
+                assert expected == _get_counts(
+                    csv_file_path, {'block_size': bs, **kwargs}
+                ), (seed, kwargs, bs)
+
+
+def test_state_bytes_add_up(make_csv_file):
+    data = b'a,"b\r\n""c"  "d"\r\n  "e",f\n'
+    csv_file_path = make_csv_file(data)
+    for kwargs in ({}, {'paranoid': True}, {'block_size': 1}):
+        state_bytes, _ = _get_counts(csv_file_path, kwargs)
+        # (every byte is consumed once, and the end of the file is not a
+        # byte)
+        assert len(data) == sum(state_bytes.values()), kwargs
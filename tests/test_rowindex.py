@@ -0,0 +1,122 @@
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo._rowindex import build_row_index
+from csvinfo._rowindex import load_row_index
+from csvinfo._rowindex import write_row_index
+
+
+# A row index that is written and loaded back must hold the row begins of a
+# full parse, and a row range parsed by it must hold the rows of a full
+# parse.
+
+def _get_rows(csvt) -> list:
+    return [
+        [
+            (csvt.get_row(i).get_cell(j).get_content(),
+             csvt.get_row(i).get_cell(j).isquoted())
+            for j in range(len(csvt.get_row(i)))
+        ]
+        for i in range(len(csvt))
+    ]
+
+
+def test_row_index_round_trip(make_csv_file, gen_csv):
+    for seed in range(30):
+        csv_file_path = make_csv_file(gen_csv(seed, n_rows = 40))
+        try:
+            csvt = CSVTree(csv_file_path)
+        except AssertionError:
+            continue
+        rbs = list(csvt.get_row_begins())
+        assert rbs == list(build_row_index(csv_file_path)), seed
+        index_path = write_row_index(csv_file_path)
+        assert csv_file_path + '.rowidx' == index_path
+        assert rbs == list(load_row_index(csv_file_path)), seed
+
+        rows = _get_rows(csvt)
+        n = len(rows)
+        for rowidx_begin, rowidx_end in ((0, n), (n // 3, n // 2),
+                                         (n - 1, n)):
+            if not (rowidx_begin < rowidx_end):
+                continue
+            csvr = CSVTree.from_row_range(csv_file_path, rowidx_begin,
+                                          rowidx_end)
+            assert rows[rowidx_begin:rowidx_end] == _get_rows(csvr), seed
+        with pytest.raises(IndexError):
+            CSVTree.from_row_range(csv_file_path, 0, n + 1)
+
+
+def test_row_index_long_rows(make_csv_file, tmp_path):
+    # (the deltas of rows of 128 bytes and more take more than one byte of
+    # the index)
+    csv_file_path = make_csv_file(
+        b''.join(b'"' + b'x\n' * k + b'",y\n' for k in (0, 63, 64, 5000))
+    )
+    index_path = str(tmp_path / 'other.rowidx')
+    assert index_path == write_row_index(csv_file_path, index_path)
+    assert [0, 5, 136, 269] == list(load_row_index(csv_file_path,
+                                                   index_path))
+    assert [b'x\n' * 64] == [
+        CSVTree.from_row_range(csv_file_path, 2, 3, index_path)
+        .get_row(0).get_cell(0).get_content()
+    ]
+
+
+def test_stale_row_index(make_csv_file):
+    csv_file_path = make_csv_file(b'a,b\nc,d\n')
+    assert csv_file_path + '.rowidx' == write_row_index(csv_file_path)
+    assert [0, 4] == list(load_row_index(csv_file_path))
+    # (an index built with another quote character, or of another version
+    # of the file, is not loaded)
+    assert load_row_index(csv_file_path, quote_character = 0x27) is None
+    make_csv_file(b'a,b\nc,d\ne,f\n')
+    assert load_row_index(csv_file_path) is None
+    assert load_row_index(csv_file_path + '.missing') is None
+
+
+def test_row_index_final_row(make_csv_file):
+    # (a final row that holds only an empty cell is not a row)
+    for data, rbs in (
+        (b'a\nb',       [0, 2]),
+        (b'a\nb\n',     [0, 2]),
+        (b'a\n""',      [0]),
+        (b'a\n  ""  ',  [0]),
+        (b'a\n"" x',    [0, 2]),
+    ):
+        csv_file_path = make_csv_file(data)
+        assert rbs == list(build_row_index(csv_file_path)), data
+
+
+@pytest.mark.parametrize('anchor_interval', (1, 3, 1024))
+def test_row_index_lookup(make_csv_file, anchor_interval):
+    csv_file_path = make_csv_file(
+        b''.join(b'"' + b'x\n' * (k % 97) + b'",%d\n' % k for k in range(2000))
+    )
+    rbs = list(build_row_index(csv_file_path))
+    assert 2000 == len(rbs)
+    write_row_index(csv_file_path, anchor_interval = anchor_interval)
+    ri = load_row_index(csv_file_path)
+    assert len(rbs) == len(ri)
+    assert rbs == list(ri)
+    assert rbs == [ri[i] for i in range(len(ri))]
+    for rowidx in (-1, len(rbs)):
+        with pytest.raises(IndexError):
+            ri[rowidx]
+    # (a scan for a row range stops at the end of the range)
+    assert rbs[:11] == list(build_row_index(csv_file_path, rowidx_end = 10))
+
+
+def test_row_index_lookup_reads_one_interval(make_csv_file):
+    csv_file_path = make_csv_file(b'a,b\n' * 100 + b'cc,d\n' * 100)
+    index_path = write_row_index(csv_file_path, anchor_interval = 10)
+    # (the deltas of the last interval are corrupted, and so only a lookup
+    # of a row in it fails)
+    with open(index_path, 'r+b') as index_file:
+        index_file.seek(-3, 2)
+        index_file.write(b'\xff\xff\xff')
+    ri = load_row_index(csv_file_path)
+    assert [4 * i for i in range(100)] == [ri[i] for i in range(100)]
+    assert 400 + 5 * 90 == ri[190]
+    with pytest.raises(ValueError):
+        ri[199]
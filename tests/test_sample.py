@@ -0,0 +1,117 @@
+import gzip
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo._sample import sample_statistics
+
+
+# The estimates of sampled statistics come with 95% confidence intervals;
+# over many files and counts, most intervals must cover the exact counts of
+# a full parse (the coverage is somewhat below 95%, as the intervals are
+# normal, over a few dozen samples).
+
+def _make_sampled_csv_file(make_csv_file, gen_csv, seed) -> str:
+    return make_csv_file(
+        b''.join(gen_csv(1000 * seed + k, n_rows = 30) + b'\n'
+                 for k in range(400)),
+        name = f'{seed}.csv',
+    )
+
+
+def test_ci_coverage(make_csv_file, gen_csv):
+    # n: n [intervals]
+    # c: [of which] covered
+    n = 0
+    c = 0
+    for seed in range(8):
+        csv_file_path = _make_sampled_csv_file(make_csv_file, gen_csv, seed)
+        exact = CSVTree(csv_file_path).get_statistics()
+        estimate = sample_statistics(csv_file_path, 30, 2700)
+        assert estimate['sampled'] is True
+        assert 30 == estimate['n_samples']
+        for key, hw in estimate.items():
+            if not key.endswith('_ci95'):
+                continue
+            key = key[:-len('_ci95')]
+            assert 0 <= hw, key
+            n += 1
+            if abs(estimate[key] - exact[key]) <= hw:
+                c += 1
+            # (no estimate is far off)
+            assert abs(estimate[key] - exact[key]) <= 3 * hw + 1, \
+                (seed, key, estimate[key], exact[key], hw)
+    assert 100 < n
+    assert 0.85 <= c / n, (c, n)
+
+
+def test_extremes_are_bounds(make_csv_file, gen_csv):
+    csv_file_path = _make_sampled_csv_file(make_csv_file, gen_csv, 0)
+    exact = CSVTree(csv_file_path).get_statistics()
+    estimate = sample_statistics(csv_file_path, 10, 2000)
+    assert exact['n_cells_in_row_min'] <= estimate['n_cells_in_row_min']
+    assert estimate['n_cells_in_row_max'] <= exact['n_cells_in_row_max']
+
+
+def test_per_file_count(make_csv_file):
+    # (a count of the file as a whole is taken from the final sample)
+    for data, n_rows_ended_by_eof in (
+        (b'a,b\n' * 10000,          0),
+        (b'a,b\n' * 10000 + b'c,d', 1),
+    ):
+        csv_file_path = make_csv_file(data)
+        estimate = sample_statistics(csv_file_path, 5, 1000)
+        assert estimate['sampled'] is True
+        assert n_rows_ended_by_eof == estimate['n_rows_ended_by_eof']
+        assert 'n_rows_ended_by_eof_ci95' not in estimate
+        assert abs(estimate['n_rows_ended_by_lf'] - 10000) <= \
+               estimate['n_rows_ended_by_lf_ci95']
+
+
+def test_small_file_is_exact(make_csv_file):
+    csv_file_path = make_csv_file(b'a,"b\nc"\nd,e\n')
+    estimate = sample_statistics(csv_file_path, 4, 100)
+    assert estimate['sampled'] is False
+    assert {'sampled': False, **CSVTree(csv_file_path).get_statistics()} == \
+           estimate
+
+
+def test_single_sample_has_no_interval(make_csv_file):
+    csv_file_path = make_csv_file(b'a,b\n' * 1000)
+    estimate = sample_statistics(csv_file_path, 1, 100)
+    assert 1 == estimate['n_samples']
+    assert estimate['n_rows_ended_by_lf_ci95'] is None
+
+
+def test_compressed_rejected(make_csv_file):
+    csv_file_path = make_csv_file(gzip.compress(b'a,b\n' * 1000))
+    with pytest.raises(ValueError):
+        sample_statistics(csv_file_path, 4, 100)
+
+
+def test_ambiguous_parity(make_csv_file):
+    # (a sample that begins among the "",r lines parses under both parities:
+    # under the wrong one, as rows of 2 cells, which are not consistent with
+    # the rows of 3 cells of the other samples, and so are not kept)
+    csv_file_path = make_csv_file(
+        (b'"p\n' + b'"",r\n' * 20 + b'""",t,u\n' + b'1,2,3\n' * 100) * 200
+    )
+    assert 3 == CSVTree(csv_file_path).get_statistics()['n_cells_in_row_min']
+    estimate = sample_statistics(csv_file_path, 97, 150)
+    assert estimate['sampled'] is True
+    assert 3 == estimate['n_cells_in_row_min']
+    assert 3 == estimate['n_cells_in_row_max']
+
+
+def test_sampled_distinct_estimates(make_csv_file):
+    # (the estimates of the numbers of distinct and duplicate rows are those
+    # of the samples, and are not named as those of the whole file)
+    csv_file_path = make_csv_file(b'a,b\n' * 10000)
+    estimate = sample_statistics(
+        csv_file_path, 5, 1000, distinct_precision = 12
+    )
+    assert 'n_distinct_rows_estimate' not in estimate
+    assert 'n_duplicate_rows_estimate' not in estimate
+    assert 1 == estimate['n_distinct_rows_sample_estimate']
+    assert estimate['n_sampled_rows'] - 1 == \
+           estimate['n_duplicate_rows_sample_estimate']
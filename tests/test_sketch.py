@@ -0,0 +1,138 @@
+import math
+import random
+
+import pytest
+
+from csvinfo import CSVTree
+from csvinfo._sketch import HyperLogLog
+from csvinfo._sketch import QuantileSketch
+from csvinfo._sketch import hash_content
+from csvinfo._sketch import SIGNIFICANT_BITS
+
+
+# The quantiles of a quantile sketch are rounded down, by less than
+# 1/2**(SIGNIFICANT_BITS-1) of themselves, and two sketches merge exactly.
+
+def _get_exact_quantile(vs, q) -> int:
+    vs = sorted(vs)
+    return vs[max(1, math.ceil(q * len(vs))) - 1]
+
+
+def test_quantile_bounds():
+    rng = random.Random(0)
+    for vs in (
+        [rng.randint(0, 100)               for _ in range(10000)],
+        [int(rng.paretovariate(1.2) * 100) for _ in range(10000)],
+        [rng.randint(0, 1 << 40)           for _ in range(1000)],
+        [7],
+    ):
+        qs = QuantileSketch()
+        for v in vs:
+            assert qs.add(v) is None
+        assert len(vs) == len(qs)
+        assert max(vs) == qs.get_quantiles()['max']
+        for q in (0.0, 0.1, 0.5, 0.9, 0.99, 1.0):
+            e = _get_exact_quantile(vs, q)
+            a = qs.get_quantile(q)
+            assert a <= e, (q, a, e)
+            assert e - a < e / 2 ** (SIGNIFICANT_BITS - 1) or e == a, \
+                (q, a, e)
+    assert QuantileSketch().get_quantile(0.5) is None
+
+
+def test_quantile_merge_is_exact():
+    rng = random.Random(1)
+    vs = [int(rng.expovariate(1e-3)) for _ in range(5000)]
+    whole = QuantileSketch()
+    parts = [QuantileSketch() for _ in range(3)]
+    for k, v in enumerate(vs):
+        whole.add(v)
+        parts[k % 3].add(v)
+    merged = QuantileSketch()
+    for part in parts:
+        assert merged.merge(part) is None
+    assert len(whole) == len(merged)
+    assert whole.get_quantiles() == merged.get_quantiles()
+    assert all(
+        whole.get_quantile(q / 100) == merged.get_quantile(q / 100)
+        for q in range(101)
+    )
+
+
+def test_quantile_statistics(make_csv_file):
+    csv_file_path = make_csv_file(
+        b''.join(b'x' * (k % 10) + b',' + b'y' * 300 + b'\n'
+                 for k in range(1000))
+    )
+    csvs = CSVTree(csv_file_path, jobs = 2).get_statistics()
+    assert 300 == csvs['cell_content_length_max']
+    assert 9   == csvs['cell_content_length_p50']
+    assert 311 == csvs['row_size_max']
+    assert 306 == csvs['row_size_p50']
+    # (311 is counted in the bucket of 310, but the max is exact)
+    assert 310 == csvs['row_size_p99']
+
+
+# The estimate of a hyperloglog sketch is within a few relative standard
+# errors (1.04/sqrt(2**precision)) of the exact number of distinct values
+# (and small numbers are counted exactly), the union of two sketches is
+# their merge, and a sketch round-trips through bytes.
+
+def _get_hll(precision, vs) -> HyperLogLog:
+    hll = HyperLogLog(precision)
+    for v in vs:
+        assert hll.add(hash_content(b'%d' % v)) is None
+    return hll
+
+
+@pytest.mark.parametrize('precision', (8, 12, 14))
+def test_hll_bounds(precision):
+    # rse: relative standard error
+    rse = 1.04 / math.sqrt(1 << precision)
+    for n in (0, 1, 10, 100, 1000, 10000, 100000):
+        e = _get_hll(precision, range(n)).get_estimate()
+        if n <= 10:
+            assert n == e, (n, e)
+        else:
+            assert abs(e - n) <= 3 * rse * n, (n, e)
+    # (duplicates are not counted)
+    assert _get_hll(precision, range(1000)).get_estimate() == \
+           _get_hll(precision, list(range(1000)) * 3).get_estimate()
+
+
+def test_hll_merge():
+    a = _get_hll(12, range(0,    6000))
+    b = _get_hll(12, range(4000, 10000))
+    assert a.merge(b) is None
+    assert _get_hll(12, range(10000)).to_bytes() == a.to_bytes()
+    assert a.to_bytes() == HyperLogLog.from_bytes(a.to_bytes()).to_bytes()
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(8))
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(a.to_bytes()[:-1])
+
+
+def test_distinct_statistics(make_csv_file):
+    # (1000 distinct rows, each twice; the cells of the first column take
+    # 10 values, quoted or not, and those of the second take 1000)
+    csv_file_path = make_csv_file(
+        b''.join(
+            (b'"%d"' if 0 == k % 3 else b'%d') % (k % 10) + b',%d\n' % k
+            for k in list(range(1000)) * 2
+        )
+    )
+    for kwargs in ({}, {'jobs': 3}, {'use_mmap': True}):
+        csvt = CSVTree(csv_file_path, distinct_precision = 12, **kwargs)
+        csvs = csvt.get_statistics()
+        assert abs(csvs['n_distinct_rows_estimate'] - 1000) <= 50, kwargs
+        assert csvs['n_distinct_rows_estimate'] + \
+               csvs['n_duplicate_rows_estimate'] == 2000, kwargs
+        ncs = [c['n_distinct_cells_estimate']
+               for c in csvt.get_column_statistics()]
+        assert 20 == ncs[0], kwargs
+        assert abs(ncs[1] - 1000) <= 50, kwargs
+    # (the sketches are opt-in)
+    csvt = CSVTree(csv_file_path)
+    assert csvt.get_statistics()['n_distinct_rows_estimate'] is None
+    assert all(c['n_distinct_cells_estimate'] is None
+               for c in csvt.get_column_statistics())
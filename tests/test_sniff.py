@@ -0,0 +1,77 @@
+import io
+import gzip
+
+import pytest
+
+from csvinfo._sniff import PREFIX_SIZE
+from csvinfo._sniff import sniff_dialect
+from csvinfo._sniff import resolve_dialect
+from csvinfo._sniff import sniff_prefix_dialect
+
+
+# The dialect of a csv file is sniffed from a prefix of it: the dialect
+# under which the prefix parses into consistent rows, with the most
+# delimiters and quoted cells, and otherwise the default.
+
+DIALECTS = ((0x22, 0x2c), (0x27, 0x2c), (0x22, 0x09), (0x27, 0x09))
+
+
+@pytest.mark.parametrize('qc, dc', DIALECTS)
+def test_sniff_dialect(make_csv_file, qc, dc):
+    q = bytes([qc])
+    d = bytes([dc])
+    # (the other quote character, and the other delimiter character, are
+    # content)
+    row = q + b'a' + (b'\t' if 0x2c == dc else b',') + b'b' + q + d + \
+          b'c' + d + q + (b"'" if 0x22 == qc else b'"') + b'd' + q + b'\n'
+    csv_file_path = make_csv_file(row * 2000)
+    assert (qc, dc) == sniff_dialect(csv_file_path)
+    # (from the decompressed prefix of a compressed csv file)
+    csv_file_path = make_csv_file(gzip.compress(row * 2000), 'test.csv.gz')
+    assert (qc, dc) == sniff_dialect(csv_file_path)
+
+
+def test_sniff_defaults():
+    # (a prefix with no quote or delimiter character is of the defaults)
+    assert (0x22, 0x2c) == sniff_prefix_dialect(b'a\nb\n', True)
+    # (and so is one that no dialect parses, so that the full parse reports
+    # the csv syntax error)
+    assert (0x22, 0x2c) == sniff_prefix_dialect(b'a"b\'c\n', True)
+
+
+def test_sniff_given_character():
+    prefix = b"'a,b'\t'c'\n" * 10
+    assert (0x27, 0x09) == sniff_prefix_dialect(prefix, True)
+    # (a character that is given is the only candidate, and the other one
+    # is sniffed under it)
+    assert (0x22, 0x2c) == sniff_prefix_dialect(
+        prefix, True, delimiter_character = 0x2c
+    )
+    assert (0x27, 0x09) == sniff_prefix_dialect(
+        prefix, True, quote_character = 0x27
+    )
+
+
+def test_sniff_truncated_prefix():
+    # (the prefix is parsed up to its last complete row, and so a row cut
+    # in a quoted cell does not count against the dialect)
+    prefix = b'"a\nb"\t"c,d"\n' * 10 + b'"e\nf'
+    assert (0x22, 0x09) == sniff_prefix_dialect(prefix, False)
+    # (whereas a whole file that ends in a quoted cell does not parse)
+    assert (0x22, 0x2c) == sniff_prefix_dialect(prefix, True)
+
+
+def test_resolve_dialect_of_stream():
+    data = b'a\tb\tc\n' * (PREFIX_SIZE // 3)
+    stream, kwargs = resolve_dialect(
+        io.BytesIO(data),
+        {'quote_character': None, 'delimiter_character': None},
+    )
+    assert 0x09 == kwargs['delimiter_character']
+    assert 0x22 == kwargs['quote_character']
+    # (the stream still yields the prefix that was sniffed from it)
+    assert data == b''.join(stream)
+    # (a dialect that is given is not sniffed)
+    csv_file_path, kwargs = resolve_dialect('x.csv', {})
+    assert 'x.csv' == csv_file_path
+    assert {} == kwargs
@@ -0,0 +1,122 @@
+import gc
+import io
+
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+from csvinfo import CSVStatistics
+
+
+# The statistics of a tree are tabulated from the arrays of its store (see
+# CSVStatistics.add_store), and must be those that add_row tabulates from
+# the rows one at a time (as a stream does), whether the csv file is
+# memory-mapped or not, and whether the store was parsed in parallel.
+
+DIALECTS = ((0x22, 0x2c), (0x27, 0x2c), (0x22, 0x09))
+
+
+def _get_statistics(csvs) -> tuple:
+    return (
+        csvs.get_statistics(),
+        csvs.get_column_statistics(),
+        csvs.get_n_cells_in_row_histogram(),
+    )
+
+
+def test_add_store_matches_add_row(make_csv_file, gen_csv):
+    for seed in range(30):
+        qc, dc = DIALECTS[seed % 3]
+        data = gen_csv(seed, qc, dc, n_rows = 50)
+        csv_file_path = make_csv_file(data)
+        for kwargs in (
+            {},
+            {'use_mmap'          : True},
+            {'jobs'              : 2},
+            {'distinct_precision': 12},
+        ):
+            try:
+                csvt = CSVTree(csv_file_path, qc, dc, **kwargs)
+            except AssertionError:
+                break
+            csvs = CSVStatistics(
+                qc, dc, distinct_precision = kwargs.get('distinct_precision'),
+            )
+            for i in range(len(csvt)):
+                assert csvs.add_row(csvt.get_row(i)) is None
+            assert _get_statistics(csvs) == \
+                   _get_statistics(csvt._tabulate_statistics()), \
+                   (seed, kwargs)
+            # (a stream is neither memory-mapped nor parsed in parallel)
+            if 'use_mmap' in kwargs or 'jobs' in kwargs:
+                continue
+            csvr = CSVStream(io.BytesIO(data), qc, dc, **kwargs)
+            assert _get_statistics(csvs) == \
+                   _get_statistics(csvr._tabulate_statistics()), \
+                   (seed, kwargs)
+
+
+def test_add_store_appends(make_csv_file):
+    # (the rows of a store follow those that were added before it)
+    a = CSVTree(make_csv_file(b'a,b,c\nd\n',     name = 'a.csv'))
+    b = CSVTree(make_csv_file(b'e,f\n"g",h,i\n', name = 'b.csv'))
+    csvs = CSVStatistics()
+    assert csvs.add_store(a._store) is None
+    assert csvs.add_store(b._store) is None
+    stats = csvs.get_statistics()
+    assert 4 == stats['n_rows']
+    assert 1 == stats['n_quoted_cells']
+    assert 1 == stats['first_rowidx_with_min_n_cells']
+    assert 0 == stats['first_rowidx_with_max_n_cells']
+    assert _get_statistics(csvs) == _get_statistics(
+        CSVTree(make_csv_file(b'a,b,c\nd\ne,f\n"g",h,i\n'))
+        ._tabulate_statistics()
+    )
+
+
+def test_stream_keeps_no_rows(make_csv_file, gen_csv, monkeypatch):
+    # (a stream tabulates each row as it is completed, and keeps none: no
+    # row is in its store, and only the row being tabulated is alive)
+    n_alive = []
+    add_row = CSVStatistics.add_row
+    def count_alive(self, row):
+        n_alive.append(sum(
+            1 for o in gc.get_objects() if isinstance(o, CSVTree._CSVRow)
+        ))
+        return add_row(self, row)
+    monkeypatch.setattr(CSVStatistics, 'add_row', count_alive)
+
+    csv_file_path = make_csv_file(gen_csv(0, n_rows = 40))
+    expected = CSVTree(csv_file_path).get_statistics()
+    for kwargs in ({'paranoid': True}, {}):
+        del n_alive[:]
+        csvr = CSVStream(csv_file_path, **kwargs)
+        assert expected == csvr.get_statistics(), kwargs
+        assert 0 == len(csvr._store)
+        assert 0 == len(csvr._rows)
+        assert 40 == len(csvr) == len(n_alive)
+        assert all(1 == n for n in n_alive), (kwargs, n_alive)
+
+
+def test_column_statistics(make_csv_file):
+    csv_file_path = make_csv_file(
+        b'a,"b\nc",\r\n'
+        b'"",dd,"e\r\nf",g\n'
+        b'hhh\n'
+    )
+    for cls in (CSVTree, CSVStream):
+        css = cls(csv_file_path).get_column_statistics()
+        assert [0, 1, 2, 3] == [cs['column']               for cs in css]
+        assert [3, 2, 2, 1] == [cs['n_cells']              for cs in css]
+        assert [1, 2 / 3, 2 / 3, 1 / 3] == \
+               [cs['rows_reaching_ratio']                  for cs in css]
+        assert [1, 1, 1, 0] == [cs['n_quoted_cells']       for cs in css]
+        assert [1, 0, 1, 0] == [cs['n_empty_cells']        for cs in css]
+        assert [3, 3, 4, 1] == [cs['content_length_max']   for cs in css]
+        assert [4 / 3, 5 / 2, 2, 1] == \
+               [cs['content_length_mean']                  for cs in css]
+        assert [0, 1, 0, 0] == [cs['n_lfs_inside_cells']   for cs in css]
+        assert [0, 0, 1, 0] == [cs['n_crlfs_inside_cells'] for cs in css]
+        assert [
+            {'n_cells_in_row': 1, 'n_rows': 1, 'rows_ratio': 1 / 3},
+            {'n_cells_in_row': 3, 'n_rows': 1, 'rows_ratio': 1 / 3},
+            {'n_cells_in_row': 4, 'n_rows': 1, 'rows_ratio': 1 / 3},
+        ] == cls(csv_file_path).get_n_cells_in_row_histogram()
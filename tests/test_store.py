@@ -0,0 +1,94 @@
+from csvinfo import CSVTree
+from csvinfo import iter_rows
+
+
+# The rows of a tree are kept in a columnar store (see CSVTree._CSVStore):
+# its row and cell views, and its bulk accessors, must give back the rows as
+# the parser read them, whether the csv file is memory-mapped or not.
+
+def _get_row(row) -> tuple:
+    cells = [row.get_cell(j) for j in range(len(row))]
+    return (
+        [bytes(cell.get_content()) for cell in cells],
+        [cell.isquoted() for cell in cells],
+        [cell.get_subsequent_delimiter() for cell in cells],
+        row.get_newline_encoding(),
+        row.leading_spaces_are_present(),
+        row.get_size(),
+    )
+
+
+def _get_view_row(rv) -> tuple:
+    return (
+        rv.get_contents(),
+        [rv.isquoted(j) for j in range(len(rv))],
+        [rv.get_subsequent_delimiter(j) for j in range(len(rv))],
+        rv.get_newline_encoding(),
+        rv.leading_spaces_are_present(),
+        rv.get_size(),
+    )
+
+
+# (the rows, as read from the bulk accessors alone)
+def _get_bulk_rows(store) -> list:
+    get_bit = store._get_bit
+    begins  = store.get_cell_begins()
+    ends    = store.get_cell_ends()
+    copied  = store.get_copied()
+    rows = []
+    # ci: cell index
+    ci = 0
+    for i, re in enumerate(store.get_row_ends()):
+        contents = []
+        for k in range(ci, re):
+            if copied is None:
+                b = 0 if 0 == k else ends[k - 1]
+                contents.append(bytes(store.get_content()[b:ends[k]]))
+            elif get_bit(copied, k):
+                contents.append(bytes(store.get_content()[begins[k]:ends[k]]))
+            else:
+                contents.append(bytes(store.get_source()[begins[k]:ends[k]]))
+        rows.append((
+            contents,
+            [get_bit(store.get_quoted(), k) for k in range(ci, re)],
+            list(store.get_subsequent_delimiters()[ci:re]),
+            store._NEWLINE_ENCODINGS[store.get_newline_encodings()[i]],
+            get_bit(store.get_leading_spaces(), i),
+            store.get_row_sizes()[i],
+        ))
+        ci = re
+    return rows
+
+
+def test_store_matches_parser(make_csv_file, gen_csv):
+    for seed in range(40):
+        csv_file_path = make_csv_file(gen_csv(seed, n_rows = 30))
+        expected = [_get_view_row(rv) for rv in iter_rows(csv_file_path)]
+        if 0 == len(expected):
+            continue
+        for kwargs in ({}, {'use_mmap': True}, {'paranoid': True}):
+            csvt = CSVTree(csv_file_path, **kwargs)
+            assert expected == \
+                [_get_row(csvt.get_row(i)) for i in range(len(csvt))], \
+                (seed, kwargs)
+            assert expected == _get_bulk_rows(csvt._store), (seed, kwargs)
+
+
+def test_store_is_columnar(make_csv_file):
+    csv_file_path = make_csv_file(b'a,"b""c"\r\n  "d" "e",f\n')
+    csvt = CSVTree(csv_file_path)
+    store = csvt._store
+    # (no row or cell object is kept, and the views are slotted)
+    assert not hasattr(csvt.get_row(0), '__dict__')
+    assert not hasattr(csvt.get_row(0).get_cell(0), '__dict__')
+    assert b'ab"cdef' == bytes(store.get_content())
+    assert [1, 4, 5, 6, 7] == list(store.get_cell_ends())
+    assert [2, 5] == list(store.get_row_ends())
+    assert [10, 12] == list(store.get_row_sizes())
+    assert [ord(','), -1, ord(' '), ord(','), -1] == \
+           list(store.get_subsequent_delimiters())
+    assert store.get_cell_begins() is None
+    assert store.get_copied() is None
+    # (the content counts are kept only for the cells that are not all 0)
+    assert [1] == list(store.get_content_counts().keys())
+    del csvt, store
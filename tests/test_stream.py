@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+import csvinfo
+from csvinfo import CSVTree
+from csvinfo import CSVStream
+
+
+# A csv tree (or stream) can be parsed from a readable binary file-like
+# object, or from an iterator of byte chunks, rather than from a named csv
+# file; and the command line parses stdin, given as -.
+
+def _get_chunks(data, sizes) -> list:
+    chunks = []
+    # i: index [of the next byte of data]
+    i = 0
+    k = 0
+    while i < len(data):
+        n = sizes[k % len(sizes)]
+        chunks.append(data[i:i + n])
+        i += n
+        k += 1
+    # (the chunks may be of any bytes-like type, and may be empty)
+    return [b''] + [
+        (bytes, bytearray, memoryview)[k % 3](c) for k, c in enumerate(chunks)
+    ]
+
+
+def test_stream_matches_file(make_csv_file, gen_csv):
+    for seed in range(20):
+        data = gen_csv(seed, n_rows = 30)
+        try:
+            expected = CSVTree(make_csv_file(data)).get_statistics()
+        except AssertionError:
+            continue
+        # (a stream is read only once, and so is made anew for each parse;
+        # and it is parsed in a single process, whatever the jobs)
+        for get_source in (
+            lambda: io.BytesIO(data),
+            lambda: iter(_get_chunks(data, (1, 7, 64))),
+            lambda: _get_chunks(data, (1000,)),
+        ):
+            for cls in (CSVTree, CSVStream):
+                for kwargs in ({}, {'block_size': 3}, {'jobs': 2}):
+                    assert expected == \
+                           cls(get_source(), **kwargs).get_statistics(), \
+                           (seed, cls, kwargs)
+
+
+def test_stream_is_left_open():
+    source = io.BytesIO(b'a,b\n')
+    assert 1 == len(CSVTree(source))
+    assert source.closed is False
+
+
+def test_text_stream_rejected():
+    with pytest.raises(TypeError):
+        CSVTree(io.StringIO('a,b\n'))
+    with pytest.raises(TypeError):
+        CSVStream(iter(['a,b\n']))
+
+
+def test_main_stdin(make_csv_file):
+    data = b'a\t"b"\nc\td\n'
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.path.dirname(os.path.dirname(csvinfo.__file__)),
+    }
+    csvs = json.loads(subprocess.run(
+        [sys.executable, '-m', 'csvinfo', '--format', 'json', '-'],
+        input          = data,
+        capture_output = True,
+        check          = True,
+        env            = env,
+    ).stdout)
+    # (the dialect is sniffed from a prefix of stdin, which is then parsed
+    # in full)
+    assert {
+        'quote_character'    : '0x22',
+        'delimiter_character': '0x09',
+        **CSVTree(make_csv_file(data), 0x22, 0x09).get_statistics(),
+    } == csvs